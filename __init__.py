@@ -19,7 +19,7 @@ bl_info = {
 import bpy
 from . import search
 from . import prefs
-
+from . import index
 
 CLASSES = [
     prefs.Preferences,
@@ -32,6 +32,7 @@ KEYMAPS = []
 def register():
     KEYMAPS.clear()
 
+    index.register()
     search.register()
 
     for cls in CLASSES:
@@ -51,6 +52,7 @@ def unregister():
         bpy.utils.unregister_class(cls)
 
     search.unregister()
+    index.unregister()
 
     if search.ToggleSearchOverlay.handle is not None:
         search.ToggleSearchOverlay.remove_draw_handler()
@@ -0,0 +1,348 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Evaluation of attribute names of the nodes working with attributes and index of the names used
+# in the file. The name input can be linked to other nodes producing strings, these are evaluated
+# by following the links upstream, through reroutes, Join Strings and node groups.
+
+import collections
+import itertools
+import typing
+
+from . import snapshot
+
+STRING_NODE = "FunctionNodeInputString"
+JOIN_STRINGS_NODE = "GeometryNodeStringJoin"
+REROUTE_NODE = "NodeReroute"
+GROUP_INPUT_NODE = "NodeGroupInput"
+GROUP_OUTPUT_NODE = "NodeGroupOutput"
+# Maximum number of names one socket evaluates to, combinations of the joined strings can grow
+# exponentially
+MAX_NAMES = 64
+
+ACCESS_READ = 'READ'
+ACCESS_WRITE = 'WRITE'
+ACCESS_REMOVE = 'REMOVE'
+# Mapping of bl_idname of nodes working with attributes -> how they access the attribute
+ATTRIBUTE_ACCESS = {
+    "GeometryNodeInputNamedAttribute": ACCESS_READ,
+    "GeometryNodeStoreNamedAttribute": ACCESS_WRITE,
+    "GeometryNodeRemoveAttribute": ACCESS_REMOVE,
+}
+# Attributes of the built-in geometry types, they exist without being written by any node
+BUILTIN_ATTRIBUTES = {
+    "position",
+    "radius",
+    "id",
+    "material_index",
+    "sharp_face",
+    "sharp_edge",
+    "resolution",
+    "cyclic",
+    "curve_type",
+    "normal_mode",
+    "handle_left",
+    "handle_right",
+    "handle_type_left",
+    "handle_type_right",
+    "nurbs_order",
+    "nurbs_weight",
+    "knots_mode",
+    "tilt",
+    "uv_map",
+    "velocity",
+}
+
+
+def _unique(names: typing.Iterable[str]) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(names))
+
+
+def _find_socket(sockets: typing.Iterable[typing.Any], identifier: str) -> typing.Any | None:
+    for socket in sockets:
+        if socket.identifier == identifier:
+            return socket
+    return None
+
+
+def _unmuted_links(socket: typing.Any) -> list[typing.Any]:
+    return [link for link in socket.links if not link.is_muted]
+
+
+class AttributeNameResolver:
+    """Evaluates string sockets to the names they can have, memoized for the resolver lifetime.
+
+    A socket can evaluate to more names, for example a group input of a node group used by group
+    nodes with different values. Strings which can't be evaluated without the geometry evaluate
+    to no names. Group nodes used by the node group are returned by 'group_users'.
+    """
+
+    def __init__(self, group_users: typing.Callable[[typing.Any], typing.Iterable[typing.Any]]):
+        self.group_users = group_users
+        # (output socket, group nodes entered through their outputs) -> names
+        self._memo: dict[tuple, tuple[str, ...]] = {}
+
+    def node_names(self, node: typing.Any) -> tuple[str, ...]:
+        input_index = snapshot.ATTRIBUTE_INPUTS.get(node.bl_idname)
+        if input_index is None:
+            return ()
+
+        return self.input_names(node.inputs[input_index], ())
+
+    def input_names(self, socket: typing.Any, context: tuple) -> tuple[str, ...]:
+        links = _unmuted_links(socket)
+        if len(links) == 0:
+            value = socket.default_value
+            return (value,) if isinstance(value, str) else ()
+
+        return _unique(
+            itertools.chain.from_iterable(
+                self.output_names(link.from_node, link.from_socket, context) for link in links
+            )
+        )
+
+    def output_names(self, node: typing.Any, socket: typing.Any, context: tuple) -> tuple[str, ...]:
+        key = (socket, context)
+        names = self._memo.get(key)
+        if names is None:
+            # Stops evaluation of invalid cyclic links
+            self._memo[key] = ()
+            names = self._evaluate(node, socket, context)[:MAX_NAMES]
+            self._memo[key] = names
+
+        return names
+
+    def _evaluate(self, node: typing.Any, socket: typing.Any, context: tuple) -> tuple[str, ...]:
+        bl_idname = node.bl_idname
+        if bl_idname == STRING_NODE:
+            return (node.string,)
+        if bl_idname == REROUTE_NODE:
+            return self.input_names(node.inputs[0], context)
+        if bl_idname == JOIN_STRINGS_NODE:
+            return self._join_strings(node, context)
+        if bl_idname == GROUP_INPUT_NODE:
+            return self._group_input(node, socket, context)
+        if getattr(node, "node_tree", None) is not None:
+            return self._group_output(node, socket, context)
+
+        return ()
+
+    def _join_strings(self, node: typing.Any, context: tuple) -> tuple[str, ...]:
+        delimiters = self.input_names(node.inputs[0], context)
+        # Links of the multi input ordered from top to bottom, in the order they are joined
+        links = sorted(
+            _unmuted_links(node.inputs[1]),
+            key=lambda link: getattr(link, "multi_input_sort_id", 0),
+            reverse=True,
+        )
+        parts = [self.output_names(link.from_node, link.from_socket, context) for link in links]
+        names = (
+            delimiter.join(strings)
+            for delimiter in delimiters
+            for strings in itertools.product(*parts)
+        )
+        return _unique(itertools.islice(names, MAX_NAMES))
+
+    def _group_input(self, node: typing.Any, socket: typing.Any, context: tuple) -> tuple[str, ...]:
+        # The node group was entered from a known group node, otherwise it can be used by any
+        if len(context) > 0:
+            group_nodes = (context[-1],)
+            context = context[:-1]
+        else:
+            group_nodes = self.group_users(node.id_data)
+
+        names = []
+        for group_node in group_nodes:
+            group_input = _find_socket(group_node.inputs, socket.identifier)
+            if group_input is not None:
+                names.extend(self.input_names(group_input, context))
+
+        return _unique(names)
+
+    def _group_output(
+        self, node: typing.Any, socket: typing.Any, context: tuple
+    ) -> tuple[str, ...]:
+        for inner in node.node_tree.nodes:
+            if inner.bl_idname == GROUP_OUTPUT_NODE and inner.is_active_output:
+                group_output = _find_socket(inner.inputs, socket.identifier)
+                if group_output is not None:
+                    return self.input_names(group_output, context + (node,))
+
+        return ()
+
+
+class AttributeUsage:
+    """Nodes accessing one attribute name, as lists of (node tree, node)."""
+
+    __slots__ = ("readers", "writers", "removers")
+
+    def __init__(self):
+        self.readers: list[tuple[typing.Any, typing.Any]] = []
+        self.writers: list[tuple[typing.Any, typing.Any]] = []
+        self.removers: list[tuple[typing.Any, typing.Any]] = []
+
+    def add(self, access: str, node_tree: typing.Any, node: typing.Any) -> None:
+        if access == ACCESS_READ:
+            self.readers.append((node_tree, node))
+        elif access == ACCESS_WRITE:
+            self.writers.append((node_tree, node))
+        else:
+            self.removers.append((node_tree, node))
+
+    def nodes(self) -> typing.Iterator[typing.Any]:
+        for _, node in itertools.chain(self.readers, self.writers, self.removers):
+            yield node
+
+    def description(self) -> str:
+        return (
+            f"Written {len(self.writers)}x, read {len(self.readers)}x, "
+            f"removed {len(self.removers)}x"
+        )
+
+
+class TreeAttributes:
+    """Attribute nodes of one snapshot, names of the linked ones are evaluated by the index."""
+
+    __slots__ = ("snapshot", "names", "linked")
+
+    def __init__(self, tree: snapshot.TreeSnapshot):
+        self.snapshot = tree
+        # List of (name, access, node) of nodes with the name in their input, the name can be empty
+        self.names: list[tuple[str, str, typing.Any]] = []
+        # List of (value of the input, access, node) of nodes with linked name input
+        self.linked: list[tuple[str, str, typing.Any]] = []
+        for record in tree.records:
+            access = ATTRIBUTE_ACCESS.get(record.bl_idname)
+            if access is None:
+                continue
+            if record.attribute_linked:
+                self.linked.append((record.attribute, access, tree.node(record)))
+            else:
+                self.names.append((record.attribute, access, tree.node(record)))
+
+
+class FileAttributeIndex:
+    """Mapping of attribute names used by the geometry node trees of the file -> their usage.
+
+    All attribute nodes are in the index, nodes with empty attribute name under "".
+
+    The attribute nodes are collected once per snapshot of each node tree, so only the changed
+    node trees are scanned again on update. The usage is merged from the collected nodes only
+    if anything changed. Names of linked inputs depend on the node trees using the node group,
+    they are evaluated again on every change.
+    """
+
+    def __init__(self):
+        self._trees: dict[typing.Any, TreeAttributes] = {}
+        self.usages: dict[str, AttributeUsage] = {}
+
+    def update(self, snapshots: typing.Iterable[snapshot.TreeSnapshot]) -> None:
+        snapshot.run_steps(self.update_steps(snapshots))
+
+    def update_steps(
+        self, snapshots: typing.Iterable[snapshot.TreeSnapshot]
+    ) -> snapshot.Steps[None]:
+        """Same as 'update' done in steps, each changed node tree is scanned in its own step."""
+        trees = {}
+        changed = False
+        for tree in snapshots:
+            tree_attributes = self._trees.get(tree.node_tree)
+            if tree_attributes is None or tree_attributes.snapshot is not tree:
+                tree_attributes = TreeAttributes(tree)
+                changed = True
+                yield
+            trees[tree.node_tree] = tree_attributes
+
+        # Some node trees were removed
+        if len(trees) != len(self._trees):
+            changed = True
+
+        self._trees = trees
+        if changed:
+            self._merge()
+
+    def _merge(self) -> None:
+        group_users = collections.defaultdict(list)
+        for tree_attributes in self._trees.values():
+            tree = tree_attributes.snapshot
+            for record in tree.group_records:
+                group_users[record.group].append(tree.node(record))
+
+        resolver = AttributeNameResolver(lambda node_tree: group_users.get(node_tree, ()))
+        usages = collections.defaultdict(AttributeUsage)
+        for node_tree, tree_attributes in self._trees.items():
+            for name, access, node in tree_attributes.names:
+                usages[name].add(access, node_tree, node)
+            for value, access, node in tree_attributes.linked:
+                # Names which can't be evaluated fall back to the value of the input, so every
+                # attribute node is in the index
+                for name in resolver.node_names(node) or (value,):
+                    usages[name].add(access, node_tree, node)
+
+        self.usages = dict(usages)
+
+    def clear(self) -> None:
+        self._trees.clear()
+        self.usages.clear()
+
+    def find(self, matcher: typing.Callable[[str], bool]) -> set[typing.Any]:
+        """Returns nodes accessing any attribute whose name matches."""
+        found = set()
+        for name, usage in self.usages.items():
+            if matcher(name):
+                found.update(usage.nodes())
+        return found
+
+    def names(self) -> list[str]:
+        return sorted(self.usages)
+
+    def read_not_written(self) -> list[str]:
+        """Names read by some nodes but never written, except the built-in attributes.
+
+        The attributes can still come from the original geometry, e.g. UV maps of a mesh.
+        """
+        return sorted(
+            name
+            for name, usage in self.usages.items()
+            if len(usage.readers) > 0 and len(usage.writers) == 0 and name not in BUILTIN_ATTRIBUTES
+        )
+
+    def written_not_read(self) -> list[str]:
+        """Names written by some nodes but never read.
+
+        The attributes can still be used outside of the node trees, e.g. by shaders or exports.
+        """
+        return sorted(
+            name
+            for name, usage in self.usages.items()
+            if len(usage.writers) > 0 and len(usage.readers) == 0
+        )
+
+
+class AttributeNameFilter:
+    """Matches records of nodes accessing an attribute whose name, or evaluated name, matches.
+
+    The matching is done on the names in the file attribute index by 'prepare', or on the first
+    call if it wasn't run.
+    """
+
+    def __init__(
+        self,
+        matcher: typing.Callable[[str], bool],
+        attribute_index: typing.Callable[[], snapshot.Steps[FileAttributeIndex]],
+    ):
+        self.matcher = matcher
+        # Returns steps updating the file attribute index
+        self.attribute_index = attribute_index
+        self._nodes: set[typing.Any] | None = None
+
+    def prepare(self) -> snapshot.Steps[None]:
+        attribute_index = yield from self.attribute_index()
+        self._nodes = attribute_index.find(self.matcher)
+
+    def __call__(self, record: snapshot.NodeRecord) -> bool:
+        if record.attribute is None:
+            return False
+        if self._nodes is None:
+            snapshot.run_steps(self.prepare())
+
+        return record.tree.node(record) in self._nodes
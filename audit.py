@@ -0,0 +1,320 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Headless audit of node trees in many .blend files, reports missing images, missing node groups,
+# disconnected nodes, nodes not contributing to any output and duplicate node groups found by the
+# same search as in the node editor. Each file is opened by a separate Blender process, several
+# of them run at once:
+#
+#   blender --background --python audit.py -- --output report.json assets/
+#   python audit.py --blender /path/to/blender --jobs 8 --output report.csv a.blend b.blend
+#
+# The exit code is 1 if any issue was found and '--fail-on-issues' is given, 2 if any file
+# couldn't be audited.
+
+import argparse
+import concurrent.futures
+import csv
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Mapping of check name -> preference enabling the check in the search
+CHECKS = {
+    "missing_images": "search_missing_images",
+    "missing_node_groups": "search_missing_node_groups",
+    "unconnected": "search_unconnected",
+    "not_contributing": "search_not_contributing",
+    "duplicate_node_groups": "search_duplicate_node_groups",
+}
+# Time in seconds one file can be audited before its Blender process is killed
+FILE_TIMEOUT = 600.0
+# Time in seconds the checks of one file wait for image files, None waits for all of them, the
+# audit isn't interactive and slow network drives shouldn't produce unchecked images
+IMAGE_TIMEOUT = None
+CSV_FIELDS = ("file", "check", "owner_type", "owner", "node_tree", "node", "bl_idname", "error")
+
+
+class AuditOptions:
+    """Search options of one check, used in place of the preferences of the add-on.
+
+    The add-on isn't registered in the background Blender, so its preferences don't exist.
+    """
+
+    use_regex = False
+    match_case = False
+    exact_match = False
+    search_in_name = False
+    search_in_label = False
+    search_in_blidname = False
+    search_in_node_groups = True
+    search_in_attribute = False
+    attribute_search = ""
+    search_duplicate_subgraphs = False
+    search_selection_relation = 'NONE'
+    selection_hops = 1
+    search_scope = 'FILE'
+
+    def __init__(self, check: str):
+        for check_, option in CHECKS.items():
+            setattr(self, option, check_ == check)
+
+
+def import_package():
+    """Imports the add-on as a package, so its modules can be used from a script."""
+    parent, name = os.path.split(PACKAGE_DIR)
+    if parent not in sys.path:
+        sys.path.insert(0, parent)
+
+    return importlib.import_module(name)
+
+
+def audit_current_file(
+    checks: typing.Iterable[str], image_timeout: float | None = IMAGE_TIMEOUT
+) -> dict:
+    """Runs the checks over all node trees of the opened file, only runs inside Blender."""
+    search = importlib.import_module(".search", import_package().__name__)
+    owners = {node_tree: owner for owner, node_tree in search.get_file_node_trees()}
+
+    results = {}
+    for check in checks:
+        node_search = search.create_node_search(
+            None, "", AuditOptions(check), image_timeout=image_timeout
+        )
+        node_search.search()
+        found = []
+        for node_tree, nodes in node_search.node_tree_finds.items():
+            owner = owners.get(node_tree, node_tree)
+            for node in nodes:
+                # Group nodes found only because of their content are not issues themselves
+                if node not in node_search.all_found_nodes:
+                    continue
+                found.append(
+                    {
+                        "owner_type": type(owner).__name__,
+                        "owner": owner.name,
+                        "node_tree": node_tree.name,
+                        "node": node.name,
+                        "bl_idname": node.bl_idname,
+                    }
+                )
+
+        # Image files not checked in time can't be reported as missing, nor as valid
+        for node_tree, node in node_search.unchecked_images:
+            owner = owners.get(node_tree, node_tree)
+            found.append(
+                {
+                    "owner_type": type(owner).__name__,
+                    "owner": owner.name,
+                    "node_tree": node_tree.name,
+                    "node": node.name,
+                    "bl_idname": node.bl_idname,
+                    "error": "Image file not checked in time",
+                }
+            )
+
+        results[check] = sorted(found, key=lambda x: (x["owner"], x["node_tree"], x["node"]))
+
+    return results
+
+
+def audit_file(
+    blender: str,
+    path: str,
+    checks: list[str],
+    timeout: float,
+    image_timeout: float | None = IMAGE_TIMEOUT,
+) -> dict:
+    report = {"file": path, "error": None, "seconds": 0.0, "results": {}}
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "report.json")
+        command = [
+            blender,
+            "--background",
+            "--factory-startup",
+            "--python-exit-code",
+            "1",
+            path,
+            "--python",
+            os.path.abspath(__file__),
+            "--",
+            "--worker",
+            "--checks",
+            ",".join(checks),
+            "--output",
+            output,
+        ]
+        if image_timeout is not None:
+            command.extend(("--image-timeout", str(image_timeout)))
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            report["error"] = f"Timed out after {timeout} s"
+            process = None
+        except OSError as e:
+            report["error"] = f"Blender couldn't be started: {e}"
+            process = None
+
+        if process is not None:
+            if process.returncode != 0 or not os.path.isfile(output):
+                lines = (process.stderr or process.stdout).strip().splitlines()
+                report["error"] = lines[-1] if len(lines) > 0 else f"Exit code {process.returncode}"
+            else:
+                with open(output) as f:
+                    report["results"] = json.load(f)
+
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def collect_files(paths: typing.Iterable[str]) -> list[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, x) for x in names if x.endswith(".blend"))
+        else:
+            files.append(path)
+
+    return sorted(set(os.path.abspath(x) for x in files))
+
+
+def run_audit(
+    files: list[str],
+    blender: str,
+    checks: list[str],
+    jobs: int,
+    timeout: float = FILE_TIMEOUT,
+    image_timeout: float | None = IMAGE_TIMEOUT,
+) -> dict:
+    start = time.perf_counter()
+    # The threads only wait for the Blender processes doing the work
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        reports = list(
+            executor.map(lambda x: audit_file(blender, x, checks, timeout, image_timeout), files)
+        )
+
+    elapsed = time.perf_counter() - start
+    issues = sum(len(found) for report in reports for found in report["results"].values())
+    return {
+        "checks": checks,
+        "files": reports,
+        "summary": {
+            "files": len(reports),
+            "failed_files": sum(report["error"] is not None for report in reports),
+            "issues": issues,
+            "seconds": elapsed,
+            "files_per_minute": len(reports) / elapsed * 60.0 if elapsed > 0.0 else 0.0,
+        },
+    }
+
+
+def write_report(report: dict, output: str) -> None:
+    if output.endswith(".csv"):
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, CSV_FIELDS)
+            writer.writeheader()
+            for file_report in report["files"]:
+                if file_report["error"] is not None:
+                    writer.writerow({"file": file_report["file"], "error": file_report["error"]})
+                for check, found in file_report["results"].items():
+                    for item in found:
+                        writer.writerow({"file": file_report["file"], "check": check, **item})
+    else:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+def get_default_blender() -> str:
+    try:
+        import bpy
+
+        return bpy.app.binary_path
+    except ImportError:
+        return os.environ.get("BLENDER", "blender")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Audit node trees of .blend files for missing images, missing node groups, "
+        "disconnected nodes, nodes not contributing to any output and duplicate node groups"
+    )
+    parser.add_argument("paths", nargs="*", help=".blend files or directories searched for them")
+    parser.add_argument(
+        "--checks",
+        default=",".join(CHECKS),
+        help=f"Comma separated checks to run, any of: {', '.join(CHECKS)}",
+    )
+    parser.add_argument("--output", help="Report file, CSV if it ends with .csv, JSON otherwise")
+    parser.add_argument("--blender", default=None, help="Blender executable running the audit")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=FILE_TIMEOUT)
+    parser.add_argument(
+        "--image-timeout",
+        type=float,
+        default=IMAGE_TIMEOUT,
+        help="Seconds the checks of one file wait for image files, unlimited by default",
+    )
+    parser.add_argument("--fail-on-issues", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    checks = [x.strip() for x in args.checks.split(",") if x.strip() != ""]
+    unknown = [x for x in checks if x not in CHECKS]
+    if len(unknown) > 0:
+        print(f"Unknown checks: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    if args.worker:
+        results = audit_current_file(checks, args.image_timeout)
+        with open(args.output, "w") as f:
+            json.dump(results, f)
+        return 0
+
+    files = collect_files(args.paths)
+    if len(files) == 0:
+        print("No .blend files to audit", file=sys.stderr)
+        return 2
+
+    report = run_audit(
+        files,
+        args.blender or get_default_blender(),
+        checks,
+        max(args.jobs, 1),
+        args.timeout,
+        args.image_timeout,
+    )
+    if args.output is not None:
+        write_report(report, args.output)
+
+    summary = report["summary"]
+    for file_report in report["files"]:
+        if file_report["error"] is not None:
+            print(f"{file_report['file']}: {file_report['error']}", file=sys.stderr)
+    print(
+        f"Audited {summary['files']} file(s) in {summary['seconds']:.1f} s "
+        f"({summary['files_per_minute']:.1f} files per minute), "
+        f"found {summary['issues']} issue(s), {summary['failed_files']} file(s) failed"
+    )
+
+    if summary["failed_files"] > 0:
+        return 2
+    if args.fail_on_issues and summary["issues"] > 0:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # Blender passes the script arguments after '--'
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
@@ -0,0 +1,239 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Lightweight stand-in of bpy and the drawing modules, so the add-on package can be imported and
+# its search, handlers and overlay can be benchmarked in plain Python. Only the parts the add-on
+# touches are implemented, node trees are built from the classes below.
+
+import importlib.util
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "improved_node_search"
+
+
+class _AnyTypes(types.ModuleType):
+    """Module returning a new empty class for every unknown attribute, used for annotations."""
+
+    def __getattr__(self, name: str) -> type:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        cls = type(name, (), {})
+        setattr(self, name, cls)
+        return cls
+
+
+class _AnyFunctions(types.ModuleType):
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: None
+
+
+class Vector(tuple):
+    def __new__(cls, values):
+        return super().__new__(cls, values)
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    def __mul__(self, scalar: float):
+        return Vector(a * scalar for a in self)
+
+
+class ID:
+    def __init__(self, name: str):
+        self.name = name
+
+    def as_pointer(self) -> int:
+        return id(self)
+
+    @property
+    def original(self) -> "ID":
+        return self
+
+
+class Socket:
+    __slots__ = ("is_linked", "default_value")
+
+    def __init__(self, is_linked: bool = False, default_value=None):
+        self.is_linked = is_linked
+        self.default_value = default_value
+
+
+class Node:
+    def __init__(
+        self,
+        name: str,
+        bl_idname: str = "ShaderNodeMath",
+        label: str = "",
+        location: tuple[float, float] = (0.0, 0.0),
+        outputs: int = 1,
+        linked: bool = True,
+    ):
+        self.name = name
+        self.label = label
+        self.bl_idname = bl_idname
+        self.type = 'REROUTE' if bl_idname == "NodeReroute" else 'CUSTOM'
+        self.location = Vector(location)
+        self.dimensions = Vector((140.0, 100.0))
+        self.hide = False
+        self.parent = None
+        self.select = False
+        self.inputs = [Socket()]
+        self.outputs = [Socket(linked) for _ in range(outputs)]
+
+    def as_pointer(self) -> int:
+        return id(self)
+
+
+class GroupNode(Node):
+    def __init__(self, name: str, node_tree: "NodeTree | None", **kwargs):
+        super().__init__(name, bl_idname="ShaderNodeGroup", **kwargs)
+        self.node_tree = node_tree
+
+
+class Nodes(list):
+    def foreach_get(self, attribute: str, array) -> None:
+        values = []
+        for node in self:
+            value = getattr(node, attribute)
+            if isinstance(value, tuple):
+                values.extend(value)
+            else:
+                values.append(value)
+        array[:] = values
+
+
+class NodeTree(ID):
+    def __init__(
+        self, name: str, nodes: list[Node] | None = None, bl_idname: str = "ShaderNodeTree"
+    ):
+        super().__init__(name)
+        self.bl_idname = bl_idname
+        self.nodes = Nodes(nodes or ())
+        self.links = []
+
+
+class DepsgraphUpdate:
+    def __init__(self, id_: ID):
+        self.id = id_
+
+
+class Depsgraph:
+    def __init__(self, ids: list[ID]):
+        self.updates = [DepsgraphUpdate(id_) for id_ in ids]
+
+
+class View2D:
+    def __init__(self, borders: tuple[float, float, float, float], size: tuple[int, int]):
+        self.borders = borders
+        self.size = size
+
+    def region_to_view(self, x: float, y: float) -> tuple[float, float]:
+        bx, by, b_xw, b_yh = self.borders
+        return (
+            bx + x / self.size[0] * (b_xw - bx),
+            by + y / self.size[1] * (b_yh - by),
+        )
+
+
+class Shader:
+    def bind(self) -> None:
+        pass
+
+    def uniform_float(self, name: str, value) -> None:
+        pass
+
+
+class Batch:
+    def __init__(self, content: dict, indices=None):
+        self.content = content
+        self.indices = indices
+
+    def draw(self, shader: Shader) -> None:
+        pass
+
+
+def _module(name: str, module: types.ModuleType | None = None, **attributes) -> types.ModuleType:
+    module = module or types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def install(preferences) -> types.ModuleType:
+    """Installs the stand-in modules, 'preferences' are returned as the add-on preferences."""
+    bpy_types = _module("bpy.types", _AnyTypes("bpy.types"))
+    for cls in (ID, Node, NodeTree, Depsgraph):
+        setattr(bpy_types, cls.__name__, cls)
+    for name in ("Operator", "Panel", "AddonPreferences", "PropertyGroup"):
+        setattr(bpy_types, name, type(name, (), {}))
+
+    handlers = types.SimpleNamespace(
+        depsgraph_update_post=[],
+        load_post=[],
+        undo_post=[],
+        redo_post=[],
+        persistent=lambda function: function,
+    )
+    timers = types.SimpleNamespace(
+        register=lambda *args, **kwargs: None, is_registered=lambda function: False
+    )
+    app = _module("bpy.app", handlers=handlers, timers=timers, binary_path="blender")
+    system = types.SimpleNamespace(dpi=72, pixel_size=1.0)
+    addons = {PACKAGE_NAME: types.SimpleNamespace(preferences=preferences)}
+    context = types.SimpleNamespace(preferences=types.SimpleNamespace(system=system, addons=addons))
+    data = types.SimpleNamespace(
+        node_groups=[], materials=[], worlds=[], lights=[], scenes=[], images=[]
+    )
+    bpy = _module(
+        "bpy",
+        types=bpy_types,
+        props=_module("bpy.props", _AnyFunctions("bpy.props")),
+        utils=_module("bpy.utils", _AnyFunctions("bpy.utils")),
+        ops=_module("bpy.ops", _AnyFunctions("bpy.ops")),
+        path=_module("bpy.path", abspath=lambda path, library=None: path),
+        app=app,
+        context=context,
+        data=data,
+    )
+
+    bpy_extras = _module("bpy_extras")
+    bpy_extras.io_utils = _module("bpy_extras.io_utils", ExportHelper=type("ExportHelper", (), {}))
+    _module("mathutils", Vector=Vector)
+    _module(
+        "blf",
+        size=lambda *args: None,
+        dimensions=lambda font, text: (len(text) * 8.0, 12.0),
+        position=lambda *args: None,
+        color=lambda *args: None,
+        draw=lambda *args: None,
+    )
+    _module(
+        "gpu",
+        types=_module("gpu.types", _AnyTypes("gpu.types")),
+        shader=_module("gpu.shader", from_builtin=lambda name: Shader()),
+        state=_module("gpu.state", blend_get=lambda: 'NONE', blend_set=lambda mode: None),
+    )
+    gpu_extras = _module("gpu_extras")
+    gpu_extras.batch = _module(
+        "gpu_extras.batch",
+        batch_for_shader=lambda shader, type_, content, indices=None: Batch(content, indices),
+    )
+    return bpy
+
+
+def load_package() -> types.ModuleType:
+    """Imports the add-on package from the repository, 'install' has to be called first."""
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME, os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
+    return package
@@ -0,0 +1,69 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Measures construction of the overlay geometry of many highlighted nodes, using the add-on
+# package with a stand-in of bpy. Runs in plain Python, without Blender or GPU:
+#
+#   python benchmarks/overlay_geometry.py
+
+import random
+import sys
+import time
+import types
+
+import numpy
+
+import fake_bpy
+
+NODES_COUNT = 2000
+REPEATS = 5
+
+fake_bpy.install(types.SimpleNamespace())
+package = fake_bpy.load_package()
+draw = package.draw
+geometry = package.geometry
+
+
+def build(rects: list[tuple[float, float, float, float]]) -> tuple:
+    inner = geometry.TriangleBatch()
+    outer = geometry.TriangleBatch()
+    # Nodes out of view are drawn as circles at the left edge, merged into clusters
+    clamped = []
+    for left, top, right, bottom in rects:
+        if left < 0.0:
+            clamped.append((10.0, (top + bottom) / 2.0))
+        else:
+            inner.add_rounded_border(left, top, right, bottom, 5.0, 1920.0)
+            outer.add_rounded_border(left, top, right, bottom, 15.0, 1920.0)
+
+    positions = numpy.array(clamped, dtype=numpy.float32).reshape(-1, 2)
+    centers, _, _ = draw.cluster_positions(positions, draw.CLUSTER_CELL_SIZE)
+    inner_circles = draw.circle_fans(centers, 10.0)
+    outer_circles = draw.circle_fans(centers, 20.0)
+    return inner, outer, inner_circles, outer_circles
+
+
+def main() -> int:
+    rng = random.Random(0)
+    rects = []
+    for _ in range(NODES_COUNT):
+        left, top = rng.uniform(-500.0, 2000.0), rng.uniform(0.0, 1080.0)
+        rects.append((left, top, left + rng.uniform(80.0, 240.0), top - rng.uniform(40.0, 300.0)))
+
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        inner, outer, inner_circles, outer_circles = build(rects)
+        best = min(best, time.perf_counter() - start)
+
+    print(f"nodes: {NODES_COUNT}, draw calls: 2 (previously up to {NODES_COUNT * 10})")
+    print(
+        f"triangles: {len(inner) + len(outer) + len(inner_circles[1]) + len(outer_circles[1])}, "
+        f"vertices: {len(inner.vertices) + len(outer.vertices)}"
+        f" + {len(inner_circles[0]) + len(outer_circles[0])} of circles"
+    )
+    print(f"geometry: {best * 1e3:.3f} ms ({best / NODES_COUNT * 1e6:.3f} us/node)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Compares the per node overhead of the previous set of per node filter lambdas with the
+# compiled query plan. Runs in plain Python, without Blender:
+#
+#   python benchmarks/query_plan.py
+
+import importlib.util
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NODES_COUNT = 10000
+REPEATS = 5
+
+
+def load_module(name: str):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+query = load_module("query")
+
+
+class Prefs:
+    use_regex = False
+    match_case = False
+    exact_match = False
+
+
+class Socket:
+    __slots__ = ("is_linked",)
+
+    def __init__(self, is_linked: bool):
+        self.is_linked = is_linked
+
+
+class Node:
+    __slots__ = ("name", "attribute", "outputs", "filepath")
+
+    def __init__(self, i: int, rng: random.Random):
+        self.name = f"Node.{i:05d}"
+        self.attribute = rng.choice((None, "uv_map", "Color", "position", "rest_position"))
+        self.outputs = [Socket(rng.random() > 0.05) for _ in range(rng.randint(0, 3))]
+        self.filepath = f"/nonexistent/texture_{i % 50}.png" if rng.random() > 0.9 else None
+
+
+def search_string(search: str, value: str, prefs: Prefs) -> bool:
+    # Previous implementation, the search is normalized and prefs are checked for every node
+    def _exact_matcher(search_: str, value_: str) -> bool:
+        if query.DUPLICATE_SUFFIX_PATTERN.search(value_):
+            value_ = value_.rsplit(".", 1)[0]
+        return search_ == value_
+
+    def _contains_matcher(search_: str, value_: str) -> bool:
+        return search_ in value_
+
+    matcher = _exact_matcher if prefs.exact_match else _contains_matcher
+    if prefs.match_case:
+        return matcher(search, value)
+
+    return matcher(search.lower(), value.lower())
+
+
+def attribute_filter(node: Node, name: str, prefs: Prefs) -> bool:
+    return node.attribute is not None and search_string(name, node.attribute, prefs)
+
+
+def attribute_name_filter(node: Node, matcher) -> bool:
+    return node.attribute is not None and matcher(node.attribute)
+
+
+def unconnected_node_filter(node: Node) -> bool:
+    return len(node.outputs) > 0 and sum(output.is_linked for output in node.outputs) == 0
+
+
+def missing_image_filter(node: Node) -> bool:
+    return node.filepath is not None and not os.path.isfile(node.filepath)
+
+
+def run_filters(nodes: list[Node]) -> int:
+    prefs = Prefs()
+    filters = set()
+    filters.add(lambda x: missing_image_filter(x))
+    filters.add(lambda x: attribute_filter(x, "position", prefs))
+    filters.add(lambda x: unconnected_node_filter(x))
+    found = 0
+    for node in nodes:
+        for filter_ in filters:
+            if filter_(node):
+                found += 1
+                break
+    return found
+
+
+def run_plan(nodes: list[Node]) -> int:
+    matcher = query.compile_matcher("position")
+    plan = query.QueryPlan(
+        (
+            query.Predicate("missing_image", missing_image_filter, cost=1e-4),
+            query.Predicate("attribute", lambda x: attribute_name_filter(x, matcher), cost=2e-6),
+            query.Predicate("unconnected", unconnected_node_filter, cost=4e-6),
+        )
+    )
+    found = 0
+    for node in nodes:
+        if plan.matches(node):
+            found += 1
+    plan.finish_calibration()
+    return found
+
+
+def measure(function, nodes: list[Node]) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        found = function(nodes)
+        best = min(best, time.perf_counter() - start)
+    return best, found
+
+
+def main() -> int:
+    rng = random.Random(0)
+    nodes = [Node(i, rng) for i in range(NODES_COUNT)]
+    before, found_before = measure(run_filters, nodes)
+    after, found_after = measure(run_plan, nodes)
+    if found_before != found_after:
+        print(f"Results differ: {found_before} != {found_after}")
+        return 1
+
+    print(f"nodes: {NODES_COUNT}, found: {found_after}")
+    print(f"filter lambdas: {before / NODES_COUNT * 1e6:.3f} us/node")
+    print(f"query plan:     {after / NODES_COUNT * 1e6:.3f} us/node")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Measures the search, occurrence counting, depsgraph handlers and overlay construction on
+# synthetic node trees, using the add-on package with a stand-in of bpy. Runs in plain Python,
+# without Blender:
+#
+#   python benchmarks/search_suite.py --output baseline.json
+#   python benchmarks/search_suite.py --compare baseline.json
+#
+# Comparing with a baseline exits with 1 if any measurement is slower than the tolerance allows.
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import types
+
+import numpy
+
+import fake_bpy
+
+REPEATS = 5
+# Relative slowdown against the baseline which is reported as a regression
+TOLERANCE = 0.25
+NODE_KINDS = ("Math", "Mix", "Noise Texture", "Value", "Vector Math", "Color Ramp")
+
+
+class Options:
+    """Add-on preferences used by the benchmarked search and overlay."""
+
+    use_regex = False
+    match_case = False
+    exact_match = False
+    search_in_name = True
+    search_in_label = True
+    search_in_blidname = False
+    search_in_node_groups = True
+    search_unconnected = True
+    search_missing_images = False
+    search_missing_node_groups = False
+    search_duplicate_node_groups = False
+    search_duplicate_subgraphs = False
+    search_not_contributing = False
+    search_selection_relation = 'NONE'
+    selection_hops = 2
+    search_in_attribute = False
+    attribute_search = ""
+    search_scope = 'TREE'
+    occurrence_count = 'INSTANCE'
+    highlight_color = (1.0, 0.6, 0.1, 0.5)
+    border_attenuation = 0.6
+    border_size = 10.0
+    text_size = 25.0
+
+
+OPTIONS = Options()
+bpy = fake_bpy.install(OPTIONS)
+package = fake_bpy.load_package()
+search = package.search
+index = package.index
+draw = package.draw
+
+
+def make_nodes(
+    prefix: str, count: int, rng: random.Random, columns: int = 100
+) -> list[fake_bpy.Node]:
+    nodes = []
+    for i in range(count):
+        kind = rng.choice(NODE_KINDS)
+        nodes.append(
+            fake_bpy.Node(
+                f"{kind}.{prefix}{i:05d}",
+                label=kind if rng.random() < 0.2 else "",
+                location=((i % columns) * 200.0, -(i // columns) * 150.0),
+                linked=rng.random() > 0.03,
+            )
+        )
+    return nodes
+
+
+def make_flat(rng: random.Random) -> tuple[fake_bpy.NodeTree, list[fake_bpy.NodeTree]]:
+    return fake_bpy.NodeTree("Flat", make_nodes("F", 10000, rng)), []
+
+
+def make_deep(rng: random.Random) -> tuple[fake_bpy.NodeTree, list[fake_bpy.NodeTree]]:
+    """Chain of node groups nested 200 levels deep."""
+    groups = []
+    inner = None
+    for level in range(200):
+        nodes = make_nodes(f"D{level}_", 50, rng)
+        if inner is not None:
+            nodes.append(fake_bpy.GroupNode(f"Group.{level:03d}", inner))
+        inner = fake_bpy.NodeTree(f"Deep.{level:03d}", nodes)
+        groups.append(inner)
+
+    root = fake_bpy.NodeTree("DeepRoot", [fake_bpy.GroupNode("Group", inner)])
+    return root, groups
+
+
+def make_wide(rng: random.Random) -> tuple[fake_bpy.NodeTree, list[fake_bpy.NodeTree]]:
+    """Many instances of node groups shared through an intermediate layer of groups."""
+    shared = [
+        fake_bpy.NodeTree(f"Shared.{i:02d}", make_nodes(f"S{i}_", 200, rng)) for i in range(50)
+    ]
+    middle = []
+    for i in range(20):
+        nodes = make_nodes(f"M{i}_", 20, rng)
+        nodes.extend(
+            fake_bpy.GroupNode(f"Group.{i:02d}.{j:02d}", rng.choice(shared)) for j in range(10)
+        )
+        middle.append(fake_bpy.NodeTree(f"Middle.{i:02d}", nodes))
+
+    root_nodes = [
+        fake_bpy.GroupNode(f"Group.{i:03d}", rng.choice(middle + shared)) for i in range(500)
+    ]
+    return fake_bpy.NodeTree("WideRoot", root_nodes), shared + middle
+
+
+def clear_caches() -> None:
+    index.INDICES.clear()
+    index.RESULT_CACHE.clear()
+    draw.OVERLAY_CACHES.clear()
+
+
+def measure(function, setup=None) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_search(root: fake_bpy.NodeTree):
+    node_search = search.create_node_search(root, "noise", OPTIONS)
+    node_search.search()
+    return node_search
+
+
+def make_context(node_tree: fake_bpy.NodeTree) -> types.SimpleNamespace:
+    size = (1920, 1080)
+    region = types.SimpleNamespace(
+        type='WINDOW',
+        width=size[0],
+        height=size[1],
+        view2d=fake_bpy.View2D((-500.0, -3000.0, 6000.0, 500.0), size),
+        as_pointer=lambda: 1,
+    )
+    return types.SimpleNamespace(
+        area=types.SimpleNamespace(type='NODE_EDITOR', width=size[0]),
+        region=region,
+        space_data=types.SimpleNamespace(edit_tree=node_tree),
+        preferences=bpy.context.preferences,
+    )
+
+
+def run_scenario(name: str, root: fake_bpy.NodeTree, groups: list) -> dict[str, float]:
+    bpy.data.node_groups[:] = groups
+    results = {}
+    results[f"{name}.search_cold"] = measure(lambda: run_search(root), clear_caches)
+    results[f"{name}.search_warm"] = measure(lambda: run_search(root))
+
+    node_search = run_search(root)
+    results[f"{name}.count_occurrences"] = measure(node_search.count_occurrences)
+
+    # Depsgraph update reporting a change of every searched node tree
+    search.set_search_results(node_search)
+    depsgraph = fake_bpy.Depsgraph(list(node_search.node_tree_finds))
+
+    def _handlers():
+        index._depsgraph_update_post(None, depsgraph)
+        search._depsgraph_update_post(None, depsgraph)
+
+    results[f"{name}.handlers"] = measure(_handlers)
+
+    context = make_context(root)
+    bpy.context.preferences.system.dpi = 72
+
+    def _highlight():
+        draw.highlight_nodes(
+            context,
+            search.NODE_TREE_NODES,
+            search.NODE_TREE_OCCURRENCES,
+            search.NODE_TREE_UNIQUE_OCCURRENCES,
+            search.RESULTS_VERSION,
+        )
+
+    results[f"{name}.overlay_cold"] = measure(_highlight, draw.OVERLAY_CACHES.clear)
+    results[f"{name}.overlay_warm"] = measure(_highlight)
+    search.clear_search_results()
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> int:
+    regressions = 0
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:32} {seconds * 1e3:10.3f} ms  (not in baseline)")
+            continue
+
+        ratio = seconds / reference if reference > 0.0 else 1.0
+        mark = ""
+        if ratio > 1.0 + tolerance:
+            mark = "  REGRESSION"
+            regressions += 1
+        print(f"{name:32} {seconds * 1e3:10.3f} ms  {ratio:6.2f}x{mark}")
+
+    return 1 if regressions > 0 else 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of the search on synthetic trees")
+    parser.add_argument("--output", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Compare the results with a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    results = {}
+    for name, make in (("flat", make_flat), ("deep", make_deep), ("wide", make_wide)):
+        clear_caches()
+        results.update(run_scenario(name, *make(rng)))
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "machine": platform.machine(),
+            "repeats": REPEATS,
+        },
+        "results": results,
+    }
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        return compare(results, baseline["results"], args.tolerance)
+
+    for name, seconds in results.items():
+        print(f"{name:32} {seconds * 1e3:10.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -5,12 +5,125 @@
 
 import bpy
 import blf
+import time
+import typing
 import mathutils
 import gpu
-import gpu_extras.presets
-import math
 import gpu_extras.batch
+import numpy
 from . import prefs
+from . import geometry
+from . import index
+from . import profiling
+
+# Builtin shader is fetched once, it is the same for the whole session
+_SHADER = None
+# Size in pixels of the grid cells which group off-screen indicators into one
+CLUSTER_CELL_SIZE = 40.0
+
+
+class NodeArrays:
+    """View space rectangles of the found nodes, loaded into arrays for vectorized culling.
+
+    Positions of the found nodes among all nodes, their parents and types are kept until the node
+    tree or the found nodes change. Moving, resizing or hiding nodes doesn't change the node tree
+    version, so the rectangles are loaded by 'load_layout' on every draw.
+    """
+
+    def __init__(self, node_tree: bpy.types.NodeTree, nodes: typing.Iterable[bpy.types.Node]):
+        node_indices = {node: i for i, node in enumerate(node_tree.nodes)}
+
+        self.nodes: list[bpy.types.Node] = []
+        found_indices = []
+        is_reroute = []
+        # Pairs of (found node, node in its chain of parents), summed to absolute locations
+        chain_found = []
+        chain_nodes = []
+        # Node groups get the number of occurrences displayed, (found node, node tree)
+        self.group_nodes: list[tuple[int, bpy.types.NodeTree]] = []
+        for node in nodes:
+            i = node_indices.get(node)
+            if i is None:
+                continue
+
+            found = len(self.nodes)
+            self.nodes.append(node)
+            found_indices.append(i)
+            is_reroute.append(node.type == 'REROUTE')
+            parent = node.parent
+            while parent is not None:
+                chain_found.append(found)
+                chain_nodes.append(node_indices[parent])
+                parent = parent.parent
+
+            # Support Serpens addon nodes (all of the nodes start with SN_), node_tree references to parent, there is no nesting.
+            if hasattr(node, "node_tree") and not node.bl_idname.startswith("SN_"):
+                self.group_nodes.append((found, node.node_tree))
+
+        self.found_indices = numpy.array(found_indices, dtype=numpy.int64)
+        self.chain_found = numpy.array(chain_found, dtype=numpy.int64)
+        self.chain_nodes = numpy.array(chain_nodes, dtype=numpy.int64)
+        self.is_reroute = numpy.array(is_reroute, dtype=bool)
+        self.locations = numpy.empty((0, 2), dtype=numpy.float32)
+        self.dimensions = numpy.empty((0, 2), dtype=numpy.float32)
+        self.hide = numpy.empty(0, dtype=bool)
+
+    def load_layout(self, node_tree: bpy.types.NodeTree) -> bool:
+        """Reads the rectangles of the found nodes, returns True if any of them changed."""
+        all_nodes = node_tree.nodes
+        count = len(all_nodes)
+        all_locations = numpy.empty(count * 2, dtype=numpy.float32)
+        all_dimensions = numpy.empty(count * 2, dtype=numpy.float32)
+        all_hide = numpy.empty(count, dtype=bool)
+        all_nodes.foreach_get("location", all_locations)
+        all_nodes.foreach_get("dimensions", all_dimensions)
+        all_nodes.foreach_get("hide", all_hide)
+        all_locations = all_locations.reshape(-1, 2)
+
+        locations = all_locations[self.found_indices]
+        numpy.add.at(locations, self.chain_found, all_locations[self.chain_nodes])
+        locations = (locations + 1.0) * dpi_fac()
+        dimensions = all_dimensions.reshape(-1, 2)[self.found_indices]
+        hide = all_hide[self.found_indices]
+        changed = not (
+            numpy.array_equal(locations, self.locations)
+            and numpy.array_equal(dimensions, self.dimensions)
+            and numpy.array_equal(hide, self.hide)
+        )
+        self.locations = locations
+        self.dimensions = dimensions
+        self.hide = hide
+        return changed
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+class OverlayCache:
+    """Geometry of the overlay reused across redraws.
+
+    The found nodes are resolved until the node tree or the found nodes change, the built
+    batches are kept until the nodes are moved, resized or hidden, the view is panned or zoomed,
+    or the displayed results change.
+    """
+
+    def __init__(self):
+        self.arrays_key: tuple | None = None
+        self.arrays: NodeArrays | None = None
+        self.frame_key: tuple | None = None
+        self.batches: list[tuple[gpu.types.GPUBatch, tuple]] = []
+        self.texts: list[tuple[float, float, str, tuple]] = []
+
+    def clear(self) -> None:
+        self.arrays_key = None
+        self.arrays = None
+        self.frame_key = None
+        self.batches.clear()
+        self.texts.clear()
+
+
+# Mapping of region pointer -> overlay cache, each node editor has its own view
+OVERLAY_CACHES: dict[int, OverlayCache] = {}
 
 
 def prefs_line_width():
@@ -30,153 +143,82 @@ def dpi_fac():
     return prefs.dpi / 72
 
 
-def draw_circle_2d_filled(mx, my, radius, colour=(1.0, 1.0, 1.0, 0.7)):
-    radius = radius * prefs_line_width()
-    sides = 12
-    vertices = [
+def get_shader() -> gpu.types.GPUShader:
+    global _SHADER
+    if _SHADER is None:
+        _SHADER = gpu.shader.from_builtin('UNIFORM_COLOR')
+    return _SHADER
+
+
+def circle_fans(
+    centers: numpy.ndarray, radius: float, sides: int = geometry.CIRCLE_SIDES
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Returns vertices and triangle indices of filled circles around all the centers."""
+    angles = numpy.linspace(0.0, 2.0 * numpy.pi, sides + 1, dtype=numpy.float32)
+    unit = numpy.stack((numpy.cos(angles), numpy.sin(angles)), axis=-1) * radius
+    vertices = numpy.concatenate(
+        (centers[:, numpy.newaxis, :], centers[:, numpy.newaxis, :] + unit), axis=1
+    )
+    steps = numpy.arange(1, sides + 1)
+    fan = numpy.stack((numpy.zeros_like(steps), steps, steps + 1), axis=-1)
+    offsets = numpy.arange(len(centers)) * (sides + 2)
+    indices = fan[numpy.newaxis, :, :] + offsets[:, numpy.newaxis, numpy.newaxis]
+    return vertices.reshape(-1, 2), indices.reshape(-1, 3)
+
+
+def cluster_positions(
+    positions: numpy.ndarray, cell_size: float
+) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Bins positions into a grid, returns centers and sizes of the clusters and cluster of
+    each position.
+    """
+    if len(positions) == 0:
+        return positions, numpy.empty(0, dtype=numpy.int64), numpy.empty(0, dtype=numpy.int64)
+
+    cells = numpy.floor(positions / cell_size).astype(numpy.int64)
+    _, labels, counts = numpy.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    labels = labels.reshape(-1)
+    centers = numpy.stack(
         (
-            radius * math.cos(i * 2 * math.pi / sides) + mx,
-            radius * math.sin(i * 2 * math.pi / sides) + my,
+            numpy.bincount(labels, weights=positions[:, 0]) / counts,
+            numpy.bincount(labels, weights=positions[:, 1]) / counts,
+        ),
+        axis=-1,
+    )
+    return centers.astype(numpy.float32), counts, labels
+
+
+def create_gpu_batch(
+    batch: geometry.TriangleBatch, circles: tuple[numpy.ndarray, numpy.ndarray]
+) -> gpu.types.GPUBatch | None:
+    circle_vertices, circle_indices = circles
+    if len(batch) == 0 and len(circle_indices) == 0:
+        return None
+
+    vertices = numpy.concatenate(
+        (numpy.array(batch.vertices, dtype=numpy.float32).reshape(-1, 2), circle_vertices)
+    )
+    indices = numpy.concatenate(
+        (
+            numpy.array(batch.indices, dtype=numpy.int32).reshape(-1, 3),
+            circle_indices + len(batch.vertices),
         )
-        for i in range(sides + 1)
-    ]
-
-    shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+    )
+    return gpu_extras.batch.batch_for_shader(
+        get_shader(),
+        'TRIS',
+        {"pos": vertices.astype(numpy.float32)},
+        indices=indices.astype(numpy.int32),
+    )
+
+
+def draw_gpu_batch(batch: gpu.types.GPUBatch, colour) -> None:
+    shader = get_shader()
+    shader.bind()
     shader.uniform_float("color", colour)
-    batch = gpu_extras.batch.batch_for_shader(shader, 'TRI_FAN', {"pos": vertices})
     batch.draw(shader)
 
 
-def get_node_location(node):
-    nlocx, nlocy = abs_node_location(node)
-    return (nlocx + 1) * dpi_fac(), (nlocy + 1) * dpi_fac()
-
-
-def draw_rounded_node_border(node, radius=8, colour=(1.0, 1.0, 1.0, 0.7)):
-    area_width = bpy.context.area.width
-    sides = 16
-    radius *= prefs_line_width()
-
-    nlocx, nlocy = get_node_location(node)
-    ndimx = node.dimensions.x
-    ndimy = node.dimensions.y
-
-    if node.hide:
-        nlocx += -1
-        nlocy += 5
-
-    if node.type == 'REROUTE':
-        # nlocx += 1
-        nlocy -= 1
-        ndimx = 0
-        ndimy = 0
-        radius += 6
-
-    shader = gpu.shader.from_builtin('UNIFORM_COLOR')
-    shader.uniform_float("color", colour)
-
-    # Top left corner
-    mx, my = bpy.context.region.view2d.view_to_region(nlocx, nlocy, clip=False)
-    vertices = [(mx, my)]
-    for i in range(sides + 1):
-        if 4 <= i <= 8:
-            if mx < area_width:
-                cosine = radius * math.cos(i * 2 * math.pi / sides) + mx
-                sine = radius * math.sin(i * 2 * math.pi / sides) + my
-                vertices.append((cosine, sine))
-
-    batch = gpu_extras.batch.batch_for_shader(shader, 'TRI_FAN', {"pos": vertices})
-    batch.draw(shader)
-
-    # Top right corner
-    mx, my = bpy.context.region.view2d.view_to_region(nlocx + ndimx, nlocy, clip=False)
-    vertices = [(mx, my)]
-    for i in range(sides + 1):
-        if 0 <= i <= 4:
-            if mx < area_width:
-                cosine = radius * math.cos(i * 2 * math.pi / sides) + mx
-                sine = radius * math.sin(i * 2 * math.pi / sides) + my
-                vertices.append((cosine, sine))
-
-    batch = gpu_extras.batch.batch_for_shader(shader, 'TRI_FAN', {"pos": vertices})
-    batch.draw(shader)
-
-    # Bottom left corner
-    mx, my = bpy.context.region.view2d.view_to_region(nlocx, nlocy - ndimy, clip=False)
-    vertices = [(mx, my)]
-    for i in range(sides + 1):
-        if 8 <= i <= 12:
-            if mx < area_width:
-                cosine = radius * math.cos(i * 2 * math.pi / sides) + mx
-                sine = radius * math.sin(i * 2 * math.pi / sides) + my
-                vertices.append((cosine, sine))
-
-    batch = gpu_extras.batch.batch_for_shader(shader, 'TRI_FAN', {"pos": vertices})
-    batch.draw(shader)
-
-    # Bottom right corner
-    mx, my = bpy.context.region.view2d.view_to_region(nlocx + ndimx, nlocy - ndimy, clip=False)
-    vertices = [(mx, my)]
-    for i in range(sides + 1):
-        if 12 <= i <= 16:
-            if mx < area_width:
-                cosine = radius * math.cos(i * 2 * math.pi / sides) + mx
-                sine = radius * math.sin(i * 2 * math.pi / sides) + my
-                vertices.append((cosine, sine))
-
-    batch = gpu_extras.batch.batch_for_shader(shader, 'TRI_FAN', {"pos": vertices})
-    batch.draw(shader)
-
-    # prepare drawing all edges in one batch
-    vertices = []
-    indices = []
-    id_last = 0
-
-    # Left edge
-    m1x, m1y = bpy.context.region.view2d.view_to_region(nlocx, nlocy, clip=False)
-    m2x, m2y = bpy.context.region.view2d.view_to_region(nlocx, nlocy - ndimy, clip=False)
-    if m1x < area_width and m2x < area_width:
-        vertices.extend([(m2x - radius, m2y), (m2x, m2y), (m1x, m1y), (m1x - radius, m1y)])
-        indices.extend(
-            [(id_last, id_last + 1, id_last + 3), (id_last + 3, id_last + 1, id_last + 2)]
-        )
-        id_last += 4
-
-    # Top edge
-    m1x, m1y = bpy.context.region.view2d.view_to_region(nlocx, nlocy, clip=False)
-    m2x, m2y = bpy.context.region.view2d.view_to_region(nlocx + ndimx, nlocy, clip=False)
-    m1x = min(m1x, area_width)
-    m2x = min(m2x, area_width)
-    vertices.extend([(m1x, m1y), (m2x, m1y), (m2x, m1y + radius), (m1x, m1y + radius)])
-    indices.extend([(id_last, id_last + 1, id_last + 3), (id_last + 3, id_last + 1, id_last + 2)])
-    id_last += 4
-
-    # Right edge
-    m1x, m1y = bpy.context.region.view2d.view_to_region(nlocx + ndimx, nlocy, clip=False)
-    m2x, m2y = bpy.context.region.view2d.view_to_region(nlocx + ndimx, nlocy - ndimy, clip=False)
-    if m1x < area_width and m2x < area_width:
-        vertices.extend([(m1x, m2y), (m1x + radius, m2y), (m1x + radius, m1y), (m1x, m1y)])
-        indices.extend(
-            [(id_last, id_last + 1, id_last + 3), (id_last + 3, id_last + 1, id_last + 2)]
-        )
-        id_last += 4
-
-    # Bottom edge
-    m1x, m1y = bpy.context.region.view2d.view_to_region(nlocx, nlocy - ndimy, clip=False)
-    m2x, m2y = bpy.context.region.view2d.view_to_region(nlocx + ndimx, nlocy - ndimy, clip=False)
-    m1x = min(m1x, area_width)
-    m2x = min(m2x, area_width)
-    vertices.extend([(m1x, m2y), (m2x, m2y), (m2x, m1y - radius), (m1x, m1y - radius)])
-    indices.extend([(id_last, id_last + 1, id_last + 3), (id_last + 3, id_last + 1, id_last + 2)])
-
-    # now draw all edges in one batch
-    if len(vertices) != 0:
-        batch = gpu_extras.batch.batch_for_shader(
-            shader, 'TRIS', {"pos": vertices}, indices=indices
-        )
-        batch.draw(shader)
-
-
 def get_region_borders(context: bpy.types.Context):
     view2d = context.region.view2d
     x, y = (0, 0)
@@ -185,29 +227,34 @@ def get_region_borders(context: bpy.types.Context):
     return (*view2d.region_to_view(x, y), *view2d.region_to_view(x + w, y + h))
 
 
-def is_node_partially_in_view(node: bpy.types.Node, context: bpy.types.Context) -> bool:
-    nx, ny = get_node_location(node)
-    bx, by, b_xw, b_yh = get_region_borders(context)
-    return nx < b_xw and ny - node.dimensions.y < b_yh and nx + node.dimensions.x > bx and ny > by
+def nodes_in_view(arrays: NodeArrays, borders: tuple) -> numpy.ndarray:
+    """Returns mask of the loaded nodes at least partially in view."""
+    bx, by, b_xw, b_yh = borders
+    nx, ny = arrays.locations[:, 0], arrays.locations[:, 1]
+    dimx, dimy = arrays.dimensions[:, 0], arrays.dimensions[:, 1]
+    return (nx < b_xw) & (ny - dimy < b_yh) & (nx + dimx > bx) & (ny > by)
 
 
-def get_node_clamped_position(node: bpy.types.Node, context: bpy.types.Context):
-    nx, ny = get_node_location(node)
-    bx, by, b_xw, b_yh = get_region_borders(context)
-    hx_dim, hy_dim = node.dimensions.x / 2.0, node.dimensions.y / 2.0
+def nodes_clamped_positions(arrays: NodeArrays, borders: tuple) -> numpy.ndarray:
+    """Returns centers of the loaded nodes, moved inside the view for the nodes out of it."""
+    bx, by, b_xw, b_yh = borders
+    nx, ny = arrays.locations[:, 0], arrays.locations[:, 1]
+    dimx, dimy = arrays.dimensions[:, 0], arrays.dimensions[:, 1]
 
-    rx, ry = nx + hx_dim, ny - hy_dim
-    if nx + node.dimensions.x < bx:
-        rx = bx + 10.0
-    if nx > b_xw:
-        rx = b_xw - 10.0
+    rx = nx + dimx / 2.0
+    rx = numpy.where(nx + dimx < bx, bx + 10.0, rx)
+    rx = numpy.where(nx > b_xw, b_xw - 10.0, rx)
+    ry = ny - dimy / 2.0
+    ry = numpy.where(ny < by, by + 10.0, ry)
+    ry = numpy.where(ny - dimy > b_yh, b_yh - 10.0, ry)
+    return numpy.stack((rx, ry), axis=-1)
 
-    if ny < by:
-        ry = by + 10.0
-    if ny - node.dimensions.y > b_yh:
-        ry = b_yh - 10.0
 
-    return rx, ry
+def view_to_region(positions: numpy.ndarray, borders: tuple, size: tuple) -> numpy.ndarray:
+    """Transforms view space positions to region space, the transform of view2d is linear."""
+    bx, by, b_xw, b_yh = borders
+    scale = numpy.array((size[0] / (b_xw - bx), size[1] / (b_yh - by)), dtype=numpy.float32)
+    return (positions - numpy.array((bx, by), dtype=numpy.float32)) * scale
 
 
 def draw_text(x: float, y: float, text: str, size: float, colour: set[float, float, float, float]):
@@ -225,8 +272,13 @@ def highlight_nodes(
     context: bpy.types.Context,
     node_tree_nodes: dict[bpy.types.NodeTree, list[bpy.types.Node]],
     node_tree_occurances: dict[bpy.types.NodeTree, int],
+    node_tree_unique_occurances: dict[bpy.types.NodeTree, int],
+    results_version: int,
 ) -> None:
+    start = time.perf_counter() if profiling.PROFILE.enabled else 0.0
     prefs_ = prefs.get_preferences(context)
+    if prefs_.occurrence_count == 'UNIQUE':
+        node_tree_occurances = node_tree_unique_occurances
     if not (context.area.type == 'NODE_EDITOR' and context.region.type == 'WINDOW'):
         return
 
@@ -234,37 +286,131 @@ def highlight_nodes(
     if nodes is None:
         return
 
+    node_tree = context.space_data.edit_tree
+    system = context.preferences.system
+    cache = OVERLAY_CACHES.get(context.region.as_pointer())
+    if cache is None:
+        cache = OVERLAY_CACHES[context.region.as_pointer()] = OverlayCache()
+
+    # Found nodes change only with the results, the node tree with its change stamp
+    arrays_key = (node_tree.as_pointer(), index.get_tree_version(node_tree), results_version)
+    if arrays_key != cache.arrays_key:
+        cache.clear()
+        cache.arrays = NodeArrays(node_tree, nodes)
+        cache.arrays_key = arrays_key
+    layout_changed = cache.arrays.load_layout(node_tree)
+
+    borders = get_region_borders(context)
+    inner = tuple(prefs_.highlight_color)
+    outer = tuple(mathutils.Vector(prefs_.highlight_color) * prefs_.border_attenuation)
+    frame_key = (
+        borders,
+        context.region.width,
+        context.region.height,
+        context.area.width,
+        system.pixel_size,
+        tuple(node_tree_occurances.values()),
+        inner,
+        outer,
+        prefs_.border_size,
+        prefs_.text_size,
+    )
+    rebuilt = layout_changed or frame_key != cache.frame_key
+    if rebuilt:
+        build_overlay(context, cache, node_tree_occurances, borders, inner, outer)
+        cache.frame_key = frame_key
+
     prev_state = gpu.state.blend_get()
     gpu.state.blend_set('ALPHA')
-    inner = prefs_.highlight_color
-    outer = mathutils.Vector(prefs_.highlight_color) * prefs_.border_attenuation
+    for batch, colour in cache.batches:
+        draw_gpu_batch(batch, colour)
+    for x, y, text, colour in cache.texts:
+        draw_text(x, y, text, prefs_.text_size, colour)
+
+    gpu.state.blend_set(prev_state)
+    if profiling.PROFILE.enabled:
+        profiling.PROFILE.record_overlay_frame(
+            time.perf_counter() - start, len(cache.batches), rebuilt
+        )
+
 
-    for node in nodes:
+def build_overlay(
+    context: bpy.types.Context,
+    cache: OverlayCache,
+    node_tree_occurances: dict[bpy.types.NodeTree, int],
+    borders: tuple,
+    inner: tuple,
+    outer: tuple,
+) -> None:
+    prefs_ = prefs.get_preferences(context)
+    arrays = cache.arrays
+    size = (context.region.width, context.region.height)
+    area_width = context.area.width
+    line_width = prefs_line_width()
+    in_view = nodes_in_view(arrays, borders)
+
+    # Borders are built only for the nodes in view, so their count is bounded by the screen
+    locations = arrays.locations[in_view]
+    is_reroute = arrays.is_reroute[in_view]
+    dimensions = numpy.where(is_reroute[:, numpy.newaxis], 0.0, arrays.dimensions[in_view])
+    offsets = numpy.where(arrays.hide[in_view, numpy.newaxis], (-1.0, 5.0), 0.0)
+    offsets[is_reroute, 1] -= 1.0
+    top_left = view_to_region(locations + offsets, borders, size)
+    bottom_right = view_to_region(locations + offsets + dimensions * (1.0, -1.0), borders, size)
+    radius_extra = numpy.where(is_reroute, 6.0, 0.0)
+
+    # All shapes of one colour are collected and drawn in a single batch
+    inner_batch = geometry.TriangleBatch()
+    outer_batch = geometry.TriangleBatch()
+    for (left, top), (right, bottom), extra in zip(
+        top_left.tolist(), bottom_right.tolist(), radius_extra.tolist()
+    ):
+        inner_batch.add_rounded_border(left, top, right, bottom, 5 * line_width + extra, area_width)
+        outer_batch.add_rounded_border(
+            left, top, right, bottom, (5 + prefs_.border_size) * line_width + extra, area_width
+        )
+
+    # Nodes out of view are indicated by a circle at the closest position in view, the circles
+    # close to each other are merged into a cluster displaying the number of the nodes.
+    clamped = view_to_region(nodes_clamped_positions(arrays, borders), borders, size)
+    off_view = numpy.flatnonzero(~in_view)
+    centers, counts, labels = cluster_positions(clamped[off_view], CLUSTER_CELL_SIZE * line_width)
+    inner_circles = circle_fans(centers, 10.0 * line_width)
+    outer_circles = circle_fans(centers, (10.0 + prefs_.border_size) * line_width)
+
+    cache.batches.clear()
+    for batch, circles, colour in (
+        (inner_batch, inner_circles, inner),
+        (outer_batch, outer_circles, outer),
+    ):
+        gpu_batch = create_gpu_batch(batch, circles)
+        if gpu_batch is not None:
+            cache.batches.append((gpu_batch, colour))
+
+    texts = []
+    white = (1.0, 1.0, 1.0, 1.0)
+    for (cx, cy), count in zip(centers.tolist(), counts.tolist()):
+        if count > 1:
+            texts.append((cx, cy, str(count), white))
+
+    # Cluster of each node out of view, to display occurrences only for lone node groups
+    node_clusters = numpy.full(len(arrays), -1, dtype=numpy.int64)
+    node_clusters[off_view] = labels
+    for i, node_tree in arrays.group_nodes:
         # This count is going to be > 0 only for node groups that should be highlighted with
         # the number text.
-        inside_node_count = 0
-        # Support Serpens addon nodes (all of the nodes start with SN_), node_tree references to parent, there is no nesting.
-        if hasattr(node, "node_tree") and not node.bl_idname.startswith("SN_"):
-            inside_node_count = node_tree_occurances.get(node.node_tree, 0)
-
-        if is_node_partially_in_view(node, context):
-            x, y = get_node_location(node)
-            cx, cy = context.region.view2d.view_to_region(
-                x + (node.dimensions.x / 2.0), y - (node.dimensions.y / 2.0)
-            )
-            draw_rounded_node_border(node, radius=5, colour=inner)
-            draw_rounded_node_border(node, radius=5 + prefs_.border_size, colour=outer)
-
-            if inside_node_count > 0:
-                tx, ty = context.region.view2d.view_to_region(
-                    x + (node.dimensions.x / 2.0), y - node.dimensions.y - prefs_.text_size
-                )
-                draw_text(tx, ty, str(inside_node_count), prefs_.text_size, inner)
-        else:
-            cx, cy = context.region.view2d.view_to_region(*get_node_clamped_position(node, context))
-            draw_circle_2d_filled(cx, cy, 10.0, inner)
-            draw_circle_2d_filled(cx, cy, 10.0 + prefs_.border_size, outer)
-            if inside_node_count > 0:
-                draw_text(cx, cy, str(inside_node_count), prefs_.text_size, (1.0, 1.0, 1.0, 1.0))
-
-    gpu.state.blend_set(prev_state)
+        inside_node_count = node_tree_occurances.get(node_tree, 0)
+        if inside_node_count <= 0:
+            continue
+
+        if in_view[i]:
+            x, y = arrays.locations[i]
+            dimx, dimy = arrays.dimensions[i]
+            position = numpy.array(((x + dimx / 2.0, y - dimy - prefs_.text_size),))
+            tx, ty = view_to_region(position, borders, size)[0]
+            texts.append((float(tx), float(ty), str(inside_node_count), inner))
+        elif counts[node_clusters[i]] == 1:
+            cx, cy = centers[node_clusters[i]]
+            texts.append((float(cx), float(cy), str(inside_node_count), white))
+
+    cache.texts = texts
@@ -0,0 +1,93 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Geometry of the search overlay, built in region space.
+
+import math
+
+CORNER_SIDES = 16
+CIRCLE_SIDES = 12
+
+# Unit circle points for the corners of rounded borders, the quarter of the circle of each
+# corner is selected by an index range.
+_CORNER_POINTS = [
+    (math.cos(i * 2 * math.pi / CORNER_SIDES), math.sin(i * 2 * math.pi / CORNER_SIDES))
+    for i in range(CORNER_SIDES + 1)
+]
+
+
+class TriangleBatch:
+    """Vertices and triangle indices of all shapes drawn by one colour in a frame."""
+
+    __slots__ = ("vertices", "indices")
+
+    def __init__(self):
+        self.vertices: list[tuple[float, float]] = []
+        self.indices: list[tuple[int, int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def clear(self) -> None:
+        self.vertices.clear()
+        self.indices.clear()
+
+    def add_fan(self, center: tuple[float, float], points: list[tuple[float, float]]) -> None:
+        first = len(self.vertices)
+        self.vertices.append(center)
+        self.vertices.extend(points)
+        self.indices.extend((first, first + i, first + i + 1) for i in range(1, len(points)))
+
+    def add_quad(
+        self,
+        a: tuple[float, float],
+        b: tuple[float, float],
+        c: tuple[float, float],
+        d: tuple[float, float],
+    ) -> None:
+        first = len(self.vertices)
+        self.vertices.extend((a, b, c, d))
+        self.indices.append((first, first + 1, first + 3))
+        self.indices.append((first + 3, first + 1, first + 2))
+
+    def add_corner(self, x: float, y: float, radius: float, start: int, end: int) -> None:
+        self.add_fan(
+            (x, y),
+            [(radius * cos + x, radius * sin + y) for cos, sin in _CORNER_POINTS[start : end + 1]],
+        )
+
+    def add_rounded_border(
+        self,
+        left: float,
+        top: float,
+        right: float,
+        bottom: float,
+        radius: float,
+        clip_x: float,
+    ) -> None:
+        """Adds border of given width around the rectangle, parts right of 'clip_x' are cut."""
+        if left < clip_x:
+            self.add_corner(left, top, radius, 4, 8)
+            self.add_corner(left, bottom, radius, 8, 12)
+        if right < clip_x:
+            self.add_corner(right, top, radius, 0, 4)
+            self.add_corner(right, bottom, radius, 12, 16)
+
+        # Left edge
+        if left < clip_x:
+            self.add_quad(
+                (left - radius, bottom), (left, bottom), (left, top), (left - radius, top)
+            )
+
+        # Top and bottom edges
+        cleft = min(left, clip_x)
+        cright = min(right, clip_x)
+        self.add_quad((cleft, top), (cright, top), (cright, top + radius), (cleft, top + radius))
+        self.add_quad(
+            (cleft, bottom), (cright, bottom), (cright, bottom - radius), (cleft, bottom - radius)
+        )
+
+        # Right edge
+        if right < clip_x:
+            self.add_quad(
+                (right, bottom), (right + radius, bottom), (right + radius, top), (right, top)
+            )
@@ -0,0 +1,174 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import bpy
+import os
+import time
+import typing
+import threading
+import collections
+import concurrent.futures
+from . import snapshot
+from . import profiling
+
+# Number of threads checking existence of image files, the checks mostly wait for the disk
+CHECK_WORKERS = 8
+# Time in seconds an interactive search waits for all image checks, images not checked in time
+# are unknown, they are neither missing nor valid
+CHECK_TIMEOUT = 2.0
+# Time in seconds for which a result of a file check is reused
+CACHE_TTL = 30.0
+# Maximum number of cached results of file checks
+CACHE_SIZE = 4096
+
+
+class PathCache:
+    """Least recently used cache of (path -> file exists) with expiration, thread safe."""
+
+    def __init__(self, ttl: float = CACHE_TTL, size: int = CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self._entries: collections.OrderedDict[str, tuple[bool, float]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> bool | None:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            exists, checked = entry
+            if time.monotonic() - checked > self.ttl:
+                del self._entries[path]
+                return None
+            self._entries.move_to_end(path)
+            return exists
+
+    def set(self, path: str, exists: bool) -> None:
+        with self._lock:
+            self._entries[path] = (exists, time.monotonic())
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+PATH_CACHE = PathCache()
+
+
+def get_image_path(image: bpy.types.Image) -> str | None:
+    """Returns resolved path of the image file, None if the image doesn't need a file."""
+    if image.packed_file is not None or image.source in {'GENERATED', 'VIEWER'}:
+        return None
+
+    return os.path.abspath(bpy.path.abspath(image.filepath, library=image.library))
+
+
+def _check_path(path: str) -> bool:
+    exists = os.path.isfile(path)
+    PATH_CACHE.set(path, exists)
+    return exists
+
+
+def check_images(
+    images: typing.Iterable[bpy.types.Image], timeout: float | None = CHECK_TIMEOUT
+) -> tuple[dict[int, bool], list[str]]:
+    """Checks files of the images in parallel, waits for all of them if the timeout is None.
+
+    Returns mapping of image pointer -> image is missing and paths that weren't checked
+    within the timeout, images with these paths aren't in the mapping.
+    """
+    missing = {}
+    # Each path is checked only once, even if more images use it
+    pending: dict[str, list[int]] = collections.defaultdict(list)
+    for image in images:
+        path = get_image_path(image)
+        if path is None:
+            missing[image.as_pointer()] = False
+            continue
+
+        exists = PATH_CACHE.get(path)
+        if exists is None:
+            pending[path].append(image.as_pointer())
+        else:
+            missing[image.as_pointer()] = not exists
+
+    if len(pending) == 0:
+        return missing, []
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(CHECK_WORKERS, len(pending)), thread_name_prefix="ImageCheck"
+    )
+    # Checks that don't finish in time still store their result to the cache when they finish
+    futures = {executor.submit(_check_path, path): path for path in pending}
+    done, not_done = concurrent.futures.wait(futures, timeout=timeout)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    for future in done:
+        for pointer in pending[futures[future]]:
+            missing[pointer] = not future.result()
+
+    return missing, sorted(futures[future] for future in not_done)
+
+
+class MissingImageFilter:
+    """Finds records of image nodes without image or with image whose file doesn't exist.
+
+    Only images used by the nodes are checked, the files of one node tree are checked all at once
+    in parallel when its first image node is tested. All checks share the timeout, None waits for
+    every file. Nodes with images whose files weren't checked in time don't match, they are
+    collected in 'unchecked'.
+    """
+
+    def __init__(self, timeout: float | None = CHECK_TIMEOUT):
+        self.timeout = timeout
+        # Mapping of image pointer -> image is missing, of the images checked in time
+        self.missing: dict[int, bool] = {}
+        self.timed_out: list[str] = []
+        # List of (node tree, node) of image nodes whose image files weren't checked in time
+        self.unchecked: list[tuple[bpy.types.NodeTree, bpy.types.Node]] = []
+        self._checked_trees: set[snapshot.TreeSnapshot] = set()
+        # All checks of one search share the timeout
+        self._deadline: float | None = None
+
+    def _check(self, tree: snapshot.TreeSnapshot) -> None:
+        self._checked_trees.add(tree)
+        images = {}
+        for record in tree.records:
+            if record.image is not None:
+                images[record.image.as_pointer()] = record.image
+        images = [image for pointer, image in images.items() if pointer not in self.missing]
+        if len(images) == 0:
+            return
+
+        start = time.perf_counter()
+        timeout = None
+        if self.timeout is not None:
+            if self._deadline is None:
+                self._deadline = start + self.timeout
+            timeout = max(self._deadline - start, 0.0)
+        missing, timed_out = check_images(images, timeout)
+        self.missing.update(missing)
+        self.timed_out.extend(timed_out)
+        if profiling.PROFILE.enabled:
+            profiling.PROFILE.record_image_checks(
+                len(images), time.perf_counter() - start, len(timed_out)
+            )
+
+    def __call__(self, record: "snapshot.NodeRecord") -> bool:
+        if not record.has_image:
+            return False
+
+        if record.image is None:
+            return True
+
+        if record.tree not in self._checked_trees:
+            self._check(record.tree)
+
+        missing = self.missing.get(record.image.as_pointer())
+        if missing is None:
+            self.unchecked.append((record.tree.node_tree, record.tree.node(record)))
+            return False
+
+        return missing
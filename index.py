@@ -0,0 +1,689 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import bpy
+import re
+import time
+import typing
+import collections
+import itertools
+from . import query
+from . import snapshot
+from . import attributes
+from . import structure
+from . import profiling
+
+try:
+    import re._parser as _sre_parse
+except ImportError:
+    import sre_parse as _sre_parse
+
+# Node properties that are indexed, the group field holds the name of the node tree
+# referenced by a group node.
+FIELD_NAME = "name"
+FIELD_LABEL = "label"
+FIELD_BLIDNAME = "bl_idname"
+FIELD_GROUP = "group"
+FIELDS = (FIELD_NAME, FIELD_LABEL, FIELD_BLIDNAME, FIELD_GROUP)
+
+# Length of the n-grams used to prefilter substring and regex queries
+TRIGRAM_SIZE = 3
+# Time in seconds a regex query can spend matching values of one search, the search is aborted
+# with partial results when it runs out. The budget is checked between the values, one match
+# can't be interrupted, patterns that could take too long are rejected before the search.
+REGEX_BUDGET = 1.0
+
+# Mapping of node tree pointer -> index of its nodes, kept until the node tree changes
+INDICES: dict[int, "NodeTreeIndex"] = {}
+# Mapping of node tree pointer -> change stamp, increased with every depsgraph update of the tree
+# and every change found by its fingerprint
+TREE_VERSIONS: dict[int, int] = collections.defaultdict(int)
+# Increased on every file load, undo and redo, the data used before may not exist anymore
+DATA_GENERATION = 0
+# Increased by every explicit search, node trees are validated at most once per search
+SEARCH_EPOCH = 0
+# Mapping of node tree pointer -> (search epoch, fingerprint) of the last validation
+FINGERPRINTS: dict[int, tuple[int, int]] = {}
+# Maximum number of nodes referenced by search results cached across all node trees
+RESULT_CACHE_SIZE = 100000
+
+
+def field_value(node: bpy.types.Node, field: str) -> str | None:
+    if field == FIELD_GROUP:
+        node_tree = getattr(node, "node_tree", None)
+        return node_tree.name if node_tree is not None else None
+
+    return getattr(node, field)
+
+
+def trigrams(value: str) -> set[str]:
+    return {value[i : i + TRIGRAM_SIZE] for i in range(len(value) - TRIGRAM_SIZE + 1)}
+
+
+def _collect_literals(items: typing.Iterable, runs: list[str], current: str) -> str:
+    for op, arg in items:
+        if op is _sre_parse.LITERAL:
+            current += chr(arg)
+        elif op is _sre_parse.AT:
+            # Zero width anchors don't consume characters, the literal run continues
+            continue
+        elif op is _sre_parse.SUBPATTERN and arg[1] == 0 and arg[2] == 0:
+            current = _collect_literals(arg[3], runs, current)
+        elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT) and arg[0] >= 1:
+            # Content of a repeat is required at least once, but breaks the adjacency
+            runs.append(current)
+            runs.append(_collect_literals(arg[2], runs, ""))
+            current = ""
+        else:
+            runs.append(current)
+            current = ""
+
+    return current
+
+
+def required_literals(pattern: re.Pattern) -> list[str]:
+    """Returns literals that every string matched by the pattern has to contain."""
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return []
+
+    runs = []
+    runs.append(_collect_literals(parsed, runs, ""))
+    if pattern.flags & re.IGNORECASE:
+        runs = [run.lower() for run in runs]
+
+    return [run for run in runs if len(run) >= TRIGRAM_SIZE]
+
+
+_REPEATS = (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT)
+_ASSERTS = (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT)
+# Atomic groups and possessive repeats don't backtrack, they exist since Python 3.11
+_ATOMIC_GROUP = getattr(_sre_parse, "ATOMIC_GROUP", None)
+_POSSESSIVE_REPEAT = getattr(_sre_parse, "POSSESSIVE_REPEAT", None)
+# Marks first characters of alternatives that can't be determined, overlapping with anything
+_ANY_FIRST = None
+# Number of unbounded repeats in a row from which the matching time grows with a high power of
+# the value length, e.g. .*.*.*.*x
+MAX_UNBOUNDED_REPEATS = 3
+
+
+class PatternTimeout(Exception):
+    pass
+
+
+def _first_chars(items: typing.Sequence) -> set | None:
+    """Returns characters the parsed items can start with, None if any character is possible."""
+    for op, arg in items:
+        if op is _sre_parse.LITERAL:
+            return {arg}
+        if op is _sre_parse.AT:
+            continue
+        if op is _sre_parse.SUBPATTERN:
+            return _first_chars(arg[3])
+        if op in _REPEATS and arg[0] >= 1:
+            return _first_chars(arg[2])
+        return _ANY_FIRST
+
+    return set()
+
+
+def _has_overlapping_branch(items: typing.Iterable) -> bool:
+    for op, arg in items:
+        if op is _sre_parse.SUBPATTERN and _has_overlapping_branch(arg[3]):
+            return True
+        if op is _sre_parse.BRANCH:
+            seen = set()
+            for alternative in arg[1]:
+                first = _first_chars(alternative)
+                if first is _ANY_FIRST or not seen.isdisjoint(first):
+                    return True
+                seen |= first
+
+    return False
+
+
+def _count_unbounded(items: typing.Iterable) -> int:
+    """Returns number of unbounded repeats following each other in the sequence of items."""
+    count = 0
+    for op, arg in items:
+        if op in _REPEATS and arg[1] == _sre_parse.MAXREPEAT:
+            count += 1
+        elif op is _sre_parse.SUBPATTERN:
+            count += _count_unbounded(arg[3])
+
+    return count
+
+
+def _nested_items(op: typing.Any, arg: typing.Any) -> list:
+    """Returns the sequences of items nested in one parsed item."""
+    if op in _REPEATS or op is _POSSESSIVE_REPEAT:
+        return [arg[2]]
+    if op is _sre_parse.SUBPATTERN:
+        return [arg[3]]
+    if op in _ASSERTS:
+        return [arg[1]]
+    if op is _sre_parse.BRANCH:
+        return list(arg[1])
+    if op is _sre_parse.GROUPREF_EXISTS:
+        return [x for x in arg[1:] if x is not None]
+    if op is _ATOMIC_GROUP:
+        return [arg]
+
+    return []
+
+
+def _find_backtracking(items: typing.Any) -> str | None:
+    for op, arg in items:
+        if op in _REPEATS and arg[1] > 1:
+            low, high = arg[2].getwidth()
+            # Text matched by the repeat can be split among the iterations in more ways. This
+            # includes nested repeats and alternatives with a common prefix, which sre factors
+            # out, e.g. (a|aa)+ is parsed as (a(?:|a))+.
+            if low != high:
+                return "repeated part matching text of different lengths, e.g. (a+)+ or (a|aa)+"
+            if _has_overlapping_branch(arg[2]):
+                return "repeated alternatives matching the same text, e.g. (a|.)+"
+
+        for nested in _nested_items(op, arg):
+            reason = _find_backtracking(nested)
+            if reason is not None:
+                return reason
+
+    if _count_unbounded(items) > MAX_UNBOUNDED_REPEATS:
+        return "many repetitions in a row, e.g. .*.*.*.*x"
+
+    return None
+
+
+def catastrophic_backtracking_reason(pattern: re.Pattern) -> str | None:
+    """Returns why matching the pattern can take too long, None if it looks safe.
+
+    The check is conservative, it also rejects some patterns which are slow only in theory. Names
+    of nodes are short, so the time of the accepted patterns grows at most with a low power of
+    the value length.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+
+    return _find_backtracking(parsed)
+
+
+class NodeTreeIndex:
+    """Inverted index of searchable node values of one node tree."""
+
+    def __init__(
+        self,
+        node_tree: bpy.types.NodeTree,
+        tree_snapshot: snapshot.TreeSnapshot | None = None,
+        snapshot_seconds: float = 0.0,
+    ):
+        start = time.perf_counter() if profiling.PROFILE.enabled else 0.0
+        self.pointer = node_tree.as_pointer()
+        # Properties of the nodes are read only once here, frames are not considered in the
+        # search currently. The snapshot can be built in steps before.
+        if tree_snapshot is None:
+            tree_snapshot = snapshot.TreeSnapshot(node_tree)
+            snapshot_seconds = time.perf_counter() - start if profiling.PROFILE.enabled else 0.0
+        self.snapshot = tree_snapshot
+        self.nodes: list[bpy.types.Node] = self.snapshot.nodes
+        # Mapping of field -> raw value -> nodes having the value
+        self.values: dict[str, dict[str, list[bpy.types.Node]]] = {
+            field: collections.defaultdict(list) for field in FIELDS
+        }
+        # Lazily built mappings of (field, match_case, exact_match) -> normalized value -> nodes
+        self._normalized: dict[tuple[str, bool, bool], dict[str, list[bpy.types.Node]]] = {}
+        # Lazily built mappings of (field, match_case) -> trigram -> raw values containing it
+        self._trigrams: dict[tuple[str, bool], dict[str, set[str]]] = {}
+        # Raw values which lowercase differently than the regex engine folds them when ignoring
+        # case, these are always considered as candidates of case insensitive queries.
+        self._unfoldable: dict[str, set[str]] = {}
+
+        for record, node in zip(self.snapshot.records, self.nodes):
+            self.values[FIELD_NAME][record.name].append(node)
+            self.values[FIELD_LABEL][record.label].append(node)
+            self.values[FIELD_BLIDNAME][record.bl_idname].append(node)
+            if record.group is not None:
+                self.values[FIELD_GROUP][record.group.name].append(node)
+
+        self.nodes_count = self.snapshot.nodes_count
+        if profiling.PROFILE.enabled:
+            profiling.PROFILE.record_index_build(
+                time.perf_counter() - start + snapshot_seconds, snapshot_seconds
+            )
+
+    def normalized(
+        self, field: str, match_case: bool, exact_match: bool
+    ) -> dict[str, list[bpy.types.Node]]:
+        key = (field, match_case, exact_match)
+        normalized = self._normalized.get(key)
+        if normalized is None:
+            normalized = collections.defaultdict(list)
+            for value, nodes in self.values[field].items():
+                normalized[query.normalize(value, match_case, exact_match)].extend(nodes)
+            self._normalized[key] = normalized
+
+        return normalized
+
+    def trigram_postings(self, field: str, match_case: bool) -> dict[str, set[str]]:
+        key = (field, match_case)
+        postings = self._trigrams.get(key)
+        if postings is None:
+            postings = collections.defaultdict(set)
+            unfoldable = set()
+            for value in self.values[field]:
+                if not match_case and not value.isascii():
+                    unfoldable.add(value)
+                for trigram in trigrams(value if match_case else value.lower()):
+                    postings[trigram].add(value)
+
+            self._trigrams[key] = postings
+            if not match_case:
+                self._unfoldable[field] = unfoldable
+
+        return postings
+
+    def candidates(
+        self, field: str, literals: typing.Iterable[str], match_case: bool
+    ) -> typing.Iterable[str]:
+        """Returns raw values that can contain all the literals, based on their trigrams."""
+        required = set()
+        for literal in literals:
+            required.update(trigrams(literal if match_case else literal.lower()))
+
+        # Queries shorter than a trigram can't be narrowed, all values are candidates
+        if len(required) == 0:
+            return self.values[field].keys()
+
+        postings = self.trigram_postings(field, match_case)
+        found = None
+        for trigram in sorted(required, key=lambda x: len(postings.get(x, ()))):
+            values = postings.get(trigram)
+            if values is None:
+                found = set()
+                break
+            found = set(values) if found is None else found & values
+            if len(found) == 0:
+                break
+
+        if not match_case:
+            found |= self._unfoldable[field]
+
+        return found
+
+    def lookup(
+        self, field: str, search: str, match_case: bool, exact_match: bool
+    ) -> typing.Iterable[bpy.types.Node]:
+        if exact_match:
+            normalized = self.normalized(field, match_case, exact_match)
+            return normalized.get(search if match_case else search.lower(), ())
+
+        if not match_case:
+            search = search.lower()
+
+        values = self.values[field]
+        return itertools.chain.from_iterable(
+            values[value]
+            for value in self.candidates(field, (search,), match_case)
+            if search in (value if match_case else value.lower())
+        )
+
+    def lookup_pattern(
+        self,
+        field: str,
+        pattern: re.Pattern,
+        literals: list[str] | None = None,
+        deadline: float | None = None,
+    ) -> typing.Iterator[bpy.types.Node]:
+        """Yields nodes with values matching the pattern, raises PatternTimeout after deadline."""
+        if literals is None:
+            literals = required_literals(pattern)
+
+        match_case = not pattern.flags & re.IGNORECASE
+        values = self.values[field]
+        match = pattern.match
+        for value in self.candidates(field, literals, match_case):
+            if deadline is not None and time.perf_counter() > deadline:
+                raise PatternTimeout()
+            if match(value):
+                yield from values[value]
+
+
+class IndexQuery:
+    """Text query over the indexed fields, answered by index lookups instead of a node walk."""
+
+    def __init__(
+        self,
+        search: str,
+        fields: typing.Iterable[str],
+        match_case: bool = False,
+        exact_match: bool = False,
+        pattern: re.Pattern | None = None,
+    ):
+        self.search = search
+        self.fields = tuple(fields)
+        self.match_case = match_case
+        self.exact_match = exact_match
+        self.pattern = pattern
+        self.literals = required_literals(pattern) if pattern is not None else []
+        self._matcher = query.compile_matcher(search, match_case, exact_match, pattern)
+        # Regex matching of the whole search is limited by REGEX_BUDGET, only the time spent in
+        # the lookups is counted, not building of the indices or the time between the steps of
+        # the search. The following lookups find nothing after the budget runs out.
+        self.spent = 0.0
+        self.aborted = False
+
+    def find(self, index: NodeTreeIndex) -> set[bpy.types.Node]:
+        found = set()
+        if self.aborted:
+            return found
+
+        for field in self.fields:
+            if len(index.values[field]) == 0:
+                continue
+            if self.pattern is not None:
+                start = time.perf_counter()
+                deadline = start + REGEX_BUDGET - self.spent
+                try:
+                    found.update(index.lookup_pattern(field, self.pattern, self.literals, deadline))
+                except PatternTimeout:
+                    self.aborted = True
+                    break
+                finally:
+                    self.spent += time.perf_counter() - start
+            else:
+                found.update(index.lookup(field, self.search, self.match_case, self.exact_match))
+
+        return found
+
+    def matches(self, node: bpy.types.Node) -> bool:
+        """Checks a single node, used when only few candidate nodes have to be tested."""
+        for field in self.fields:
+            value = field_value(node, field)
+            if value is not None and self._matcher(value):
+                return True
+
+        return False
+
+
+class CachedResult:
+    __slots__ = ("version", "nodes_count", "text_found", "found")
+
+    def __init__(
+        self,
+        version: int,
+        nodes_count: int,
+        text_found: frozenset[bpy.types.Node],
+        found: frozenset[bpy.types.Node],
+    ):
+        self.version = version
+        self.nodes_count = nodes_count
+        # Nodes found by the index query and all nodes matched directly in the node tree
+        self.text_found = text_found
+        self.found = found
+
+
+class ResultCache:
+    """Least recently used cache of (node tree pointer, query key) -> nodes matched in the tree.
+
+    Only the nodes matched in the node tree itself are stored, group nodes found because of their
+    content are resolved from the entries of the nested node trees. An entry is valid while the
+    change stamp and the number of nodes of its node tree stay the same.
+    """
+
+    def __init__(self, size: int = RESULT_CACHE_SIZE):
+        self.size = size
+        self.nodes_count = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict[tuple[int, typing.Hashable], CachedResult] = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, node_tree: bpy.types.NodeTree, key: typing.Hashable) -> CachedResult | None:
+        entry_key = (node_tree.as_pointer(), key)
+        entry = self._entries.get(entry_key)
+        if entry is not None and (
+            entry.version != get_tree_version(node_tree)
+            or entry.nodes_count != len(node_tree.nodes)
+        ):
+            self._pop(entry_key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(entry_key)
+        return entry
+
+    def set(
+        self,
+        node_tree: bpy.types.NodeTree,
+        key: typing.Hashable,
+        text_found: typing.Iterable[bpy.types.Node],
+        found: typing.Iterable[bpy.types.Node],
+    ) -> None:
+        entry_key = (node_tree.as_pointer(), key)
+        self._pop(entry_key)
+        entry = CachedResult(
+            get_tree_version(node_tree),
+            len(node_tree.nodes),
+            frozenset(text_found),
+            frozenset(found),
+        )
+        self._entries[entry_key] = entry
+        self.nodes_count += len(entry.found) + 1
+        while self.nodes_count > self.size and len(self._entries) > 1:
+            self._pop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nodes_count = 0
+
+    def _pop(self, entry_key: tuple[int, typing.Hashable]) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self.nodes_count -= len(entry.found) + 1
+
+
+RESULT_CACHE = ResultCache()
+# Attribute names of all geometry node trees, updated from their indices when used
+ATTRIBUTE_INDEX = attributes.FileAttributeIndex()
+# Structural hashes of node trees, computed from their indices when used
+STRUCTURE_HASHES = structure.StructureHashes(lambda node_tree: snapshot_steps(node_tree))
+
+
+def tree_fingerprint(node_tree: bpy.types.NodeTree) -> int:
+    """Summary of the node tree data read by the index and the snapshot.
+
+    Changes when nodes or links are added, removed or relinked, when nodes are renamed or
+    relabeled, when group nodes reference another node tree, image nodes another image and when
+    attribute names change.
+    """
+    return hash(
+        (
+            tuple(
+                [
+                    (
+                        x.name,
+                        x.label,
+                        getattr(x, "node_tree", None),
+                        getattr(x, "image", None),
+                        snapshot.get_attribute_name(x),
+                    )
+                    for x in node_tree.nodes
+                ]
+            ),
+            tuple(
+                [
+                    (
+                        x.from_node.name,
+                        x.from_socket.identifier,
+                        x.to_node.name,
+                        x.to_socket.identifier,
+                        x.is_muted,
+                    )
+                    for x in node_tree.links
+                ]
+            ),
+        )
+    )
+
+
+def begin_search() -> None:
+    """Starts an explicit search, node trees used by it are validated again."""
+    global SEARCH_EPOCH
+    SEARCH_EPOCH += 1
+
+
+def validate(node_tree: bpy.types.NodeTree) -> None:
+    """Invalidates the node tree if it changed since it was last validated.
+
+    The depsgraph reports only changes of the evaluated data, e.g. edits of node groups not used
+    by any object are missed, so the fingerprint of the node tree is compared once per search.
+    Drawing and event handling rely on the change stamp alone.
+    """
+    pointer = node_tree.as_pointer()
+    previous = FINGERPRINTS.get(pointer)
+    if previous is not None and previous[0] == SEARCH_EPOCH:
+        return
+
+    start = time.perf_counter() if profiling.PROFILE.enabled else 0.0
+    fingerprint = tree_fingerprint(node_tree)
+    if profiling.PROFILE.enabled:
+        profiling.PROFILE.record_validation(time.perf_counter() - start)
+    FINGERPRINTS[pointer] = (SEARCH_EPOCH, fingerprint)
+    if previous is not None and previous[1] != fingerprint:
+        invalidate(node_tree)
+
+
+def get_index(node_tree: bpy.types.NodeTree, validate_: bool = True) -> NodeTreeIndex:
+    return snapshot.run_steps(index_steps(node_tree, validate_))
+
+
+def index_steps(
+    node_tree: bpy.types.NodeTree, validate_: bool = True
+) -> snapshot.Steps[NodeTreeIndex]:
+    """Same as 'get_index', a missing index is built in steps of the snapshot build."""
+    if validate_:
+        validate(node_tree)
+    pointer = node_tree.as_pointer()
+    index = INDICES.get(pointer)
+    if index is not None:
+        return index
+
+    version = TREE_VERSIONS[pointer]
+    snapshot_seconds = 0.0
+    steps = snapshot.TreeSnapshot.build_steps(node_tree)
+    while True:
+        start = time.perf_counter()
+        try:
+            next(steps)
+        except StopIteration as e:
+            tree_snapshot = e.value
+            break
+        finally:
+            snapshot_seconds += time.perf_counter() - start
+        yield
+
+    index = NodeTreeIndex(node_tree, tree_snapshot, snapshot_seconds)
+    # The node tree could change between the steps, the index is used but not kept then
+    if TREE_VERSIONS[pointer] == version:
+        INDICES[pointer] = index
+    return index
+
+
+def snapshot_steps(node_tree: bpy.types.NodeTree) -> snapshot.Steps[snapshot.TreeSnapshot]:
+    index = yield from index_steps(node_tree)
+    return index.snapshot
+
+
+def get_attribute_index(validate_: bool = False) -> attributes.FileAttributeIndex:
+    """Returns the attribute index updated with the geometry node trees changed since last use.
+
+    Only searches validate the node trees, suggestions and panels are drawn too often for that.
+    """
+    return snapshot.run_steps(attribute_index_steps(validate_))
+
+
+def attribute_index_steps(validate_: bool = False) -> snapshot.Steps[attributes.FileAttributeIndex]:
+    """Same as 'get_attribute_index', the indices and the attributes are collected in steps."""
+    snapshots = []
+    for node_tree in bpy.data.node_groups:
+        if node_tree.bl_idname == 'GeometryNodeTree':
+            index = yield from index_steps(node_tree, validate_)
+            snapshots.append(index.snapshot)
+
+    yield from ATTRIBUTE_INDEX.update_steps(snapshots)
+    return ATTRIBUTE_INDEX
+
+
+def get_tree_version(node_tree: bpy.types.NodeTree) -> int:
+    """Returns the change stamp of the node tree without validating it, cheap enough for drawing."""
+    # The stamp is stored on the first query, so clearing after undo or load changes it
+    return TREE_VERSIONS[node_tree.as_pointer()]
+
+
+def invalidate(node_tree: bpy.types.NodeTree) -> None:
+    pointer = node_tree.as_pointer()
+    TREE_VERSIONS[pointer] += 1
+    INDICES.pop(pointer, None)
+
+
+def updated_node_trees(
+    depsgraph: bpy.types.Depsgraph,
+) -> typing.Iterator[bpy.types.NodeTree]:
+    for update in depsgraph.updates:
+        id_ = update.id.original
+        if isinstance(id_, bpy.types.NodeTree):
+            yield id_
+        # Node trees embedded in materials and worlds are reported through their owner. Scenes
+        # are updated by almost any edit, their compositor node trees are left to validation.
+        elif isinstance(id_, (bpy.types.Material, bpy.types.World)) and id_.node_tree is not None:
+            yield id_.node_tree
+
+
+@bpy.app.handlers.persistent
+def _depsgraph_update_post(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph):
+    for node_tree in updated_node_trees(depsgraph):
+        invalidate(node_tree)
+
+
+@bpy.app.handlers.persistent
+def _clear_indices(*args):
+    global DATA_GENERATION
+    DATA_GENERATION += 1
+    # Pointers of the data are not stable across file loads and undo steps, the versions are
+    # increased instead of cleared, so no stamp is ever reused for different data.
+    INDICES.clear()
+    FINGERPRINTS.clear()
+    RESULT_CACHE.clear()
+    ATTRIBUTE_INDEX.clear()
+    STRUCTURE_HASHES.clear()
+    for pointer in TREE_VERSIONS:
+        TREE_VERSIONS[pointer] += 1
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(_depsgraph_update_post)
+    bpy.app.handlers.load_post.append(_clear_indices)
+    bpy.app.handlers.undo_post.append(_clear_indices)
+    bpy.app.handlers.redo_post.append(_clear_indices)
+
+
+def unregister():
+    bpy.app.handlers.redo_post.remove(_clear_indices)
+    bpy.app.handlers.undo_post.remove(_clear_indices)
+    bpy.app.handlers.load_post.remove(_clear_indices)
+    bpy.app.handlers.depsgraph_update_post.remove(_depsgraph_update_post)
+    INDICES.clear()
+    FINGERPRINTS.clear()
+    RESULT_CACHE.clear()
+    ATTRIBUTE_INDEX.clear()
+    STRUCTURE_HASHES.clear()
@@ -2,6 +2,20 @@
 
 import bpy
 import typing
+from . import index
+
+
+def _attribute_search_suggestions(
+    self, context: bpy.types.Context, edit_text: str
+) -> list[tuple[str, str]]:
+    # Names used by the geometry node trees of the file, with their usage as description
+    attribute_index = index.get_attribute_index()
+    edit_text = edit_text.lower()
+    return [
+        (name, attribute_index.usages[name].description())
+        for name in attribute_index.names()
+        if edit_text in name.lower()
+    ]
 
 
 class Preferences(bpy.types.AddonPreferences):
@@ -22,6 +36,19 @@ class Preferences(bpy.types.AddonPreferences):
         description="If toggled, then only exact matches of the input will be searched",
     )
 
+    live_search: bpy.props.BoolProperty(
+        name="Search As You Type",
+        description="If toggled, then the results are updated while the search input is typed",
+        default=True,
+    )
+
+    time_sliced_search: bpy.props.BoolProperty(
+        name="Search In Steps",
+        description="If toggled, then the search runs in small steps without blocking the "
+        "interface, showing partial results. The search can be cancelled by Esc",
+        default=False,
+    )
+
     highlight_color: bpy.props.FloatVectorProperty(
         name="Highlight Color",
         description="Highlight color of the found nodes overlay",
@@ -54,6 +81,45 @@ class Preferences(bpy.types.AddonPreferences):
         default=25.0,
     )
 
+    occurrence_count: bpy.props.EnumProperty(
+        name="Occurrence Count",
+        description="How the found nodes inside node groups are counted",
+        items=(
+            (
+                'INSTANCE',
+                "Count Per Instance",
+                "Count the found nodes again for every use of their node group",
+            ),
+            (
+                'UNIQUE',
+                "Count Unique",
+                "Count each found node once, even if its node group is used several times",
+            ),
+        ),
+        default='INSTANCE',
+    )
+
+    navigation_order: bpy.props.EnumProperty(
+        name="Navigation Order",
+        description="Order in which the found nodes are visited by Previous and Next",
+        items=(
+            ('NAME', "By Name", "Visit the found nodes sorted by their name"),
+            ('READING', "Reading Order", "Visit the found nodes in rows from top left"),
+            (
+                'NEAREST',
+                "Nearest Node",
+                "Always visit the nearest found node, so the view moves as little as possible",
+            ),
+        ),
+        default='NAME',
+    )
+    navigate_into_node_groups: bpy.props.BoolProperty(
+        name="Navigate Into Node Groups",
+        description="If toggled, then Previous and Next enter node groups to visit the found "
+        "nodes inside of them",
+        default=False,
+    )
+
     search_in_name: bpy.props.BoolProperty(
         name="Search in \"Name\"",
         description="If toggled, then what is in \"Search\" will be searched in node \"Name\"",
@@ -69,6 +135,21 @@ class Preferences(bpy.types.AddonPreferences):
         description="If toggled, then what is in \"Search\" will be searched in node \"Node Type\" (.bl_idname)",
         default=False,
     )
+    search_scope: bpy.props.EnumProperty(
+        name="Search Scope",
+        description="Which node trees are searched",
+        items=(
+            ('TREE', "Node Tree", "Search in the current node tree", 'NODETREE', 0),
+            (
+                'FILE',
+                "Whole File",
+                "Search in node trees of all materials, worlds, lights, node groups and compositor",
+                'FILE_BLEND',
+                1,
+            ),
+        ),
+        default='TREE',
+    )
     search_in_node_groups: bpy.props.BoolProperty(
         name="Search in Node Groups",
         description="If toggled, then we will search also the inside of node groups in current node tree",
@@ -91,6 +172,43 @@ class Preferences(bpy.types.AddonPreferences):
         description="If toggled, the search will include nodes that have missing node groups",
         default=False,
     )
+    search_duplicate_node_groups: bpy.props.BoolProperty(
+        name="Search Duplicate Node Groups",
+        description="If toggled, the search will include group nodes using a node group that is "
+        "structurally equal to another node group in the file",
+        default=False,
+    )
+    search_duplicate_subgraphs: bpy.props.BoolProperty(
+        name="Search Duplicate Subgraphs",
+        description="If toggled, the search will include nodes whose upstream nodes and links "
+        "are repeated elsewhere in the file",
+        default=False,
+    )
+    search_not_contributing: bpy.props.BoolProperty(
+        name="Search Nodes Not Contributing",
+        description="If toggled, the search will include nodes whose links don't lead to any "
+        "output node of their node tree",
+        default=False,
+    )
+
+    # Search by links to the selected nodes
+    search_selection_relation: bpy.props.EnumProperty(
+        name="Linked to Selection",
+        description="Search nodes linked to the selected nodes",
+        items=(
+            ('NONE', "Ignore Selection", "Don't search by links to the selected nodes"),
+            ('UPSTREAM', "Upstream", "Search nodes whose links lead to the selected nodes"),
+            ('DOWNSTREAM', "Downstream", "Search nodes which the selected nodes lead to"),
+            ('NEARBY', "Within Hops", "Search nodes at most 'Hops' links away from the selection"),
+        ),
+        default='NONE',
+    )
+    selection_hops: bpy.props.IntProperty(
+        name="Hops",
+        description="Maximum number of links between the found nodes and the selected nodes",
+        min=1,
+        default=2,
+    )
 
     search_in_attribute: bpy.props.BoolProperty(
         name="Search in Attributes",
@@ -100,6 +218,8 @@ class Preferences(bpy.types.AddonPreferences):
     attribute_search: bpy.props.StringProperty(
         name="Attribute Search",
         description="Text to search inside attributes when \"Filter by Attribute\" is toggled",
+        search=_attribute_search_suggestions,
+        search_options={'SORT', 'SUGGESTION'},
     )
 
 
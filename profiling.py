@@ -0,0 +1,131 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Optional instrumentation of the search and the overlay. Everything is measured only while the
+# profiling is enabled, otherwise the instrumented code only checks the flag or isn't wrapped.
+
+import time
+import typing
+
+
+class PredicateProfile:
+    __slots__ = ("calls", "hits", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {"calls": self.calls, "hits": self.hits, "seconds": self.seconds}
+
+
+class Profile:
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.searches = 0
+        self.search_seconds = 0.0
+        self.last_search_seconds = 0.0
+        self.trees_visited = 0
+        self.nodes_visited = 0
+        self.nodes_found = 0
+        # Time spent answering the text query from the node tree indices
+        self.text_seconds = 0.0
+        self.predicates: dict[str, PredicateProfile] = {}
+        # Builds of the node tree indices, the snapshots read the nodes through RNA
+        self.index_builds = 0
+        self.index_seconds = 0.0
+        self.snapshot_seconds = 0.0
+        # Checks of the node tree fingerprints, also reading the nodes
+        self.validations = 0
+        self.validation_seconds = 0.0
+        self.image_checks = 0
+        self.image_check_seconds = 0.0
+        self.image_timeouts = 0
+        self.overlay_frames = 0
+        self.overlay_rebuilds = 0
+        self.overlay_seconds = 0.0
+        self.overlay_batches = 0
+
+    def timed(self, name: str, function: typing.Callable[[typing.Any], bool]):
+        """Returns the function wrapped to measure its time and hits."""
+        profile = self.predicates.setdefault(name, PredicateProfile())
+
+        def _timed(record: typing.Any) -> bool:
+            start = time.perf_counter()
+            hit = function(record)
+            profile.seconds += time.perf_counter() - start
+            profile.calls += 1
+            if hit:
+                profile.hits += 1
+            return hit
+
+        return _timed
+
+    def record_search(
+        self, seconds: float, trees_visited: int, nodes_visited: int, nodes_found: int
+    ) -> None:
+        self.searches += 1
+        self.search_seconds += seconds
+        self.last_search_seconds = seconds
+        self.trees_visited += trees_visited
+        self.nodes_visited += nodes_visited
+        self.nodes_found += nodes_found
+
+    def record_index_build(self, seconds: float, snapshot_seconds: float) -> None:
+        self.index_builds += 1
+        self.index_seconds += seconds
+        self.snapshot_seconds += snapshot_seconds
+
+    def record_validation(self, seconds: float) -> None:
+        self.validations += 1
+        self.validation_seconds += seconds
+
+    def record_image_checks(self, count: int, seconds: float, timeouts: int) -> None:
+        self.image_checks += count
+        self.image_check_seconds += seconds
+        self.image_timeouts += timeouts
+
+    def record_overlay_frame(self, seconds: float, batches: int, rebuilt: bool) -> None:
+        self.overlay_frames += 1
+        self.overlay_seconds += seconds
+        self.overlay_batches = batches
+        if rebuilt:
+            self.overlay_rebuilds += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "search": {
+                "searches": self.searches,
+                "seconds": self.search_seconds,
+                "last_seconds": self.last_search_seconds,
+                "text_seconds": self.text_seconds,
+                "trees_visited": self.trees_visited,
+                "nodes_visited": self.nodes_visited,
+                "nodes_found": self.nodes_found,
+            },
+            "predicates": {name: x.to_dict() for name, x in self.predicates.items()},
+            "index": {
+                "builds": self.index_builds,
+                "seconds": self.index_seconds,
+                "snapshot_seconds": self.snapshot_seconds,
+                "validations": self.validations,
+                "validation_seconds": self.validation_seconds,
+            },
+            "images": {
+                "checked": self.image_checks,
+                "seconds": self.image_check_seconds,
+                "timeouts": self.image_timeouts,
+            },
+            "overlay": {
+                "frames": self.overlay_frames,
+                "rebuilds": self.overlay_rebuilds,
+                "seconds": self.overlay_seconds,
+                "batches": self.overlay_batches,
+            },
+        }
+
+
+PROFILE = Profile()
@@ -0,0 +1,140 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Matching of the searched values and the plan in which the search predicates are evaluated.
+
+import re
+import time
+import typing
+
+PredicateType = typing.Callable[[typing.Any], bool]
+
+# Used to remove the duplicate suffix from the node name
+DUPLICATE_SUFFIX_PATTERN = re.compile(r"\.\d\d\d+$")
+
+# Number of nodes on which all predicates of a plan are timed before the plan is reordered
+CALIBRATION_SAMPLES = 32
+# Hit rate is clamped so predicates that never matched yet aren't considered infinitely bad
+MIN_HIT_RATE = 0.01
+# Weight of the newly measured values in the running statistics of predicates
+STATS_WEIGHT = 0.5
+
+
+def normalize(value: str, match_case: bool, exact_match: bool) -> str:
+    if exact_match and DUPLICATE_SUFFIX_PATTERN.search(value):
+        value = value.rsplit(".", 1)[0]
+    return value if match_case else value.lower()
+
+
+def compile_matcher(
+    search: str,
+    match_case: bool = False,
+    exact_match: bool = False,
+    pattern: re.Pattern | None = None,
+) -> typing.Callable[[str], bool]:
+    """Returns function matching values against the search, the search is normalized once."""
+    if pattern is not None:
+        match = pattern.match
+        return lambda value: match(value) is not None
+
+    search = search if match_case else search.lower()
+    if exact_match:
+        return lambda value: normalize(value, match_case, True) == search
+    if match_case:
+        return lambda value: search in value
+
+    return lambda value: search in value.lower()
+
+
+class PredicateStats:
+    __slots__ = ("cost", "hit_rate")
+
+    def __init__(self, cost: float, hit_rate: float = 0.5):
+        self.cost = cost
+        self.hit_rate = hit_rate
+
+    def update(self, cost: float, hit_rate: float) -> None:
+        self.cost += (cost - self.cost) * STATS_WEIGHT
+        self.hit_rate += (hit_rate - self.hit_rate) * STATS_WEIGHT
+
+    @property
+    def rank(self) -> float:
+        # Predicates are combined by OR, the cheapest predicate per found node goes first
+        return self.cost / max(self.hit_rate, MIN_HIT_RATE)
+
+
+# Mapping of predicate name -> statistics measured in previous searches. Costs are in seconds,
+# the initial estimates only have to be in the right proportions.
+PREDICATE_STATS: dict[str, PredicateStats] = {}
+
+
+class Predicate:
+    def __init__(self, name: str, function: PredicateType, cost: float = 1e-6):
+        self.name = name
+        self.function = function
+        self.stats = PREDICATE_STATS.setdefault(name, PredicateStats(cost))
+
+
+def fuse(functions: typing.Sequence[PredicateType]) -> PredicateType:
+    """Combines the functions by OR into a single function with a short-circuit."""
+    if len(functions) == 0:
+        return lambda node: False
+    if len(functions) == 1:
+        return functions[0]
+    if len(functions) == 2:
+        first, second = functions
+        return lambda node: bool(first(node) or second(node))
+
+    def _fused(node: typing.Any) -> bool:
+        for function in functions:
+            if function(node):
+                return True
+        return False
+
+    return _fused
+
+
+class QueryPlan:
+    """Predicates of a search, ordered by their cost and selectivity and fused together.
+
+    The first nodes are checked by every predicate and timed, then the measured statistics
+    reorder the predicates and the plan switches to the fused predicate without any overhead.
+    """
+
+    def __init__(self, predicates: typing.Iterable[Predicate]):
+        self.predicates = sorted(predicates, key=lambda x: x.stats.rank)
+        self._samples = 0
+        self._sample_times = [0.0] * len(self.predicates)
+        self._sample_hits = [0] * len(self.predicates)
+        self.matches: PredicateType = (
+            self._calibrating_matches if len(self.predicates) > 0 else fuse(())
+        )
+
+    def __len__(self) -> int:
+        return len(self.predicates)
+
+    def _calibrating_matches(self, node: typing.Any) -> bool:
+        result = False
+        for i, predicate in enumerate(self.predicates):
+            start = time.perf_counter()
+            hit = predicate.function(node)
+            self._sample_times[i] += time.perf_counter() - start
+            if hit:
+                self._sample_hits[i] += 1
+                result = True
+
+        self._samples += 1
+        if self._samples >= CALIBRATION_SAMPLES:
+            self.finish_calibration()
+
+        return result
+
+    def finish_calibration(self) -> None:
+        if self._samples > 0:
+            for i, predicate in enumerate(self.predicates):
+                predicate.stats.update(
+                    self._sample_times[i] / self._samples, self._sample_hits[i] / self._samples
+                )
+
+            self.predicates.sort(key=lambda x: x.stats.rank)
+
+        self.matches = fuse(tuple(predicate.function for predicate in self.predicates))
@@ -1,211 +1,691 @@
 # copyright (c) Zdenek Dolezal 2024-*
 
 import bpy
-import os
+import bpy_extras.io_utils
 import re
+import json
+import time
 import typing
 import collections
 import itertools
+import numpy
 from . import prefs
 from . import draw
-
+from . import index
+from . import query
+from . import images
+from . import snapshot
+from . import attributes
+from . import structure
+from . import profiling
 
 CLASSES = []
 # Mapping of node tree -> number of occurrences in last search
 NODE_TREE_NODES = {}
-# Mapping of found nodes to number of occurances of searched nodes
+# Mapping of node tree -> number of found nodes inside, per group node instance and unique
 NODE_TREE_OCCURRENCES = {}
-
-# Pattern related values, when using regexp variant of search
-PATTERN = re.Pattern | None
+NODE_TREE_UNIQUE_OCCURRENCES = {}
+# Increased whenever the results above change, so the overlay knows when to redraw
+RESULTS_VERSION = 0
+# Results of the whole file search grouped by the data-block owning the node tree,
+# list of (data-block type, data-block name, number of found nodes)
+FILE_RESULTS: list[tuple[str, str, int]] = []
+# Mapping of node tree pointer -> (node tree, its version) of trees with results, used to
+# identify the updated node trees in depsgraph updates.
+RESULT_TREES: dict[int, tuple[bpy.types.NodeTree, int]] = {}
+# Search whose results are displayed, its occurrences are counted again when found nodes are
+# removed
+RESULT_SEARCH: typing.Optional["NodeSearch"] = None
+# Sizes of the data collections that own node trees, removal of data changes them
+_DATA_SIZES: tuple[int, ...] = ()
+
+# Error of the typed search used as regular expression, shown in the search dialog
 PATTERN_COMPILE_ERROR: str | None = None
 
-# Used to remove the duplicate suffix from the node name
-DUPLICATE_SUFFIX_PATTERN = re.compile(r"\.\d\d\d+$")
+# Delay in seconds after the last change of the search input before the live search runs
+LIVE_SEARCH_DELAY = 0.15
 
+# Time in seconds the search in steps can run in one timer tick and interval of the ticks
+SEARCH_STEP_BUDGET = 0.02
+SEARCH_STEP_INTERVAL = 0.01
 
-FilterType = typing.Callable[[bpy.types.Node, str, bool], bool]
+# Height of the rows in node editor units in which the nodes are ordered for the navigation
+NAVIGATION_ROW_HEIGHT = 200.0
 
 
 class NodeSearch:
     def __init__(
         self,
         node_tree: bpy.types.NodeTree,
-        filters: set[FilterType],
+        query_plan: query.QueryPlan,
         search_in_node_groups: bool = True,
+        index_query: index.IndexQuery | None = None,
+        previous: typing.Optional["NodeSearch"] = None,
+        cache_key: typing.Hashable | None = None,
     ):
         self.node_tree = node_tree
-        self.filters = filters
+        self.query_plan = query_plan
         self.search_in_node_groups = search_in_node_groups
+        self.index_query = index_query
+        # Search with query that is less strict than this one, only its results are re-checked
+        self.previous = previous
+        # Identifies the query in the result cache, results aren't cached if None
+        self.cache_key = cache_key
         self.node_tree_finds: dict[bpy.types.NodeTree, bpy.types.Node] = {}
+        # Mapping of node tree -> its snapshot the search ran on
+        self.snapshots: dict[bpy.types.NodeTree, snapshot.TreeSnapshot] = {}
+        # Mapping of node tree -> nodes found by the index query
+        self.text_finds: dict[bpy.types.NodeTree, set[bpy.types.Node]] = {}
+        # Mapping of node tree -> number of found nodes inside it, counted per group node instance
+        # and counting each found node once.
         self.node_tree_leaf_nodes_count: dict[bpy.types.NodeTree, int] = collections.defaultdict(
             int
         )
+        self.node_tree_unique_nodes_count: dict[bpy.types.NodeTree, int] = {}
         self.all_found_nodes: set[bpy.types.Node] = set()
+        # Checks of the image files, set if missing images are searched
+        self.image_filter: images.MissingImageFilter | None = None
+        # Steps preparing the predicates which need data of other node trees, run before the
+        # search, so the hashing and indexing of the node trees can be interrupted too
+        self.preparations: list[typing.Callable[[], snapshot.Steps[None]]] = []
+        # Progress of the search, number of node trees and nodes that were processed
+        self.visited_trees = 0
+        self.visited_nodes = 0
+
+    @property
+    def unchecked_images(self) -> list[tuple[bpy.types.NodeTree, bpy.types.Node]]:
+        """Image nodes whose image files weren't checked in time, they aren't in the results."""
+        return self.image_filter.unchecked if self.image_filter is not None else []
+
+    @property
+    def aborted(self) -> bool:
+        """True if the regex matching ran out of time and only partial results were found."""
+        return self.index_query is not None and self.index_query.aborted
 
     def search(self) -> set[bpy.types.Node]:
-        self._search_and_recurse(self.node_tree)
-        self.node_tree_leaf_nodes_count[self.node_tree] = self._leaf_nodes_count(self.node_tree)
+        start = time.perf_counter()
+        for _ in self.iter_search():
+            pass
+        if profiling.PROFILE.enabled:
+            self.record_profile(time.perf_counter() - start)
         return self.all_found_nodes
 
+    def record_profile(self, seconds: float) -> None:
+        profiling.PROFILE.record_search(
+            seconds, self.visited_trees, self.visited_nodes, len(self.all_found_nodes)
+        )
+
+    def iter_search(self) -> typing.Iterator[None]:
+        """Searches step by step, so the search can be interrupted after any step.
+
+        Results found so far are available in 'node_tree_finds' between the steps.
+        """
+        yield from self._prepare()
+        yield from self._search_and_recurse(self.node_tree)
+        # Store the measured statistics of the predicates also for small node trees
+        self.query_plan.finish_calibration()
+        self.count_occurrences()
+
+    def _prepare(self) -> typing.Iterator[None]:
+        for prepare in self.preparations:
+            yield from prepare()
+
     def _search_and_recurse(
         self, node_tree: bpy.types.NodeTree, depth: int = 0
-    ) -> set[bpy.types.Node]:
+    ) -> typing.Iterator[None]:
         if node_tree in self.node_tree_finds:
-            return self.node_tree_finds[node_tree]
+            return
         else:
             self.node_tree_finds[node_tree] = set()
 
-        for node in node_tree.nodes:
-            # Frames are not considered in the search currently
-            if isinstance(node, bpy.types.NodeFrame):
-                continue
-
-            if (
-                hasattr(node, "node_tree")
-                and node.node_tree is not None
-                and self.search_in_node_groups
-                and node.node_tree != self.node_tree
-            ):
-                self._search_and_recurse(node.node_tree, depth + 1)
+        self.visited_trees += 1
+
+        tree_index = yield from index.index_steps(node_tree)
+        self.snapshots[node_tree] = tree_index.snapshot
+        finds = self.node_tree_finds[node_tree]
+        previous_finds = None
+        if self.previous is not None:
+            previous_finds = self.previous.node_tree_finds.get(node_tree)
+
+        cached = None
+        # Results of an aborted search are partial, they are neither served nor stored
+        if self.cache_key is not None and not self.aborted:
+            cached = index.RESULT_CACHE.get(node_tree, self.cache_key)
+
+        text_found = set()
+        if cached is not None:
+            text_found = set(cached.text_found)
+            self.all_found_nodes.update(cached.found)
+            finds.update(cached.found)
+        elif self.index_query is not None:
+            if previous_finds is not None:
+                text_found = {
+                    node
+                    for node in self.previous.text_finds.get(node_tree, ())
+                    if self.index_query.matches(node)
+                }
+            elif profiling.PROFILE.enabled:
+                start = time.perf_counter()
+                text_found = self.index_query.find(tree_index)
+                profiling.PROFILE.text_seconds += time.perf_counter() - start
+            else:
+                text_found = self.index_query.find(tree_index)
+            self.all_found_nodes.update(text_found)
+            finds.update(text_found)
+            yield
+
+        if self.index_query is not None:
+            self.text_finds[node_tree] = text_found
+
+        tree_snapshot = tree_index.snapshot
+        # Node groups without previous results can't contain any results of a refined query
+        group_records = tree_snapshot.group_records
+        if previous_finds is not None:
+            group_records = [
+                record for record in group_records if tree_snapshot.node(record) in previous_finds
+            ]
+
+        if self.search_in_node_groups:
+            for record in group_records:
+                if record.group == self.node_tree:
+                    continue
+
+                yield from self._search_and_recurse(record.group, depth + 1)
                 # If any nodes are found inside the node group, we add the node group to the result
-                if len(self.node_tree_finds[node.node_tree]) > 0:
-                    self.node_tree_finds[node_tree].add(node)
-
-            # If any filter returns True for given node, we consider it in the result
-            for filter_ in self.filters:
-                if filter_(node):
-                    self.all_found_nodes.add(node)
-                    self.node_tree_finds[node_tree].add(node)
-                    break
+                if len(self.node_tree_finds[record.group]) > 0:
+                    finds.add(tree_snapshot.node(record))
 
-        return self.all_found_nodes
+        # Group nodes found because of their content are resolved above even for cached results
+        if cached is not None:
+            return
 
-    def _leaf_nodes_count(self, node_tree: bpy.types.NodeTree) -> int:
-        if node_tree in self.node_tree_leaf_nodes_count:
-            return self.node_tree_leaf_nodes_count[node_tree]
+        if len(self.query_plan) == 0:
+            self.visited_nodes += len(tree_index.nodes)
+            self._cache_result(node_tree, text_found, text_found)
+            return
+
+        records = tree_snapshot.records
+        if previous_finds is not None:
+            records = [record for record in records if tree_snapshot.node(record) in previous_finds]
 
-        for node in node_tree.nodes:
-            if node not in self.node_tree_finds[node_tree]:
+        matched = set(text_found)
+        for record in records:
+            self.visited_nodes += 1
+            node = tree_snapshot.node(record)
+            if node in self.all_found_nodes:
                 continue
 
-            if hasattr(node, "node_tree") and node.node_tree is not None and node.node_tree != self.node_tree:
-                self.node_tree_leaf_nodes_count[node_tree] = self._leaf_nodes_count(node.node_tree)
-            else:
-                self.node_tree_leaf_nodes_count[node_tree] += 1
+            # If any predicate of the plan returns True for given node, we consider it in the result
+            if self.query_plan.matches(record):
+                self.all_found_nodes.add(node)
+                finds.add(node)
+                matched.add(node)
+            yield
 
-        return self.node_tree_leaf_nodes_count[node_tree]
+        self._cache_result(node_tree, text_found, matched)
 
+    def _cache_result(
+        self,
+        node_tree: bpy.types.NodeTree,
+        text_found: set[bpy.types.Node],
+        matched: set[bpy.types.Node],
+    ) -> None:
+        if self.cache_key is not None and not self.aborted:
+            index.RESULT_CACHE.set(node_tree, self.cache_key, text_found, matched)
+
+    def count_occurrences(self) -> None:
+        """Counts found nodes inside each node tree, again after found nodes are removed."""
+        # Node trees of the found group nodes, once for every group node instance
+        children: dict[bpy.types.NodeTree, list[bpy.types.NodeTree]] = {}
+        # Number of nodes found directly in each node tree, not because of their content
+        direct: dict[bpy.types.NodeTree, int] = {}
+        for node_tree, finds in self.node_tree_finds.items():
+            tree_snapshot = self.snapshots[node_tree]
+            children[node_tree] = [
+                record.group
+                for record in tree_snapshot.group_records
+                if record.group != self.node_tree
+                and record.group in self.node_tree_finds
+                and tree_snapshot.node(record) in finds
+            ]
+            direct[node_tree] = sum(1 for node in finds if node in self.all_found_nodes)
+
+        counts, unique_counts = snapshot.count_occurrences(children, direct)
+        self.node_tree_leaf_nodes_count.clear()
+        self.node_tree_leaf_nodes_count.update(counts)
+        self.node_tree_unique_nodes_count.clear()
+        self.node_tree_unique_nodes_count.update(unique_counts)
+
+
+def get_file_node_trees() -> list[tuple[bpy.types.ID, bpy.types.NodeTree]]:
+    """Returns (owner, node tree) of all node trees in the file, node group is its own owner."""
+    data = bpy.data
+    ret = []
+    for owner in itertools.chain(data.materials, data.worlds, data.lights):
+        if owner.node_tree is not None:
+            ret.append((owner, owner.node_tree))
+
+    for scene in data.scenes:
+        # Compositor node tree, renamed in newer Blender versions
+        node_tree = getattr(scene, "compositing_node_group", None) or getattr(
+            scene, "node_tree", None
+        )
+        if node_tree is not None:
+            ret.append((scene, node_tree))
 
-def get_context_found_nodes(context: bpy.types.Context) -> set[bpy.types.Node]:
-    """Returns found nodes based on the current context."""
-    if not hasattr(context.space_data, "edit_tree"):
-        return set()
+    ret.extend((node_group, node_group) for node_group in data.node_groups)
+    return ret
 
-    return NODE_TREE_NODES.get(context.space_data.edit_tree, set())
 
+class FileNodeSearch(NodeSearch):
+    """Searches all node trees of the file, node groups shared by many owners are searched once."""
 
-def get_all_found_nodes(include_nodegroups: bool = False) -> set[bpy.types.Node]:
-    ret = set()
-    for node in itertools.chain(*NODE_TREE_NODES.values()):
-        if not include_nodegroups and hasattr(node, "node_tree"):
-            continue
+    def __init__(
+        self,
+        query_plan: query.QueryPlan,
+        search_in_node_groups: bool = True,
+        index_query: index.IndexQuery | None = None,
+        previous: NodeSearch | None = None,
+        cache_key: typing.Hashable | None = None,
+    ):
+        super().__init__(None, query_plan, search_in_node_groups, index_query, previous, cache_key)
+        self.owners = get_file_node_trees()
+
+    def iter_search(self) -> typing.Iterator[None]:
+        yield from self._prepare()
+        # The found nodes of each node tree are shared, so every node tree is searched once
+        for _, node_tree in self.owners:
+            yield from self._search_and_recurse(node_tree)
+
+        self.query_plan.finish_calibration()
+        self.count_occurrences()
+
+    def get_owner_results(self) -> list[tuple[str, str, int]]:
+        ret = []
+        for owner, node_tree in self.owners:
+            finds = self.node_tree_finds.get(node_tree)
+            if finds:
+                ret.append((type(owner).__name__, owner.name, len(finds)))
+
+        return ret
+
+
+def create_node_search(
+    node_tree: bpy.types.NodeTree,
+    search: str,
+    prefs_: prefs.Preferences,
+    previous: NodeSearch | None = None,
+    image_timeout: float | None = images.CHECK_TIMEOUT,
+) -> NodeSearch:
+    # Node trees are validated once by every search, not on every draw or event
+    index.begin_search()
+    predicates = []
+    preparations = []
+    index_query = None
+    fields = []
+    if search != "":
+        if prefs_.search_in_name:
+            fields.append(index.FIELD_NAME)
+        if prefs_.search_in_label:
+            fields.append(index.FIELD_LABEL)
+        if prefs_.search_in_blidname:
+            fields.append(index.FIELD_BLIDNAME)
+        if prefs_.search_in_node_groups:
+            fields.append(index.FIELD_GROUP)
+
+        if len(fields) > 0:
+            pattern = None
+            if prefs_.use_regex:
+                pattern, error = compile_search_pattern(search, prefs_.exact_match)
+                if pattern is None:
+                    raise ValueError(error)
+
+            index_query = index.IndexQuery(
+                search,
+                fields,
+                match_case=prefs_.match_case,
+                exact_match=prefs_.exact_match,
+                pattern=pattern,
+            )
 
-        ret.add(node)
+    # Empty attribute search matches all attribute nodes, with exact match the unnamed ones
+    if prefs_.search_in_attribute:
+        matcher = query.compile_matcher(
+            prefs_.attribute_search, prefs_.match_case, prefs_.exact_match
+        )
+        attribute_filter = attributes.AttributeNameFilter(
+            matcher, lambda: index.attribute_index_steps(True)
+        )
+        preparations.append(attribute_filter.prepare)
+        predicates.append(query.Predicate("attribute", attribute_filter, cost=2e-7))
+
+    # Predicates are evaluated on the node records of the snapshots
+    if prefs_.search_unconnected:
+        predicates.append(query.Predicate("unconnected", snapshot.is_unconnected, cost=1e-7))
+    image_filter = None
+    if prefs_.search_missing_images:
+        image_filter = images.MissingImageFilter(image_timeout)
+        predicates.append(query.Predicate("missing_image", image_filter, cost=1e-4))
+    if prefs_.search_missing_node_groups:
+        predicates.append(
+            query.Predicate("missing_node_group", snapshot.is_missing_node_group, cost=1e-7)
+        )
+    if prefs_.search_duplicate_node_groups:
+        duplicate_groups = structure.DuplicateGroupFilter(
+            index.STRUCTURE_HASHES, lambda: bpy.data.node_groups
+        )
+        preparations.append(duplicate_groups.prepare)
+        predicates.append(query.Predicate("duplicate_node_group", duplicate_groups, cost=1e-7))
+    if prefs_.search_duplicate_subgraphs:
+        duplicate_subgraphs = structure.DuplicateSubgraphFilter(
+            index.STRUCTURE_HASHES, lambda: (x for _, x in get_file_node_trees())
+        )
+        preparations.append(duplicate_subgraphs.prepare)
+        predicates.append(query.Predicate("duplicate_subgraph", duplicate_subgraphs, cost=2e-7))
+    if prefs_.search_not_contributing:
+        predicates.append(
+            query.Predicate("not_contributing", snapshot.not_contributing_filter(), cost=2e-7)
+        )
+    relation = prefs_.search_selection_relation
+    if relation != 'NONE':
+        direction, max_hops = relation, None
+        if relation == 'NEARBY':
+            direction, max_hops = 'BOTH', prefs_.selection_hops
+        reachability = snapshot.ReachabilityFilter(
+            lambda tree: selected_indices(tree, node_tree), direction, max_hops
+        )
+        predicates.append(query.Predicate("selection_relation", reachability, cost=2e-7))
+
+    # Predicates are wrapped only when profiling, so they have no overhead otherwise
+    if profiling.PROFILE.enabled:
+        for predicate in predicates:
+            predicate.function = profiling.PROFILE.timed(predicate.name, predicate.function)
+
+    cache_key = None
+    # Existence of image files and selection aren't tracked by the node tree changes, these
+    # results can't be cached. Attribute names can be linked from the node trees using the node
+    # group and duplicates are found in other node trees, whose changes don't invalidate the
+    # results either.
+    if (
+        not prefs_.search_missing_images
+        and prefs_.search_selection_relation == 'NONE'
+        and not prefs_.search_in_attribute
+        and not prefs_.search_duplicate_node_groups
+        and not prefs_.search_duplicate_subgraphs
+    ):
+        cache_key = (
+            search,
+            tuple(fields),
+            prefs_.match_case,
+            prefs_.exact_match,
+            prefs_.use_regex,
+            tuple(sorted(predicate.name for predicate in predicates)),
+        )
 
-    return ret
+    if prefs_.search_scope == 'FILE':
+        node_search = FileNodeSearch(
+            query.QueryPlan(predicates),
+            prefs_.search_in_node_groups,
+            index_query=index_query,
+            previous=previous,
+            cache_key=cache_key,
+        )
+    else:
+        node_search = NodeSearch(
+            node_tree,
+            query.QueryPlan(predicates),
+            prefs_.search_in_node_groups,
+            index_query=index_query,
+            previous=previous,
+            cache_key=cache_key,
+        )
 
+    node_search.image_filter = image_filter
+    node_search.preparations = preparations
+    return node_search
 
-def search_string(
-    search: str, value: str, prefs: prefs.Preferences, enable_regex: bool = True
-) -> str:
-    def _exact_matcher(search_: str, value_: str) -> bool:
-        if DUPLICATE_SUFFIX_PATTERN.search(value_):
-            value_ = value_.rsplit(".", 1)[0]
-        return search_ == value_
-    
-    def _contains_matcher(search_: str, value_: str) -> bool:
-        return search_ in value_
 
-    if enable_regex and prefs.use_regex:
-        return PATTERN.match(value) is not None
-    
-    matcher = _exact_matcher if prefs.exact_match else _contains_matcher
-    if prefs.match_case:
-        return matcher(search, value)
-    
-    return matcher(search.lower(), value.lower())
+def compile_search_pattern(
+    search: str, exact_match: bool = False
+) -> tuple[re.Pattern | None, str | None]:
+    """Returns the search compiled as regular expression, or the error why it can't be used.
 
+    Exact match anchors the whole pattern, the typed search is left as it is. Matching can't be
+    interrupted, patterns that could freeze Blender are rejected. The check runs whenever a search
+    is started, not only when the search input changes.
+    """
+    if exact_match:
+        search = f"^(?:{search})$"
+    try:
+        pattern = re.compile(search)
+    except re.error as e:
+        return None, str(e)
+
+    reason = index.catastrophic_backtracking_reason(pattern)
+    if reason is not None:
+        return None, f"Pattern could be too slow, {reason}"
+
+    return pattern, None
+
+
+def selected_indices(
+    tree: snapshot.TreeSnapshot, edit_tree: bpy.types.NodeTree | None
+) -> list[int]:
+    # Only the selection in the edited node tree is related to, selections kept in the node groups
+    # aren't visible to the user
+    if tree.node_tree != edit_tree:
+        return []
+
+    # Selection doesn't update the node tree, so it is read from the nodes at the search time
+    return [i for i, node in enumerate(tree.nodes) if node.select]
+
+
+def results_changed() -> None:
+    global RESULTS_VERSION
+    RESULTS_VERSION += 1
+    RESULT_CURSORS.clear()
+
+
+def clear_search_results() -> None:
+    global RESULT_SEARCH
+
+    RESULT_SEARCH = None
+    NODE_TREE_NODES.clear()
+    NODE_TREE_OCCURRENCES.clear()
+    NODE_TREE_UNIQUE_OCCURRENCES.clear()
+    RESULT_TREES.clear()
+    FILE_RESULTS.clear()
+    results_changed()
+
+
+def set_search_results(node_search: NodeSearch) -> None:
+    global _DATA_SIZES, RESULT_SEARCH
+
+    RESULT_SEARCH = node_search
+    NODE_TREE_NODES.clear()
+    NODE_TREE_OCCURRENCES.clear()
+    NODE_TREE_UNIQUE_OCCURRENCES.clear()
+    RESULT_TREES.clear()
+    FILE_RESULTS.clear()
+    if isinstance(node_search, FileNodeSearch):
+        FILE_RESULTS.extend(node_search.get_owner_results())
+    NODE_TREE_NODES.update(node_search.node_tree_finds)
+    NODE_TREE_OCCURRENCES.update(node_search.node_tree_leaf_nodes_count)
+    NODE_TREE_UNIQUE_OCCURRENCES.update(node_search.node_tree_unique_nodes_count)
+    for node_tree in NODE_TREE_NODES:
+        # The node trees were validated when searched
+        pointer = node_tree.as_pointer()
+        RESULT_TREES[pointer] = (node_tree, index.TREE_VERSIONS[pointer])
+    _DATA_SIZES = _get_data_sizes()
+    results_changed()
+
+
+def get_search_options(prefs_: prefs.Preferences) -> tuple:
+    """Returns values of all preferences that influence results of a search."""
+    return (
+        prefs_.use_regex,
+        prefs_.match_case,
+        prefs_.exact_match,
+        prefs_.search_in_name,
+        prefs_.search_in_label,
+        prefs_.search_in_blidname,
+        prefs_.search_in_node_groups,
+        prefs_.search_unconnected,
+        prefs_.search_missing_images,
+        prefs_.search_missing_node_groups,
+        prefs_.search_duplicate_node_groups,
+        prefs_.search_duplicate_subgraphs,
+        prefs_.search_not_contributing,
+        prefs_.search_selection_relation,
+        prefs_.selection_hops,
+        prefs_.search_in_attribute,
+        prefs_.attribute_search,
+        prefs_.search_scope,
+    )
 
-def node_name_filter(node: bpy.types.Node, name: str, prefs: prefs.Preferences) -> bool:
-    return search_string(name, node.name, prefs)
 
+def tag_node_editors_redraw() -> None:
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'NODE_EDITOR':
+                area.tag_redraw()
 
-def node_blidname_filter(node: bpy.types.Node, value: str, prefs: prefs.Preferences) -> bool:
-    return search_string(value, node.bl_idname, prefs)
 
+class LiveSearch:
+    """Debounced search of the input that is being typed in the search dialog."""
 
-def node_label_filter(node: bpy.types.Node, value: str, prefs: prefs.Preferences) -> bool:
-    return search_string(value, node.label, prefs)
+    def __init__(self):
+        self.node_tree: bpy.types.NodeTree | None = None
+        self.search = ""
+        self.deadline = 0.0
+        # Last finished search and the (node tree pointer, search, options) it was done with
+        self.node_search: NodeSearch | None = None
+        self.key: tuple | None = None
 
+    def reset(self) -> None:
+        self.node_tree = None
+        self.node_search = None
+        self.key = None
 
-def node_group_name_filter(node: bpy.types.Node, value: str, prefs: prefs.Preferences) -> bool:
-    if not hasattr(node, "node_tree") or node.node_tree is None:
-        return False
-    return search_string(value, node.node_tree.name, prefs)
+    def schedule(self, node_tree: bpy.types.NodeTree, search: str) -> None:
+        self.node_tree = node_tree
+        self.search = search
+        self.deadline = time.monotonic() + LIVE_SEARCH_DELAY
+        if not bpy.app.timers.is_registered(_live_search_timer):
+            bpy.app.timers.register(_live_search_timer, first_interval=LIVE_SEARCH_DELAY)
+
+    def take(
+        self, node_tree: bpy.types.NodeTree, search: str, prefs_: prefs.Preferences
+    ) -> NodeSearch | None:
+        """Returns the live search result if it was done with the same input."""
+        if self.key != (node_tree.as_pointer(), search, get_search_options(prefs_)):
+            return None
+
+        return self.node_search
+
+    def run(self) -> None:
+        prefs_ = prefs.get_preferences()
+        if self.node_tree is None:
+            return
 
+        if self.search == "":
+            clear_search_results()
+            self.node_search = None
+            self.key = None
+            return
 
-def attribute_filter(node: bpy.types.GeometryNode, name: str, prefs: prefs.Preferences) -> bool:
-    if (
-        isinstance(
-            node,
-            (
-                bpy.types.GeometryNodeInputNamedAttribute,
-                bpy.types.GeometryNodeStoreNamedAttribute,
-                bpy.types.GeometryNodeRemoveAttribute,
-            ),
-        )
-        and name == ""
-    ):
-        return True
+        # Keep the last results while the typed pattern is not valid
+        if prefs_.use_regex and compile_search_pattern(self.search, prefs_.exact_match)[0] is None:
+            return
 
-    # TODO: Finding if the node.inputs[x] is connected to other node or not
-    # and use the value from there would be a improvement.
-    searched_input = None
-    if isinstance(node, bpy.types.GeometryNodeInputNamedAttribute):
-        searched_input = node.inputs[0].default_value
-    elif isinstance(node, bpy.types.GeometryNodeStoreNamedAttribute):
-        searched_input = node.inputs[2].default_value
-    elif isinstance(node, bpy.types.GeometryNodeRemoveAttribute):
-        searched_input = node.inputs[1].default_value
-    
-    if searched_input is None:
-        return False
-    
-    return search_string(name, searched_input, prefs, enable_regex=False)
+        options = get_search_options(prefs_)
+        key = (self.node_tree.as_pointer(), self.search, options)
+        if key == self.key:
+            return
 
+        previous = None
+        # When the query only extends the previous substring query, its results are a subset
+        # of the previous results and only those have to be checked again.
+        if (
+            self.key is not None
+            and self.key[0] == key[0]
+            and self.key[2] == options
+            and not prefs_.use_regex
+            and not prefs_.exact_match
+            and self.key[1] != ""
+            and self.key[1] in self.search
+        ):
+            previous = self.node_search
+
+        node_search = create_node_search(self.node_tree, self.search, prefs_, previous)
+        node_search.search()
+        # Don't keep the whole chain of refined searches alive
+        node_search.previous = None
+        set_search_results(node_search)
+        self.node_search = node_search
+        self.key = key
+
+
+LIVE_SEARCH = LiveSearch()
+
+
+def _live_search_timer() -> float | None:
+    remaining = LIVE_SEARCH.deadline - time.monotonic()
+    if remaining > 0.0:
+        return remaining
 
-def unconnected_node_filter(node: bpy.types.Node) -> bool:
-    return len(node.outputs) > 0 and sum(output.is_linked for output in node.outputs) == 0
+    try:
+        LIVE_SEARCH.run()
+    except ReferenceError:
+        LIVE_SEARCH.reset()
 
+    tag_node_editors_redraw()
+    return None
 
-def missing_image_filter(node: bpy.types.Node) -> bool:
-    if not hasattr(node, "image"):
-        return False
 
-    if node.image is None:
-        return True
+def get_context_found_nodes(context: bpy.types.Context) -> set[bpy.types.Node]:
+    """Returns found nodes based on the current context."""
+    if not hasattr(context.space_data, "edit_tree"):
+        return set()
 
-    image = typing.cast(bpy.types.Image, node.image)
-    path = os.path.abspath(bpy.path.abspath(image.filepath))
-    return not os.path.isfile(path)
+    return NODE_TREE_NODES.get(context.space_data.edit_tree, set())
 
 
-def missing_node_group_filter(node: bpy.types.Node) -> bool:
-    if not hasattr(node, "node_tree"):
-        return False
+def get_all_found_nodes(include_nodegroups: bool = False) -> set[bpy.types.Node]:
+    ret = set()
+    for node in itertools.chain(*NODE_TREE_NODES.values()):
+        if not include_nodegroups and hasattr(node, "node_tree"):
+            continue
+
+        ret.add(node)
+
+    return ret
+
+
+class OverlayRedrawStats:
+    """Counts events on which the overlay used to redraw versus the redraws really needed."""
+
+    def __init__(self):
+        self.requested = 0
+        self.needed = 0
+
+    def reset(self) -> None:
+        self.requested = 0
+        self.needed = 0
+
 
-    return node.node_tree is None
+OVERLAY_REDRAWS = OverlayRedrawStats()
+
+
+def _draw_overlay(context: bpy.types.Context) -> None:
+    # The results version is read on every draw, arguments of the handler are fixed
+    draw.highlight_nodes(
+        context,
+        NODE_TREE_NODES,
+        NODE_TREE_OCCURRENCES,
+        NODE_TREE_UNIQUE_OCCURRENCES,
+        RESULTS_VERSION,
+    )
 
 
 class ToggleSearchOverlay(bpy.types.Operator):
@@ -217,8 +697,8 @@ class ToggleSearchOverlay(bpy.types.Operator):
 
     def add_draw_handler(self, context: bpy.types.Context):
         ToggleSearchOverlay.handle = bpy.types.SpaceNodeEditor.draw_handler_add(
-            draw.highlight_nodes,
-            (context, NODE_TREE_NODES, NODE_TREE_OCCURRENCES),
+            _draw_overlay,
+            (context,),
             'WINDOW',
             'POST_PIXEL',
         )
@@ -229,17 +709,54 @@ class ToggleSearchOverlay(bpy.types.Operator):
         ToggleSearchOverlay.handle = None
 
     def modal(self, context, event):
-        if context.area:
-            context.area.tag_redraw()
+        # The overlay was toggled off, this modal handler isn't needed anymore
+        if ToggleSearchOverlay.handle is None:
+            return {'FINISHED'}
+
+        OVERLAY_REDRAWS.requested += 1
+        if context.area is None:
+            return {'PASS_THROUGH'}
+
+        state = self._get_overlay_state(context)
+        if state != self.state:
+            # Results are shown in all node editors, other changes are local to this one
+            if self.state is None or state[0] != self.state[0]:
+                tag_node_editors_redraw()
+            else:
+                context.area.tag_redraw()
+            OVERLAY_REDRAWS.needed += 1
+            self.state = state
 
         return {'PASS_THROUGH'}
 
+    @staticmethod
+    def _get_overlay_state(context: bpy.types.Context) -> tuple:
+        """Returns values which require the overlay to be redrawn when they change."""
+        view = None
+        region = context.region
+        if region is not None and region.type == 'WINDOW':
+            view = (
+                *region.view2d.region_to_view(0, 0),
+                *region.view2d.region_to_view(region.width, region.height),
+            )
+
+        tree_version = None
+        edit_tree = getattr(context.space_data, "edit_tree", None)
+        if edit_tree is not None:
+            tree_version = (edit_tree.as_pointer(), index.get_tree_version(edit_tree))
+
+        return (RESULTS_VERSION, view, tree_version)
+
     def invoke(self, context, event):
         if ToggleSearchOverlay.handle is None:
             self.add_draw_handler(context)
         else:
             self.remove_draw_handler()
+            if context.area:
+                context.area.tag_redraw()
+            return {'FINISHED'}
 
+        self.state = None
         context.window_manager.modal_handler_add(self)
         return {'RUNNING_MODAL'}
 
@@ -248,25 +765,37 @@ CLASSES.append(ToggleSearchOverlay)
 
 
 def _search_updated(op: bpy.types.OperatorProperties, context: bpy.types.Context) -> None:
-    global PATTERN
     global PATTERN_COMPILE_ERROR
 
-    PATTERN = None
-    PATTERN_COMPILE_ERROR = None
-    # We treat the search always as a pattern, only show the error and use the pattern if
-    # the user wants to use regex.
-    try:
-        preferences = prefs.get_preferences(context) 
-        if preferences.exact_match and preferences.use_regex:
-            if not op.search.startswith("^"):
-                op.search = f"^{op.search}"
-            if not op.search.endswith("$"):
-                op.search = f"{op.search}$"
-
-        PATTERN = re.compile(op.search)
-    except re.error as e:
-        print(f"Error compiling pattern: {e}")
-        PATTERN_COMPILE_ERROR = str(e)
+    preferences = prefs.get_preferences(context)
+    # The search is always checked as a pattern, so the error is shown also when the regular
+    # expressions are enabled later. The pattern is checked again when the search runs.
+    PATTERN_COMPILE_ERROR = compile_search_pattern(op.search, preferences.exact_match)[1]
+
+    node_tree = getattr(context.space_data, "edit_tree", None)
+    if preferences.live_search and node_tree is not None:
+        LIVE_SEARCH.schedule(node_tree, op.search)
+
+
+def report_search_results(operator: bpy.types.Operator, node_search: NodeSearch) -> None:
+    found_nodes = node_search.all_found_nodes
+    if node_search.aborted:
+        operator.report(
+            {'WARNING'},
+            f"Aborted: pattern too slow, showing {len(found_nodes)} node(s) found so far",
+        )
+    elif len(found_nodes) > 0:
+        operator.report({'INFO'}, f"Found {len(found_nodes)} node(s)")
+    else:
+        operator.report({'WARNING'}, "No nodes found")
+
+    unchecked = node_search.unchecked_images
+    if len(unchecked) > 0:
+        operator.report(
+            {'WARNING'},
+            f"Image files of {len(unchecked)} node(s) weren't checked in time, "
+            "they are unknown and not in the results",
+        )
 
 
 class PerformNodeSearch(bpy.types.Operator):
@@ -279,6 +808,7 @@ class PerformNodeSearch(bpy.types.Operator):
         name="Search",
         description="Text to search for based on other options",
         update=_search_updated,
+        options={'TEXTEDIT_UPDATE'},
     )
 
     @classmethod
@@ -321,11 +851,22 @@ class PerformNodeSearch(bpy.types.Operator):
         col.prop(prefs_, "search_in_blidname")
 
         layout.prop(prefs_, "search_in_node_groups")
+        layout.row().prop(prefs_, "search_scope", expand=True)
+        layout.prop(prefs_, "live_search")
+        layout.prop(prefs_, "time_sliced_search")
 
         col = layout.column(align=True)
         col.prop(prefs_, "search_unconnected")
         col.prop(prefs_, "search_missing_images")
         col.prop(prefs_, "search_missing_node_groups")
+        col.prop(prefs_, "search_duplicate_node_groups")
+        col.prop(prefs_, "search_duplicate_subgraphs")
+        col.prop(prefs_, "search_not_contributing")
+
+        row = layout.row(align=True)
+        row.prop(prefs_, "search_selection_relation", text="")
+        if prefs_.search_selection_relation == 'NEARBY':
+            row.prop(prefs_, "selection_hops")
 
         col = layout.column(align=True)
         if context.area.ui_type == 'GeometryNodeTree':
@@ -338,50 +879,34 @@ class PerformNodeSearch(bpy.types.Operator):
 
     def execute(self, context: bpy.types.Context):
         prefs_ = prefs.get_preferences(context)
-        filters_ = set()
 
         if self._is_search_required(prefs_) and self.search == "":
             self.report({'WARNING'}, "No search input provided, provide search input")
             return {'CANCELLED'}
 
-        if prefs_.use_regex and PATTERN is None and PATTERN_COMPILE_ERROR is not None:
-            self.report({'ERROR'}, f"Provided regular expression is not valid")
-            return {'CANCELLED'}
-
-        if self.search != "":
-            if prefs_.search_in_name:
-                filters_.add(lambda x: node_name_filter(x, self.search, prefs_))
-            if prefs_.search_in_label:
-                filters_.add(lambda x: node_label_filter(x, self.search, prefs_))
-            if prefs_.search_in_blidname:
-                filters_.add(lambda x: node_blidname_filter(x, self.search, prefs_))
-            if prefs_.search_in_node_groups:
-                filters_.add(lambda x: node_group_name_filter(x, self.search, prefs_))
-
-        if prefs_.search_in_attribute and prefs_.attribute_search != "":
-            filters_.add(lambda x: attribute_filter(x, prefs_.attribute_search, prefs_))
-
-        if prefs_.search_unconnected:
-            filters_.add(lambda x: unconnected_node_filter(x))
-        if prefs_.search_missing_images:
-            filters_.add(lambda x: missing_image_filter(x))
-        if prefs_.search_missing_node_groups:
-            filters_.add(lambda x: missing_node_group_filter(x))
+        if prefs_.use_regex:
+            error = compile_search_pattern(self.search, prefs_.exact_match)[1]
+            if error is not None:
+                self.report({'ERROR'}, f"Provided regular expression can't be used: {error}")
+                return {'CANCELLED'}
 
         node_tree = context.space_data.edit_tree
-        NODE_TREE_NODES.clear()
-        NODE_TREE_OCCURRENCES.clear()
-        node_search = NodeSearch(node_tree, filters_, prefs_.search_in_node_groups)
-        found_nodes = node_search.search()
+        # Results of the live search can be reused if nothing changed since it finished
+        node_search = LIVE_SEARCH.take(node_tree, self.search, prefs_)
+        if node_search is None and prefs_.time_sliced_search:
+            LIVE_SEARCH.reset()
+            bpy.ops.improved_node_search.search_in_steps('INVOKE_DEFAULT', search=self.search)
+            return {'FINISHED'}
+
+        if node_search is None:
+            node_search = create_node_search(node_tree, self.search, prefs_)
+            node_search.search()
+
+        LIVE_SEARCH.reset()
         # Set the overlay's node tree to the current one
-        NODE_TREE_NODES.update(node_search.node_tree_finds)
-        NODE_TREE_OCCURRENCES.update(node_search.node_tree_leaf_nodes_count)
+        set_search_results(node_search)
+        report_search_results(self, node_search)
 
-        if len(found_nodes) > 0:
-            self.report({'INFO'}, f"Found {len(found_nodes)} node(s)")
-        else:
-            self.report({'WARNING'}, "No nodes found")
-        
         if context.area:
             context.area.tag_redraw()
         return {'FINISHED'}
@@ -420,14 +945,132 @@ class PerformNodeSearch(bpy.types.Operator):
 CLASSES.append(PerformNodeSearch)
 
 
+class PerformNodeSearchInSteps(bpy.types.Operator):
+    bl_idname = "improved_node_search.search_in_steps"
+    bl_label = "Search In Steps"
+    bl_description = (
+        "Search for nodes in small steps without blocking the interface, cancel the search by Esc"
+    )
+    bl_options = {'INTERNAL'}
+
+    search: bpy.props.StringProperty(
+        name="Search",
+        description="Text to search for based on other options",
+        options={'HIDDEN', 'SKIP_SAVE'},
+    )
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context):
+        return PerformNodeSearch.poll(context)
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        prefs_ = prefs.get_preferences(context)
+        if prefs_.use_regex:
+            error = compile_search_pattern(self.search, prefs_.exact_match)[1]
+            if error is not None:
+                self.report({'ERROR'}, f"Provided regular expression can't be used: {error}")
+                return {'CANCELLED'}
+
+        node_tree = context.space_data.edit_tree
+        self.node_search = create_node_search(node_tree, self.search, prefs_)
+        self.steps = self.node_search.iter_search()
+        # Time spent searching, without the time between the steps
+        self.elapsed = 0.0
+        # The search is cancelled if the searched node tree changes in the meantime, the whole
+        # file search can't check all node trees. Any search is cancelled on file load, undo and
+        # redo, the searched data don't exist anymore.
+        self.tree_version = None
+        if self.node_search.node_tree is not None:
+            self.tree_version = index.get_tree_version(node_tree)
+        self.generation = index.DATA_GENERATION
+        clear_search_results()
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(SEARCH_STEP_INTERVAL, window=context.window)
+        self.timer_duration = self.timer.time_duration
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context: bpy.types.Context, event: bpy.types.Event):
+        if event.type == 'ESC':
+            self._finish(context)
+            self.report(
+                {'WARNING'},
+                f"Search cancelled, found {len(self.node_search.all_found_nodes)} node(s) so far",
+            )
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER' or not self._timer_fired():
+            return {'PASS_THROUGH'}
+
+        finished = True
+        start = time.perf_counter()
+        deadline = start + SEARCH_STEP_BUDGET
+        try:
+            if self.generation != index.DATA_GENERATION or (
+                self.tree_version is not None
+                and index.get_tree_version(self.node_search.node_tree) != self.tree_version
+            ):
+                raise ReferenceError
+
+            for _ in self.steps:
+                if time.perf_counter() >= deadline:
+                    finished = False
+                    break
+        except ReferenceError:
+            # Nodes or node trees searched by the steps were removed
+            self._finish(context)
+            clear_search_results()
+            self.report({'WARNING'}, "Node tree changed during the search, search cancelled")
+            return {'CANCELLED'}
+        self.elapsed += time.perf_counter() - start
+
+        # Stream the partial results to the overlay
+        set_search_results(self.node_search)
+        tag_node_editors_redraw()
+        if not finished:
+            if context.area:
+                context.area.header_text_set(
+                    f"Searching: {self.node_search.visited_trees} node tree(s), "
+                    f"{self.node_search.visited_nodes} node(s), "
+                    f"found {len(self.node_search.all_found_nodes)} (Esc to cancel)"
+                )
+            return {'PASS_THROUGH'}
+
+        self._finish(context)
+        if profiling.PROFILE.enabled:
+            self.node_search.record_profile(self.elapsed)
+        report_search_results(self, self.node_search)
+        return {'FINISHED'}
+
+    def _timer_fired(self) -> bool:
+        # Timers of other operators send the same events, the duration of the own timer changes
+        # only when it fires.
+        duration = self.timer.time_duration
+        if duration == self.timer_duration:
+            return False
+        self.timer_duration = duration
+        return True
+
+    def _finish(self, context: bpy.types.Context) -> None:
+        context.window_manager.event_timer_remove(self.timer)
+        self.steps.close()
+        if context.area:
+            context.area.header_text_set(None)
+            context.area.tag_redraw()
+
+
+CLASSES.append(PerformNodeSearchInSteps)
+
+
 class ClearSearch(bpy.types.Operator):
     bl_idname = "improved_node_search.clear"
     bl_label = "Clear Search"
     bl_description = "Clear the search results"
 
     def execute(self, context: bpy.types.Context):
-        NODE_TREE_NODES.clear()
-        NODE_TREE_OCCURRENCES.clear()
+        clear_search_results()
+        LIVE_SEARCH.reset()
         if context.area:
             context.area.tag_redraw()
         return {'FINISHED'}
@@ -455,6 +1098,125 @@ class SelectFoundNodes(bpy.types.Operator):
 CLASSES.append(SelectFoundNodes)
 
 
+def order_nodes(nodes: typing.Iterable[bpy.types.Node], order: str) -> list[bpy.types.Node]:
+    """Returns the nodes sorted by name, in reading order or as a path through nearest nodes."""
+    if order == 'NAME':
+        return sorted(nodes, key=lambda x: x.name)
+
+    locations = {node: tuple(draw.abs_node_location(node)) for node in nodes}
+    # Rows from top to bottom, nodes from left to right in each row
+    ordered = sorted(
+        locations, key=lambda x: (-locations[x][1] // NAVIGATION_ROW_HEIGHT, locations[x][0])
+    )
+    if order == 'READING' or len(ordered) < 3:
+        return ordered
+
+    # Greedy path starting at the first node in reading order, always going to the nearest node
+    # that wasn't visited yet, so the view moves as little as possible.
+    positions = numpy.array([locations[node] for node in ordered], dtype=numpy.float64)
+    remaining = numpy.ones(len(ordered), dtype=bool)
+    current = 0
+    path = []
+    for _ in range(len(ordered)):
+        path.append(ordered[current])
+        remaining[current] = False
+        if not remaining.any():
+            break
+        distances = numpy.sum((positions - positions[current]) ** 2, axis=1)
+        distances[~remaining] = numpy.inf
+        current = int(numpy.argmin(distances))
+
+    return path
+
+
+class ResultCursor:
+    """Ordered results of one node tree with the position of the last visited result.
+
+    Each entry is (path of group nodes leading to the node tree of the node, node), the path is
+    empty for nodes of the node tree itself.
+    """
+
+    def __init__(self, node_tree: bpy.types.NodeTree, order: str, into_node_groups: bool):
+        self.order = order
+        self.into_node_groups = into_node_groups
+        self.entries: list[tuple[tuple[bpy.types.Node, ...], bpy.types.Node]] = []
+        self.position = -1
+
+        # Iterative depth first walk, group nodes are replaced by the results inside of them
+        stack = [((), iter(order_nodes(NODE_TREE_NODES.get(node_tree, ()), order)), {node_tree})]
+        while len(stack) > 0:
+            path, nodes, path_trees = stack[-1]
+            node = next(nodes, None)
+            if node is None:
+                stack.pop()
+                continue
+
+            inner_tree = getattr(node, "node_tree", None)
+            inner_nodes = NODE_TREE_NODES.get(inner_tree, ()) if into_node_groups else ()
+            # Group nodes without results inside were found themselves
+            if len(inner_nodes) == 0 or inner_tree in path_trees:
+                self.entries.append((path, node))
+                continue
+
+            stack.append(
+                (path + (node,), iter(order_nodes(inner_nodes, order)), path_trees | {inner_tree})
+            )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def step(self, direction: int) -> tuple[tuple[bpy.types.Node, ...], bpy.types.Node]:
+        if self.position < 0 and direction < 0:
+            self.position = 0
+        self.position = (self.position + direction) % len(self.entries)
+        return self.entries[self.position]
+
+
+# Mapping of node tree -> navigation cursor over its results, built on first use after a search
+RESULT_CURSORS: dict[bpy.types.NodeTree, ResultCursor] = {}
+
+
+def get_result_cursor(
+    node_tree: bpy.types.NodeTree, prefs_: prefs.Preferences
+) -> ResultCursor | None:
+    cursor = RESULT_CURSORS.get(node_tree)
+    if (
+        cursor is None
+        or cursor.order != prefs_.navigation_order
+        or cursor.into_node_groups != prefs_.navigate_into_node_groups
+    ):
+        cursor = ResultCursor(node_tree, prefs_.navigation_order, prefs_.navigate_into_node_groups)
+        RESULT_CURSORS[node_tree] = cursor
+
+    return cursor if len(cursor) > 0 else None
+
+
+def enter_node_group_path(
+    space: bpy.types.SpaceNodeEditor, path: tuple[bpy.types.Node, ...]
+) -> None:
+    """Changes the edited node tree to the node tree of the last group node in the path."""
+    current = [path_item.node_tree for path_item in space.path]
+    target = current[:1] + [node.node_tree for node in path]
+    common = 0
+    while common < min(len(current), len(target)) and current[common] == target[common]:
+        common += 1
+
+    if common == 0:
+        if len(path) == 0:
+            return
+        # Nothing in common, not even the root, the path starts again in the node tree of the
+        # first group node
+        space.path.start(path[0].id_data)
+        common = 1
+    else:
+        for _ in range(len(current) - common):
+            space.path.pop()
+
+    # The first node tree of the target is the root, nodes of the path lead to the following ones
+    for node in path[max(common - 1, 0) :]:
+        space.path.append(node.node_tree, node=node)
+
+
 class CycleFoundNodes(bpy.types.Operator):
     bl_idname = "improved_node_search.cycle_found"
     bl_label = "Cycle Found Nodes"
@@ -462,30 +1224,34 @@ class CycleFoundNodes(bpy.types.Operator):
 
     direction: bpy.props.IntProperty(default=1, min=-1, max=1)
 
-    index = 0
-
     @classmethod
     def poll(cls, context: bpy.types.Context) -> bool:
+        # Inside of a node group, results of the node tree the path starts in can be navigated
+        path = getattr(context.space_data, "path", ())
+        if len(path) > 0 and len(NODE_TREE_NODES.get(path[0].node_tree, ())) > 0:
+            return True
         return len(get_context_found_nodes(context)) > 0
 
     def execute(self, context: bpy.types.Context):
-        new_index = CycleFoundNodes.index + self.direction
-        found_nodes = get_context_found_nodes(context)
-        # clamp next_index to boundaries of FOUND_NODES
-        if new_index > len(found_nodes) - 1:
-            new_index = 0
-        elif new_index < 0:
-            new_index = len(found_nodes) - 1
+        prefs_ = prefs.get_preferences(context)
+        space = context.space_data
+        node_tree = space.edit_tree
+        # Navigation through nested node groups continues from the node tree the path starts in
+        if prefs_.navigate_into_node_groups and len(space.path) > 0:
+            node_tree = space.path[0].node_tree
+
+        cursor = get_result_cursor(node_tree, prefs_)
+        if cursor is None:
+            return {'CANCELLED'}
 
-        # We sort the found nodes by name, as set is unordered
-        node = sorted(list(found_nodes), key=lambda x: x.name)[new_index]
+        path, node = cursor.step(self.direction)
+        if prefs_.navigate_into_node_groups:
+            enter_node_group_path(space, path)
 
         bpy.ops.node.select_all(action='DESELECT')
         node.select = True
         bpy.ops.node.view_selected()
         node.select = False
-
-        CycleFoundNodes.index = new_index
         return {'FINISHED'}
 
 
@@ -531,19 +1297,48 @@ class ImprovedNodeSearchPanel(bpy.types.Panel, ImprovedNodeSearchMixin):
                 -1
             )
             row.operator(CycleFoundNodes.bl_idname, text="Next", icon='TRIA_RIGHT').direction = 1
-
-        # Useful for debugging
-        if False:
-            for node_tree, nodes in NODE_TREE_NODES.items():
-                col = layout.column(align=True)
-                col.label(text=node_tree.name)
-                for node in nodes:
-                    col.label(text=f"  {node.name}")
+            prefs_ = prefs.get_preferences(context)
+            row = layout.row(align=True)
+            row.prop(prefs_, "navigation_order", text="")
+            row.prop(prefs_, "navigate_into_node_groups", text="", icon='NODETREE')
 
 
 CLASSES.append(ImprovedNodeSearchPanel)
 
 
+class ImprovedNodeSearchFileResultsPanel(bpy.types.Panel, ImprovedNodeSearchMixin):
+    bl_label = "File Results"
+    bl_idname = "NODE_EDITOR_PT_Improved_Search_File_Results"
+    bl_parent_id = ImprovedNodeSearchPanel.bl_idname
+
+    # Icons of the data-blocks owning the searched node trees
+    OWNER_ICONS = {
+        "Material": 'MATERIAL',
+        "World": 'WORLD',
+        "Scene": 'SCENE_DATA',
+        "ShaderNodeTree": 'NODETREE',
+        "GeometryNodeTree": 'GEOMETRY_NODES',
+        "CompositorNodeTree": 'NODE_COMPOSITING',
+    }
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context) -> bool:
+        return len(FILE_RESULTS) > 0
+
+    def draw(self, context: bpy.types.Context) -> None:
+        col = self.layout.column(align=True)
+        for owner_type, name, count in FILE_RESULTS:
+            icon = self.OWNER_ICONS.get(
+                owner_type, 'LIGHT' if "Light" in owner_type else 'NODETREE'
+            )
+            row = col.row()
+            row.label(text=name, icon=icon)
+            row.label(text=str(count))
+
+
+CLASSES.append(ImprovedNodeSearchFileResultsPanel)
+
+
 class ImprovedNodeSearchCustomizeDisplayPanel(bpy.types.Panel, ImprovedNodeSearchMixin):
     bl_label = "Display"
     bl_idname = "NODE_EDITOR_PT_Improved_Search_Customize_Display"
@@ -554,6 +1349,7 @@ class ImprovedNodeSearchCustomizeDisplayPanel(bpy.types.Panel, ImprovedNodeSearc
         layout = self.layout
         layout.prop(prefs_, "highlight_color", text="")
         layout.prop(prefs_, "text_size")
+        layout.prop(prefs_, "occurrence_count", text="")
 
         col = layout.column(align=True)
         col.prop(prefs_, "border_attenuation", slider=True)
@@ -563,41 +1359,325 @@ class ImprovedNodeSearchCustomizeDisplayPanel(bpy.types.Panel, ImprovedNodeSearc
 CLASSES.append(ImprovedNodeSearchCustomizeDisplayPanel)
 
 
+class SearchAttribute(bpy.types.Operator):
+    bl_idname = "improved_node_search.search_attribute"
+    bl_label = "Search Attribute"
+    bl_description = "Open the search with the attribute name filled in"
+    bl_options = {'INTERNAL'}
+
+    name: bpy.props.StringProperty()
+
+    def execute(self, context: bpy.types.Context):
+        prefs_ = prefs.get_preferences(context)
+        prefs_.search_in_attribute = True
+        prefs_.attribute_search = self.name
+        bpy.ops.improved_node_search.search('INVOKE_DEFAULT')
+        return {'FINISHED'}
+
+
+CLASSES.append(SearchAttribute)
+
+
+class ImprovedNodeSearchAttributesPanel(bpy.types.Panel, ImprovedNodeSearchMixin):
+    bl_label = "Attributes"
+    bl_idname = "NODE_EDITOR_PT_Improved_Search_Attributes"
+    bl_parent_id = ImprovedNodeSearchPanel.bl_idname
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context) -> bool:
+        return context.area.ui_type == 'GeometryNodeTree'
+
+    def draw(self, context: bpy.types.Context) -> None:
+        layout = self.layout
+        attribute_index = index.get_attribute_index()
+        layout.label(text=f"{len(attribute_index.usages)} attribute name(s) in the file")
+        self._draw_names(layout, "Read, Never Written", attribute_index.read_not_written())
+        self._draw_names(layout, "Written, Never Read", attribute_index.written_not_read())
+
+    def _draw_names(self, layout: bpy.types.UILayout, title: str, names: list[str]) -> None:
+        if len(names) == 0:
+            return
+
+        col = layout.column(align=True)
+        col.label(text=title, icon='ERROR')
+        for name in names:
+            row = col.row(align=True)
+            row.label(text=name if name != "" else "(Empty Name)")
+            row.operator(SearchAttribute.bl_idname, text="", icon='VIEWZOOM').name = name
+
+
+CLASSES.append(ImprovedNodeSearchAttributesPanel)
+
+
+def get_profile_report() -> dict:
+    """Returns the profile with the statistics kept by the search and the overlay."""
+    report = profiling.PROFILE.to_dict()
+    report["cache"] = {
+        "hits": index.RESULT_CACHE.hits,
+        "misses": index.RESULT_CACHE.misses,
+        "entries": len(index.RESULT_CACHE),
+        "cached_nodes": index.RESULT_CACHE.nodes_count,
+    }
+    report["overlay"]["redraws_requested"] = OVERLAY_REDRAWS.requested
+    report["overlay"]["redraws_needed"] = OVERLAY_REDRAWS.needed
+    report["plan"] = {
+        name: {"cost": stats.cost, "hit_rate": stats.hit_rate}
+        for name, stats in query.PREDICATE_STATS.items()
+    }
+    report["results"] = {node_tree.name: len(nodes) for node_tree, nodes in NODE_TREE_NODES.items()}
+    return report
+
+
+class ToggleProfiling(bpy.types.Operator):
+    bl_idname = "improved_node_search.toggle_profiling"
+    bl_label = "Toggle Profiling"
+    bl_description = "Measure the search and the overlay, the measurements have a small overhead"
+
+    def execute(self, context: bpy.types.Context):
+        profiling.PROFILE.enabled = not profiling.PROFILE.enabled
+        return {'FINISHED'}
+
+
+CLASSES.append(ToggleProfiling)
+
+
+class ResetProfile(bpy.types.Operator):
+    bl_idname = "improved_node_search.reset_profile"
+    bl_label = "Reset Profile"
+    bl_description = "Reset all measurements"
+
+    def execute(self, context: bpy.types.Context):
+        profiling.PROFILE.reset()
+        OVERLAY_REDRAWS.reset()
+        index.RESULT_CACHE.hits = 0
+        index.RESULT_CACHE.misses = 0
+        return {'FINISHED'}
+
+
+CLASSES.append(ResetProfile)
+
+
+class ExportProfile(bpy.types.Operator, bpy_extras.io_utils.ExportHelper):
+    bl_idname = "improved_node_search.export_profile"
+    bl_label = "Export Profile"
+    bl_description = "Export the measurements to a JSON file"
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+
+    def execute(self, context: bpy.types.Context):
+        with open(self.filepath, "w") as f:
+            json.dump(get_profile_report(), f, indent=2)
+
+        self.report({'INFO'}, f"Profile exported to {self.filepath}")
+        return {'FINISHED'}
+
+
+CLASSES.append(ExportProfile)
+
+
+class ImprovedNodeSearchProfilingPanel(bpy.types.Panel, ImprovedNodeSearchMixin):
+    bl_label = "Profiling"
+    bl_idname = "NODE_EDITOR_PT_Improved_Search_Profiling"
+    bl_parent_id = ImprovedNodeSearchPanel.bl_idname
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw_header(self, context: bpy.types.Context) -> None:
+        self.layout.operator(
+            ToggleProfiling.bl_idname,
+            text="",
+            icon='TIME',
+            depress=profiling.PROFILE.enabled,
+        )
+
+    def draw(self, context: bpy.types.Context) -> None:
+        layout = self.layout
+        report = get_profile_report()
+        search_ = report["search"]
+        col = layout.column(align=True)
+        col.label(
+            text=f"Searches: {search_['searches']}, last {search_['last_seconds'] * 1e3:.2f} ms"
+        )
+        col.label(text=f"Text lookup: {search_['text_seconds'] * 1e3:.2f} ms")
+        index_ = report["index"]
+        col.label(
+            text=f"Index: {index_['builds']} build(s) in {index_['seconds'] * 1e3:.2f} ms, "
+            f"reading nodes {index_['snapshot_seconds'] * 1e3:.2f} ms"
+        )
+        col.label(
+            text=f"Validation: {index_['validations']} check(s) in "
+            f"{index_['validation_seconds'] * 1e3:.2f} ms"
+        )
+        col.label(
+            text=f"Visited {search_['trees_visited']} tree(s), {search_['nodes_visited']} node(s)"
+        )
+        cache = report["cache"]
+        col.label(text=f"Cache: {cache['hits']} hit(s), {cache['misses']} miss(es)")
+
+        if len(report["predicates"]) > 0:
+            col = layout.column(align=True)
+            for name, predicate in report["predicates"].items():
+                col.label(
+                    text=f"{name}: {predicate['seconds'] * 1e3:.2f} ms, "
+                    f"{predicate['hits']}/{predicate['calls']} hit(s)"
+                )
+
+        images_ = report["images"]
+        overlay = report["overlay"]
+        frames = max(overlay["frames"], 1)
+        col = layout.column(align=True)
+        col.label(
+            text=f"Image checks: {images_['checked']} in {images_['seconds'] * 1e3:.2f} ms, "
+            f"{images_['timeouts']} timed out"
+        )
+        col.label(
+            text=f"Overlay: {overlay['seconds'] / frames * 1e3:.3f} ms/frame, "
+            f"{overlay['batches']} batch(es)"
+        )
+        col.label(text=f"Rebuilt {overlay['rebuilds']} of {overlay['frames']} frame(s)")
+        col.label(
+            text=f"Redraws: {overlay['redraws_needed']} of {overlay['redraws_requested']} needed"
+        )
+
+        if len(report["results"]) > 0:
+            col = layout.column(align=True)
+            for name, count in report["results"].items():
+                col.label(text=f"{name}: {count} node(s)", icon='NODETREE')
+
+        row = layout.row(align=True)
+        row.operator(ExportProfile.bl_idname, icon='EXPORT')
+        row.operator(ResetProfile.bl_idname, text="", icon='LOOP_BACK')
+
+
+CLASSES.append(ImprovedNodeSearchProfilingPanel)
+
+
+def _get_data_sizes() -> tuple[int, ...]:
+    data = bpy.data
+    return (
+        len(data.node_groups),
+        len(data.materials),
+        len(data.worlds),
+        len(data.lights),
+        len(data.scenes),
+    )
+
+
+def _get_node_tree_pointers() -> set[int]:
+    data = bpy.data
+    pointers = {node_tree.as_pointer() for node_tree in data.node_groups}
+    for owner in itertools.chain(data.materials, data.worlds, data.lights, data.scenes):
+        node_tree = getattr(owner, "node_tree", None)
+        if node_tree is not None:
+            pointers.add(node_tree.as_pointer())
+    # Blender 5.0+ assigns the compositor node group to the scene
+    for scene in data.scenes:
+        node_tree = getattr(scene, "compositing_node_group", None)
+        if node_tree is not None:
+            pointers.add(node_tree.as_pointer())
+
+    return pointers
+
+
+def _remove_result_tree(pointer: int) -> None:
+    node_tree, _ = RESULT_TREES.pop(pointer)
+    NODE_TREE_NODES.pop(node_tree, None)
+    if RESULT_SEARCH is not None:
+        RESULT_SEARCH.node_tree_finds.pop(node_tree, None)
+    NODE_TREE_OCCURRENCES.pop(node_tree, None)
+    NODE_TREE_UNIQUE_OCCURRENCES.pop(node_tree, None)
+
+
+def _prune_removed_trees() -> bool:
+    existing = _get_node_tree_pointers()
+    removed = [pointer for pointer in RESULT_TREES if pointer not in existing]
+    for pointer in removed:
+        _remove_result_tree(pointer)
+
+    return len(removed) > 0
+
+
+def _prune_removed_nodes(node_tree: bpy.types.NodeTree) -> bool:
+    pointer = node_tree.as_pointer()
+    result_tree, version = RESULT_TREES[pointer]
+    current_version = index.get_tree_version(node_tree)
+    # Nodes can be removed and added at once, any change of the node tree is checked
+    if current_version == version:
+        return False
+
+    RESULT_TREES[pointer] = (result_tree, current_version)
+    # Removed nodes are compared by pointers only, their data can't be accessed anymore
+    existing = {node.as_pointer() for node in node_tree.nodes}
+    found_nodes = NODE_TREE_NODES[result_tree]
+    removed = [node for node in found_nodes if node.as_pointer() not in existing]
+    for node in removed:
+        found_nodes.discard(node)
+        if RESULT_SEARCH is not None:
+            RESULT_SEARCH.all_found_nodes.discard(node)
+
+    return len(removed) > 0
+
+
+def _recount_occurrences() -> None:
+    """Counts the occurrences of the remaining found nodes, after some were removed."""
+    NODE_TREE_OCCURRENCES.clear()
+    NODE_TREE_UNIQUE_OCCURRENCES.clear()
+    if RESULT_SEARCH is None:
+        return
+
+    RESULT_SEARCH.count_occurrences()
+    NODE_TREE_OCCURRENCES.update(RESULT_SEARCH.node_tree_leaf_nodes_count)
+    NODE_TREE_UNIQUE_OCCURRENCES.update(RESULT_SEARCH.node_tree_unique_nodes_count)
+
+
 @bpy.app.handlers.persistent
-def _depsgraph_update_pre(scene: bpy.types.Scene):
-    for node_tree in list(NODE_TREE_NODES):
-        nodes = list(NODE_TREE_NODES[node_tree])
-        try:
-            data_node_group = bpy.data.node_groups.get(node_tree.name)
-        except ReferenceError:
-            NODE_TREE_NODES.pop(node_tree)
-            NODE_TREE_OCCURRENCES.pop(node_tree)
-            continue
+def _depsgraph_update_post(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph):
+    global _DATA_SIZES
 
-        if data_node_group is None:
-            NODE_TREE_NODES.pop(node_tree)
-            NODE_TREE_OCCURRENCES.pop(node_tree)
-            continue
+    if len(RESULT_TREES) == 0:
+        return
+
+    changed = False
+    # Removed data-blocks aren't reported as updates, but change the size of the collections
+    data_sizes = _get_data_sizes()
+    if data_sizes != _DATA_SIZES:
+        _DATA_SIZES = data_sizes
+        changed = _prune_removed_trees()
 
-        for node in nodes:
-            try:
-                if node.name not in data_node_group.nodes:
-                    NODE_TREE_NODES[node_tree].remove(node)
-                    NODE_TREE_OCCURRENCES[node_tree] -= 1
-            except UnicodeDecodeError:
-                NODE_TREE_NODES[node_tree].remove(node)
-                NODE_TREE_OCCURRENCES[node_tree] -= 1
+    # Only the node trees updated by this depsgraph update are checked
+    for node_tree in index.updated_node_trees(depsgraph):
+        if node_tree.as_pointer() in RESULT_TREES:
+            changed |= _prune_removed_nodes(node_tree)
+
+    if changed:
+        _recount_occurrences()
+        results_changed()
+
+
+@bpy.app.handlers.persistent
+def _clear_results(*args):
+    # Found nodes and node trees can't be accessed after the data is reloaded
+    if len(RESULT_TREES) > 0:
+        clear_search_results()
+    LIVE_SEARCH.reset()
 
 
 def register():
     for cls in CLASSES:
         bpy.utils.register_class(cls)
 
-    bpy.app.handlers.depsgraph_update_pre.append(_depsgraph_update_pre)
+    bpy.app.handlers.depsgraph_update_post.append(_depsgraph_update_post)
+    bpy.app.handlers.load_post.append(_clear_results)
+    bpy.app.handlers.undo_post.append(_clear_results)
+    bpy.app.handlers.redo_post.append(_clear_results)
 
 
 def unregister():
-    bpy.app.handlers.depsgraph_update_pre.remove(_depsgraph_update_pre)
+    bpy.app.handlers.redo_post.remove(_clear_results)
+    bpy.app.handlers.undo_post.remove(_clear_results)
+    bpy.app.handlers.load_post.remove(_clear_results)
+    bpy.app.handlers.depsgraph_update_post.remove(_depsgraph_update_post)
 
     for cls in reversed(CLASSES):
         bpy.utils.unregister_class(cls)
@@ -0,0 +1,294 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Compact records of the searched node properties, extracted once per node tree. The search
+# predicates and the occurrence counting run on the records, so they don't access the nodes
+# through RNA for every search. This module doesn't depend on bpy, nodes are only accessed
+# through their properties, so the core of the search can be tested and benchmarked outside of
+# Blender.
+
+import collections
+import typing
+
+# Mapping of bl_idname of nodes working with attributes -> index of the attribute name input
+ATTRIBUTE_INPUTS = {
+    "GeometryNodeInputNamedAttribute": 0,
+    "GeometryNodeStoreNamedAttribute": 2,
+    "GeometryNodeRemoveAttribute": 1,
+}
+
+# Nodes producing the result of their node tree, the other nodes have to be linked to them to
+# contribute to the result. Nodes linked only to viewers contribute to what the user inspects.
+OUTPUT_NODES = {
+    "NodeGroupOutput",
+    "ShaderNodeOutputMaterial",
+    "ShaderNodeOutputWorld",
+    "ShaderNodeOutputLight",
+    "ShaderNodeOutputAOV",
+    "ShaderNodeOutputLineStyle",
+    "CompositorNodeComposite",
+    "CompositorNodeOutputFile",
+    "CompositorNodeViewer",
+    "GeometryNodeViewer",
+    "TextureNodeOutput",
+    "TextureNodeViewer",
+}
+
+# Number of nodes processed in one step of the builds done in steps
+BUILD_CHUNK_SIZE = 256
+
+K = typing.TypeVar("K", bound=typing.Hashable)
+T = typing.TypeVar("T")
+# Generator of a build done in steps, so it can be interrupted between the steps, e.g. by the
+# search in steps. The built value is returned when the generator finishes.
+Steps = typing.Generator[None, None, T]
+
+
+def run_steps(steps: Steps[T]) -> T:
+    """Runs all steps of the build at once and returns the built value."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            return e.value
+
+
+def get_attribute_name(node: typing.Any) -> str | None:
+    """Returns the value of the attribute name input, even if the input is linked."""
+    input_index = ATTRIBUTE_INPUTS.get(node.bl_idname)
+    if input_index is None:
+        return None
+
+    return node.inputs[input_index].default_value
+
+
+def is_attribute_linked(node: typing.Any) -> bool:
+    input_index = ATTRIBUTE_INPUTS.get(node.bl_idname)
+    return input_index is not None and node.inputs[input_index].is_linked
+
+
+class NodeRecord:
+    """Searched properties of one node, 'index' is the position of the node in its snapshot."""
+
+    __slots__ = (
+        "tree",
+        "index",
+        "name",
+        "label",
+        "bl_idname",
+        "has_group",
+        "group",
+        "outputs_count",
+        "linked_outputs_count",
+        "attribute",
+        "attribute_linked",
+        "has_image",
+        "image",
+    )
+
+    def __init__(self, tree: "TreeSnapshot", index: int, node: typing.Any):
+        self.tree = tree
+        self.index = index
+        self.name: str = node.name
+        self.label: str = node.label
+        self.bl_idname: str = node.bl_idname
+        # Group nodes have the node tree property, which is None if the node group is missing
+        self.has_group = hasattr(node, "node_tree")
+        self.group = node.node_tree if self.has_group else None
+        outputs = node.outputs
+        self.outputs_count = len(outputs)
+        self.linked_outputs_count = sum(output.is_linked for output in outputs)
+        self.attribute = get_attribute_name(node)
+        # Linked names are evaluated by the search, the links can lead to other node trees
+        self.attribute_linked = is_attribute_linked(node)
+        self.has_image = hasattr(node, "image")
+        self.image = node.image if self.has_image else None
+
+
+class TreeSnapshot:
+    """Records of all nodes of a node tree except frames, which are not searched."""
+
+    __slots__ = ("node_tree", "nodes", "records", "group_records", "nodes_count", "_graph")
+
+    def __init__(self, node_tree: typing.Any):
+        run_steps(self._read(node_tree))
+
+    @classmethod
+    def build_steps(cls, node_tree: typing.Any) -> Steps["TreeSnapshot"]:
+        """Builds the snapshot in steps of BUILD_CHUNK_SIZE nodes."""
+        tree = cls.__new__(cls)
+        yield from tree._read(node_tree)
+        return tree
+
+    def _read(self, node_tree: typing.Any) -> Steps[None]:
+        self.node_tree = node_tree
+        # The live nodes, used to map the records found by the search back to the nodes
+        self.nodes = [node for node in node_tree.nodes if node.bl_idname != "NodeFrame"]
+        self.records: list[NodeRecord] = []
+        for start in range(0, len(self.nodes), BUILD_CHUNK_SIZE):
+            chunk = self.nodes[start : start + BUILD_CHUNK_SIZE]
+            self.records.extend(NodeRecord(self, i, node) for i, node in enumerate(chunk, start))
+            yield
+        self.group_records = [record for record in self.records if record.group is not None]
+        self.nodes_count = len(node_tree.nodes)
+        self._graph: LinkGraph | None = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def node(self, record: NodeRecord) -> typing.Any:
+        return self.nodes[record.index]
+
+    @property
+    def graph(self) -> "LinkGraph":
+        """Links between the nodes, built on first use, only reachability filters need them."""
+        if self._graph is None:
+            self._graph = LinkGraph(self.nodes, self.node_tree.links)
+        return self._graph
+
+
+class LinkGraph:
+    """Adjacency lists of the nodes of a snapshot by their index, built in one pass over links."""
+
+    __slots__ = ("upstream", "downstream")
+
+    def __init__(self, nodes: list[typing.Any], links: typing.Iterable[typing.Any]):
+        positions = {node: i for i, node in enumerate(nodes)}
+        self.upstream: list[list[int]] = [[] for _ in nodes]
+        self.downstream: list[list[int]] = [[] for _ in nodes]
+        for link in links:
+            if link.is_muted:
+                continue
+            from_index = positions.get(link.from_node)
+            to_index = positions.get(link.to_node)
+            if from_index is None or to_index is None:
+                continue
+            self.downstream[from_index].append(to_index)
+            self.upstream[to_index].append(from_index)
+
+    def reach(
+        self, starts: typing.Iterable[int], direction: str, max_hops: int | None = None
+    ) -> set[int]:
+        """Returns indices of nodes reachable from the starts in one breadth first search.
+
+        The direction is 'UPSTREAM', 'DOWNSTREAM' or 'BOTH', the starts are included.
+        """
+        adjacency = []
+        if direction in {'UPSTREAM', 'BOTH'}:
+            adjacency.append(self.upstream)
+        if direction in {'DOWNSTREAM', 'BOTH'}:
+            adjacency.append(self.downstream)
+
+        reached = set(starts)
+        queue = collections.deque((start, 0) for start in reached)
+        while len(queue) > 0:
+            current, hops = queue.popleft()
+            if max_hops is not None and hops >= max_hops:
+                continue
+            for neighbours in adjacency:
+                for neighbour in neighbours[current]:
+                    if neighbour not in reached:
+                        reached.add(neighbour)
+                        queue.append((neighbour, hops + 1))
+
+        return reached
+
+
+class ReachabilityFilter:
+    """Matches records of nodes reachable over the links from the start nodes of their tree.
+
+    The search is done once per snapshot, on the first record of the snapshot.
+    """
+
+    def __init__(
+        self,
+        starts: typing.Callable[[TreeSnapshot], typing.Iterable[int]],
+        direction: str,
+        max_hops: int | None = None,
+        include_starts: bool = False,
+        invert: bool = False,
+    ):
+        self.starts = starts
+        self.direction = direction
+        self.max_hops = max_hops
+        self.include_starts = include_starts
+        self.invert = invert
+        self._reached: dict[TreeSnapshot, set[int]] = {}
+
+    def __call__(self, record: NodeRecord) -> bool:
+        reached = self._reached.get(record.tree)
+        if reached is None:
+            starts = list(self.starts(record.tree))
+            reached = record.tree.graph.reach(starts, self.direction, self.max_hops)
+            if not self.include_starts:
+                reached.difference_update(starts)
+            self._reached[record.tree] = reached
+
+        return (record.index in reached) != self.invert
+
+
+def output_indices(tree: TreeSnapshot) -> list[int]:
+    return [record.index for record in tree.records if record.bl_idname in OUTPUT_NODES]
+
+
+def not_contributing_filter() -> ReachabilityFilter:
+    """Matches nodes from which no links lead to an output node of their node tree."""
+    return ReachabilityFilter(output_indices, 'UPSTREAM', include_starts=True, invert=True)
+
+
+def is_unconnected(record: NodeRecord) -> bool:
+    return record.outputs_count > 0 and record.linked_outputs_count == 0
+
+
+def is_missing_node_group(record: NodeRecord) -> bool:
+    return record.has_group and record.group is None
+
+
+def count_occurrences(
+    children: typing.Mapping[K, list[K]], direct: typing.Mapping[K, int]
+) -> tuple[dict[K, int], dict[K, int]]:
+    """Counts found nodes in each node tree, including the nodes in its node groups.
+
+    'children' maps each node tree to the node trees of its found group nodes, once for every
+    group node instance. 'direct' is the number of nodes found directly in each node tree. Node
+    groups form a DAG, the node trees are processed iteratively in post-order, so each node tree
+    is counted once, no matter how many times or how deep its group is used.
+
+    Returns the per instance counts, which add the count of a node group for every group node
+    using it, and the unique counts, which consider every found node only once.
+    """
+    direct_counts = list(direct.values())
+    bits = {node_tree: 1 << i for i, node_tree in enumerate(direct)}
+    counts: dict[K, int] = {}
+    unique_counts: dict[K, int] = {}
+    # Node trees reachable from each node tree as bit sets, used for the unique counts
+    reachable: dict[K, int] = {}
+    for root in children:
+        stack = [(root, False)]
+        while len(stack) > 0:
+            node_tree, expanded = stack.pop()
+            if node_tree in reachable:
+                continue
+
+            if not expanded:
+                stack.append((node_tree, True))
+                stack.extend(
+                    (child, False) for child in children[node_tree] if child not in reachable
+                )
+                continue
+
+            count = direct[node_tree]
+            reached = bits[node_tree]
+            for child in children[node_tree]:
+                count += counts[child]
+                reached |= reachable[child]
+
+            reachable[node_tree] = reached
+            counts[node_tree] = count
+            unique = 0
+            while reached:
+                lowest = reached & -reached
+                unique += direct_counts[lowest.bit_length() - 1]
+                reached ^= lowest
+            unique_counts[node_tree] = unique
+
+    return counts, unique_counts
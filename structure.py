@@ -0,0 +1,364 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# Structural hashes of node trees, computed bottom-up over the node groups they use, like a
+# Merkle tree. Equal hashes mean the node trees do the same, no matter the names, labels and
+# locations of their nodes. Hashes are stable across sessions.
+
+import collections
+import hashlib
+import typing
+
+from . import snapshot
+
+# Properties of the base node type changing what the node does, the others are e.g. names,
+# locations or colors of the nodes
+BASE_KEY_PROPERTIES = {"mute"}
+# Properties hashed separately, referencing other nodes or changing only the UI
+SKIPPED_PROPERTIES = {
+    "rna_type",
+    "node_tree",
+    "paired_output",
+    "active_item",
+    "active_index",
+    "select",
+}
+# Nested structs, e.g. points of curve mappings, are hashed up to this depth
+MAX_PROPERTY_DEPTH = 4
+# Duplicate subgraphs have at least this many nodes on their longest chain of links
+MIN_SUBGRAPH_DEPTH = 3
+# Used in place of hash of a node group that is being hashed, possible only in invalid files
+CYCLE = b"cycle"
+
+
+def _digest(*parts: typing.Any) -> bytes:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+
+
+# Mapping of bl_idname -> identifiers of the properties hashed in node signatures
+_node_properties: dict[str, tuple[str, ...]] = {}
+
+
+def _value(value: typing.Any, depth: int = 0) -> typing.Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    # Enum flags
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    # Data-blocks, e.g. images or objects in inputs
+    if getattr(value, "id_data", None) is value:
+        return value.name
+    # Nested structs, e.g. color ramps or curve mappings
+    if hasattr(value, "bl_rna"):
+        if depth >= MAX_PROPERTY_DEPTH:
+            return type(value).__name__
+        return _struct_values(value, _properties(value.bl_rna), depth + 1)
+    name = getattr(value, "name", None)
+    if isinstance(name, str):
+        return name
+    # Arrays and collections
+    try:
+        return tuple(_value(x, depth + 1) for x in value)
+    except TypeError:
+        return type(value).__name__
+
+
+def _properties(bl_rna: typing.Any, skipped: typing.Container[str] = ()) -> tuple[str, ...]:
+    return tuple(
+        prop.identifier
+        for prop in bl_rna.properties
+        if prop.identifier not in SKIPPED_PROPERTIES and prop.identifier not in skipped
+    )
+
+
+def _node_property_names(node: typing.Any) -> tuple[str, ...]:
+    names = _node_properties.get(node.bl_idname)
+    if names is None:
+        bl_rna = getattr(node, "bl_rna", None)
+        if bl_rna is None:
+            names = ()
+        else:
+            base = bl_rna
+            while base.base is not None:
+                base = base.base
+            base_properties = {x.identifier for x in base.properties} - BASE_KEY_PROPERTIES
+            names = _properties(bl_rna, base_properties)
+        _node_properties[node.bl_idname] = names
+
+    return names
+
+
+def _struct_values(struct: typing.Any, names: tuple[str, ...], depth: int) -> tuple:
+    return tuple((name, _value(getattr(struct, name, None), depth)) for name in names)
+
+
+def _socket_values(sockets: typing.Iterable[typing.Any], skip_linked: bool) -> tuple:
+    return tuple(
+        (socket.identifier, _value(getattr(socket, "default_value", None)))
+        for socket in sockets
+        if not (skip_linked and socket.is_linked)
+    )
+
+
+def node_signature(node: typing.Any) -> bytes:
+    """Hash of the node alone, its type, properties and values of its sockets.
+
+    All properties of the node type are hashed, except the ones common to all nodes not changing
+    what the node does. Values of linked inputs are skipped, values of outputs are always hashed,
+    they are the values of input nodes, e.g. Value or RGB.
+    """
+    properties = _struct_values(node, _node_property_names(node), 0)
+    return _digest(
+        node.bl_idname,
+        properties,
+        _socket_values(node.inputs, True),
+        _socket_values(node.outputs, False),
+    )
+
+
+class TreeStructure:
+    """Signatures of nodes and links of one snapshot, computed once per snapshot."""
+
+    __slots__ = ("signatures", "links")
+
+    def __init__(self, tree: snapshot.TreeSnapshot):
+        snapshot.run_steps(self._read(tree))
+
+    @classmethod
+    def build_steps(cls, tree: snapshot.TreeSnapshot) -> snapshot.Steps["TreeStructure"]:
+        """Computes the signatures in steps of BUILD_CHUNK_SIZE nodes."""
+        structure = cls.__new__(cls)
+        yield from structure._read(tree)
+        return structure
+
+    def _read(self, tree: snapshot.TreeSnapshot) -> snapshot.Steps[None]:
+        self.signatures: list[bytes] = []
+        for start in range(0, len(tree.nodes), snapshot.BUILD_CHUNK_SIZE):
+            chunk = tree.nodes[start : start + snapshot.BUILD_CHUNK_SIZE]
+            self.signatures.extend(node_signature(node) for node in chunk)
+            yield
+        positions = {node: i for i, node in enumerate(tree.nodes)}
+        # List of (from index, from socket, to index, to socket) of links that aren't muted
+        self.links: list[tuple[int, str, int, str]] = []
+        for link in tree.node_tree.links:
+            if link.is_muted:
+                continue
+            from_index = positions.get(link.from_node)
+            to_index = positions.get(link.to_node)
+            if from_index is None or to_index is None:
+                continue
+            self.links.append(
+                (from_index, link.from_socket.identifier, to_index, link.to_socket.identifier)
+            )
+
+
+def _hash_subgraphs(
+    node_hashes: list[bytes], neighbours: list[list[tuple[str, int, str]]]
+) -> tuple[list[bytes], list[int]]:
+    """Hashes of the subgraphs reachable from each node and lengths of their longest chains.
+
+    'neighbours' are lists of (socket, neighbour index, neighbour socket) of each node, the links
+    are followed in one direction only. The subgraphs include the node itself.
+    """
+    count = len(node_hashes)
+    hashes: list[bytes | None] = [None] * count
+    depths = [0] * count
+    for root in range(count):
+        stack = [(root, False)]
+        while len(stack) > 0:
+            current, expanded = stack.pop()
+            if hashes[current] is not None:
+                continue
+            if not expanded:
+                # Marks the node as entered, links back to it are ignored in invalid trees
+                depths[current] = -1
+                stack.append((current, True))
+                stack.extend(
+                    (other, False) for _, other, _ in neighbours[current] if depths[other] == 0
+                )
+                continue
+
+            linked = [x for x in neighbours[current] if hashes[x[1]] is not None]
+            reachable = sorted(
+                (socket, other_socket, hashes[other]) for socket, other, other_socket in linked
+            )
+            hashes[current] = _digest(node_hashes[current], reachable)
+            depths[current] = 1 + max((depths[x] for _, x, _ in linked), default=0)
+
+    return hashes, depths
+
+
+class TreeHashes:
+    """Hash of one node tree and hashes of its nodes, including the node groups they use.
+
+    Each node is hashed together with the subgraphs upstream and downstream of it, the node tree
+    hash is computed from these, so it depends on how the nodes are connected, not only on which
+    nodes and links there are.
+    """
+
+    __slots__ = ("snapshot", "structure", "child_hashes", "node_hashes", "upstream", "hash")
+
+    def __init__(self, tree: snapshot.TreeSnapshot, structure: TreeStructure, child_hashes: tuple):
+        self.snapshot = tree
+        self.structure = structure
+        # Hashes of the node groups of the group records, in their order
+        self.child_hashes = child_hashes
+        self.node_hashes = list(structure.signatures)
+        for record, child_hash in zip(tree.group_records, child_hashes):
+            self.node_hashes[record.index] = _digest(self.node_hashes[record.index], child_hash)
+
+        count = len(self.node_hashes)
+        inputs: list[list[tuple[str, int, str]]] = [[] for _ in range(count)]
+        outputs: list[list[tuple[str, int, str]]] = [[] for _ in range(count)]
+        for from_index, from_socket, to_index, to_socket in structure.links:
+            inputs[to_index].append((to_socket, from_index, from_socket))
+            outputs[from_index].append((from_socket, to_index, to_socket))
+
+        # Hashes of the subgraphs upstream of each node and lengths of their longest chains
+        self.upstream = _hash_subgraphs(self.node_hashes, inputs)
+        downstream, _ = _hash_subgraphs(self.node_hashes, outputs)
+        # Sorted, so the order of the nodes doesn't change the hash
+        self.hash = _digest(
+            tree.node_tree.bl_idname,
+            sorted(_digest(up, down) for up, down in zip(self.upstream[0], downstream)),
+        )
+
+
+class StructureHashes:
+    """Merkle hashes of node trees, each node tree is hashed after the node groups it uses.
+
+    A node tree is hashed again only if its snapshot was replaced or the hash of any of its node
+    groups changed, the signatures of its nodes are reused if only the node groups changed.
+    """
+
+    def __init__(
+        self, get_snapshot: typing.Callable[[typing.Any], snapshot.Steps[snapshot.TreeSnapshot]]
+    ):
+        # Returns steps building the snapshot of the node tree, if it doesn't exist yet
+        self.get_snapshot = get_snapshot
+        self._trees: dict[typing.Any, TreeHashes] = {}
+
+    def update(self, node_trees: typing.Iterable[typing.Any]) -> dict[typing.Any, TreeHashes]:
+        """Returns up to date hashes of the node trees and all node groups they use."""
+        return snapshot.run_steps(self.update_steps(node_trees))
+
+    def update_steps(
+        self, node_trees: typing.Iterable[typing.Any]
+    ) -> snapshot.Steps[dict[typing.Any, TreeHashes]]:
+        """Same as 'update' done in steps, the snapshots and signatures are built in chunks of
+        nodes and each node tree is hashed in its own step.
+        """
+        done: dict[typing.Any, TreeHashes] = {}
+        entered = set()
+        for root in node_trees:
+            stack = [(root, False)]
+            while len(stack) > 0:
+                node_tree, expanded = stack.pop()
+                if node_tree in done:
+                    continue
+
+                tree = yield from self.get_snapshot(node_tree)
+                if not expanded:
+                    if node_tree in entered:
+                        continue
+                    entered.add(node_tree)
+                    stack.append((node_tree, True))
+                    stack.extend(
+                        (record.group, False)
+                        for record in tree.group_records
+                        if record.group not in done
+                    )
+                    continue
+
+                done[node_tree] = yield from self._update(node_tree, tree, done)
+                yield
+
+        return done
+
+    def _update(
+        self,
+        node_tree: typing.Any,
+        tree: snapshot.TreeSnapshot,
+        done: dict[typing.Any, TreeHashes],
+    ) -> snapshot.Steps[TreeHashes]:
+        child_hashes = tuple(
+            done[record.group].hash if record.group in done else CYCLE
+            for record in tree.group_records
+        )
+        tree_hashes = self._trees.get(node_tree)
+        if tree_hashes is not None and tree_hashes.snapshot is tree:
+            if tree_hashes.child_hashes == child_hashes:
+                return tree_hashes
+            structure = tree_hashes.structure
+        else:
+            structure = yield from TreeStructure.build_steps(tree)
+
+        tree_hashes = TreeHashes(tree, structure, child_hashes)
+        self._trees[node_tree] = tree_hashes
+        return tree_hashes
+
+    def clear(self) -> None:
+        self._trees.clear()
+
+
+class DuplicateGroupFilter:
+    """Matches group nodes using a node group structurally equal to another node group.
+
+    The node groups are hashed by 'prepare', or on the first call if it wasn't run.
+    """
+
+    def __init__(
+        self, hashes: StructureHashes, node_groups: typing.Callable[[], typing.Iterable[typing.Any]]
+    ):
+        self.hashes = hashes
+        self.node_groups = node_groups
+        self._duplicates: set[typing.Any] | None = None
+
+    def prepare(self) -> snapshot.Steps[None]:
+        node_groups = list(self.node_groups())
+        tree_hashes = yield from self.hashes.update_steps(node_groups)
+        counts = collections.Counter(tree_hashes[x].hash for x in node_groups)
+        self._duplicates = {x for x in node_groups if counts[tree_hashes[x].hash] > 1}
+
+    def __call__(self, record: snapshot.NodeRecord) -> bool:
+        if record.group is None:
+            return False
+        if self._duplicates is None:
+            snapshot.run_steps(self.prepare())
+
+        return record.group in self._duplicates
+
+
+class DuplicateSubgraphFilter:
+    """Matches nodes whose upstream subgraph also exists elsewhere in the node trees.
+
+    Only subgraphs with at least MIN_SUBGRAPH_DEPTH nodes on their longest chain are considered.
+    Node groups are counted once, no matter how many group nodes use them. The node trees are
+    hashed by 'prepare', or on the first call if it wasn't run.
+    """
+
+    def __init__(
+        self, hashes: StructureHashes, node_trees: typing.Callable[[], typing.Iterable[typing.Any]]
+    ):
+        self.hashes = hashes
+        self.node_trees = node_trees
+        self._tree_hashes: dict[typing.Any, TreeHashes] | None = None
+        self._counts: collections.Counter[bytes] = collections.Counter()
+
+    def prepare(self) -> snapshot.Steps[None]:
+        tree_hashes = yield from self.hashes.update_steps(self.node_trees())
+        for hashes, depths in (x.upstream for x in tree_hashes.values()):
+            self._counts.update(
+                x for x, depth in zip(hashes, depths) if depth >= MIN_SUBGRAPH_DEPTH
+            )
+        self._tree_hashes = tree_hashes
+
+    def __call__(self, record: snapshot.NodeRecord) -> bool:
+        if self._tree_hashes is None:
+            snapshot.run_steps(self.prepare())
+
+        tree_hashes = self._tree_hashes.get(record.tree.node_tree)
+        if tree_hashes is None or tree_hashes.snapshot is not record.tree:
+            return False
+
+        hashes, depths = tree_hashes.upstream
+        return depths[record.index] >= MIN_SUBGRAPH_DEPTH and self._counts[hashes[record.index]] > 1
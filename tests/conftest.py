@@ -0,0 +1,19 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+# The tests run in plain Python, the add-on package is imported with the stand-in of bpy used by
+# the benchmarks:
+#
+#   python -m pytest tests
+
+import os
+import sys
+import types
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+)
+
+import fake_bpy
+
+fake_bpy.install(types.SimpleNamespace())
+fake_bpy.load_package()
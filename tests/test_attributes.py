@@ -0,0 +1,84 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import types
+
+from improved_node_search import attributes
+from improved_node_search import snapshot
+
+
+class Socket:
+    def __init__(self, default_value="", identifier: str = "Name"):
+        self.identifier = identifier
+        self.default_value = default_value
+        self.links = []
+
+    @property
+    def is_linked(self) -> bool:
+        return len(self.links) > 0
+
+
+class Node:
+    def __init__(self, name: str, bl_idname: str, attribute: str | None = None):
+        self.name = name
+        self.label = ""
+        self.bl_idname = bl_idname
+        self.outputs = [Socket(identifier="Out")]
+        self.inputs = []
+        input_index = snapshot.ATTRIBUTE_INPUTS.get(bl_idname)
+        if input_index is not None:
+            self.inputs = [Socket(identifier=str(i)) for i in range(input_index)]
+            self.inputs.append(Socket(attribute))
+
+
+def link(from_node: Node, to_node: Node) -> None:
+    to_socket = to_node.inputs[snapshot.ATTRIBUTE_INPUTS[to_node.bl_idname]]
+    to_socket.links.append(
+        types.SimpleNamespace(
+            from_node=from_node,
+            from_socket=from_node.outputs[0],
+            to_socket=to_socket,
+            is_muted=False,
+        )
+    )
+
+
+class NodeTree:
+    def __init__(self, nodes: list[Node]):
+        self.nodes = nodes
+        self.links = []
+
+
+def attribute_index(*nodes: Node) -> attributes.FileAttributeIndex:
+    node_tree = NodeTree(list(nodes))
+    attribute_index = attributes.FileAttributeIndex()
+    attribute_index.update([snapshot.TreeSnapshot(node_tree)])
+    return attribute_index
+
+
+def test_empty_names_are_indexed():
+    reader = Node("Read", "GeometryNodeInputNamedAttribute", "")
+    writer = Node("Store", "GeometryNodeStoreNamedAttribute", "mask")
+    found = attribute_index(reader, writer)
+
+    assert found.names() == ["", "mask"]
+    assert found.find(lambda name: name == "") == {reader}
+    assert found.find(lambda name: True) == {reader, writer}
+
+
+def test_linked_names_are_evaluated():
+    string = Node("String", attributes.STRING_NODE)
+    string.string = "mask"
+    reader = Node("Read", "GeometryNodeInputNamedAttribute", "")
+    link(string, reader)
+
+    assert attribute_index(string, reader).names() == ["mask"]
+
+
+def test_unresolved_linked_names_fall_back_to_input_value():
+    unknown = Node("Unknown", "GeometryNodeObjectInfo")
+    reader = Node("Read", "GeometryNodeInputNamedAttribute", "fallback")
+    link(unknown, reader)
+    found = attribute_index(unknown, reader)
+
+    assert found.names() == ["fallback"]
+    assert found.find(lambda name: name == "fallback") == {reader}
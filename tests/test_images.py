@@ -0,0 +1,91 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import threading
+import time
+
+from improved_node_search import images
+from improved_node_search import snapshot
+
+
+class Image:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.packed_file = None
+        self.source = 'FILE'
+        self.library = None
+
+    def as_pointer(self) -> int:
+        return id(self)
+
+
+class Node:
+    def __init__(self, name: str, image: Image | None):
+        self.name = name
+        self.label = ""
+        self.bl_idname = "ShaderNodeTexImage"
+        self.inputs = []
+        self.outputs = []
+        self.image = image
+
+
+class NodeTree:
+    def __init__(self, nodes: list[Node]):
+        self.nodes = nodes
+        self.links = []
+
+
+def search_missing(
+    *nodes: Node, timeout: float | None = images.CHECK_TIMEOUT
+) -> tuple[images.MissingImageFilter, list[str]]:
+    tree = snapshot.TreeSnapshot(NodeTree(list(nodes)))
+    image_filter = images.MissingImageFilter(timeout)
+    return image_filter, [tree.node(x).name for x in tree.records if image_filter(x)]
+
+
+def test_missing_files_are_found(tmp_path):
+    images.PATH_CACHE.clear()
+    existing = tmp_path / "existing.png"
+    existing.write_bytes(b"")
+    nodes = (
+        Node("Existing", Image(str(existing))),
+        Node("Missing", Image(str(tmp_path / "missing.png"))),
+        Node("Empty", None),
+    )
+
+    assert search_missing(*nodes)[1] == ["Missing", "Empty"]
+
+
+def test_only_used_images_are_checked(tmp_path, monkeypatch):
+    images.PATH_CACHE.clear()
+    checked = []
+    monkeypatch.setattr(images, "_check_path", lambda path: checked.append(path) or False)
+    monkeypatch.setattr(images.bpy.data, "images", [Image(str(tmp_path / "unused.png"))])
+
+    search_missing(Node("Used", Image(str(tmp_path / "used.png"))))
+    assert checked == [str(tmp_path / "used.png")]
+
+
+def test_files_not_checked_in_time_are_unknown(tmp_path, monkeypatch):
+    images.PATH_CACHE.clear()
+    release = threading.Event()
+    monkeypatch.setattr(images, "_check_path", lambda path: release.wait(5.0) and False)
+    node = Node("Slow", Image(str(tmp_path / "slow.png")))
+    try:
+        image_filter, found = search_missing(node, timeout=0.01)
+    finally:
+        release.set()
+
+    assert found == []
+    assert [x for _, x in image_filter.unchecked] == [node]
+    assert image_filter.timed_out == [str(tmp_path / "slow.png")]
+
+
+def test_unlimited_checks_wait_for_all_files(tmp_path, monkeypatch):
+    images.PATH_CACHE.clear()
+    monkeypatch.setattr(images, "_check_path", lambda path: time.sleep(0.05) or False)
+    image_filter, found = search_missing(
+        Node("Slow", Image(str(tmp_path / "slow.png"))), timeout=None
+    )
+
+    assert found == ["Slow"]
+    assert image_filter.unchecked == []
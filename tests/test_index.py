@@ -0,0 +1,144 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import itertools
+import re
+
+import pytest
+
+import fake_bpy
+
+from improved_node_search import index
+from improved_node_search import snapshot
+
+NAMES = (
+    "Math",
+    "Math.001",
+    "Vector Math",
+    "MATH",
+    "ma",
+    "Mix Shader",
+    "Noise Texture",
+    "Straße",
+    "STRASSE",
+    "İstanbul",
+    "Ǆemal",
+)
+
+
+def make_index() -> index.NodeTreeIndex:
+    return index.NodeTreeIndex(fake_bpy.NodeTree("Names", [fake_bpy.Node(x) for x in NAMES]))
+
+
+@pytest.mark.parametrize("match_case", [False, True])
+@pytest.mark.parametrize(
+    "search", ["math", "MATH", "ath.0", "ma", "x sh", "straße", "istan", "ǆem"]
+)
+def test_candidates_contain_all_substring_matches(search, match_case):
+    tree_index = make_index()
+    if match_case:
+        expected = {x for x in NAMES if search in x}
+    else:
+        expected = {x for x in NAMES if search.lower() in x.lower()}
+
+    candidates = set(tree_index.candidates(index.FIELD_NAME, (search,), match_case))
+    assert expected <= candidates
+    found = tree_index.lookup(index.FIELD_NAME, search, match_case, False)
+    assert {x.name for x in found} == expected
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "Math",
+        "Ma.h",
+        r"Math\.\d+",
+        "Vec(tor)? Math",
+        "(?:Vector|Scalar) Math",
+        "Mix|Noise",
+        "(Math)+",
+        "^Noise Tex",
+        "Stra(ss|ß)e",
+        "(?i)math",
+        "(?i)strasse",
+        "(?i)straße",
+        "(?i)istanbul",
+        "(?i)ǆemal",
+        "(?i)Ma[tT]h",
+    ],
+)
+def test_pattern_lookup_finds_all_matches(pattern):
+    pattern = re.compile(pattern)
+    tree_index = make_index()
+    literals = index.required_literals(pattern)
+    expected = {x for x in NAMES if pattern.match(x)}
+
+    match_case = not pattern.flags & re.IGNORECASE
+    assert expected <= set(tree_index.candidates(index.FIELD_NAME, literals, match_case))
+    assert {x.name for x in tree_index.lookup_pattern(index.FIELD_NAME, pattern)} == expected
+
+
+@pytest.mark.parametrize(
+    "pattern, literals",
+    [
+        ("Vector Math", ["Vector Math"]),
+        ("Vec(tor)? Math", ["Vec", " Math"]),
+        ("(Math)+Node", ["Math", "Node"]),
+        ("^Noise$", ["Noise"]),
+        ("Mix|Noise", []),
+        ("Ma.h", []),
+        ("(?i)MATH", ["math"]),
+    ],
+)
+def test_required_literals(pattern, literals):
+    assert index.required_literals(re.compile(pattern)) == literals
+
+
+def test_cached_results_are_invalidated_by_tree_edits():
+    cache = index.ResultCache()
+    node_tree = fake_bpy.NodeTree("Cached", [fake_bpy.Node("Math"), fake_bpy.Node("Mix")])
+    cache.set(node_tree, "math", node_tree.nodes[:1], node_tree.nodes[:1])
+    assert cache.get(node_tree, "math").found == {node_tree.nodes[0]}
+    assert cache.get(node_tree, "mix") is None
+
+    index._depsgraph_update_post(None, fake_bpy.Depsgraph([node_tree]))
+    assert cache.get(node_tree, "math") is None
+    assert len(cache) == 0
+
+    # Nodes added without any update of the node tree
+    cache.set(node_tree, "math", node_tree.nodes[:1], node_tree.nodes[:1])
+    node_tree.nodes.append(fake_bpy.Node("Math.001"))
+    assert cache.get(node_tree, "math") is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = index.ResultCache(size=6)
+    trees = [fake_bpy.NodeTree(f"Tree{i}", [fake_bpy.Node("Math")]) for i in range(3)]
+    # Every entry counts its found nodes and itself
+    for node_tree in trees[:2]:
+        cache.set(node_tree, "math", node_tree.nodes, node_tree.nodes)
+    cache.get(trees[0], "math")
+    cache.set(trees[2], "math", trees[2].nodes, trees[2].nodes)
+    assert cache.nodes_count == 6
+
+    cache.set(trees[2], "node", [], [])
+    assert cache.get(trees[1], "math") is None
+    assert cache.get(trees[0], "math") is not None
+    assert cache.get(trees[2], "math") is not None
+    assert cache.nodes_count <= cache.size
+
+
+def test_index_is_built_in_steps(monkeypatch):
+    monkeypatch.setattr(snapshot, "BUILD_CHUNK_SIZE", 2)
+    node_tree = fake_bpy.NodeTree("Steps", [fake_bpy.Node(f"Math.{i:03}") for i in range(5)])
+    steps = index.index_steps(node_tree)
+    assert sum(1 for _ in itertools.islice(steps, 10)) == 3
+    assert len(index.get_index(node_tree).nodes) == 5
+
+    # Changed between the steps, the built index is used only by the interrupted build
+    node_tree = fake_bpy.NodeTree("Changed", [fake_bpy.Node("Math")])
+    steps = index.index_steps(node_tree)
+    next(steps)
+    index.invalidate(node_tree)
+    built = snapshot.run_steps(steps)
+    assert index.get_index(node_tree) is not built
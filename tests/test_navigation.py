@@ -0,0 +1,41 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import types
+
+from improved_node_search import search
+
+
+class Path(list):
+    """Stand-in of the node editor path, items have the node tree and the group node."""
+
+    def start(self, node_tree) -> None:
+        self[:] = [types.SimpleNamespace(node_tree=node_tree, node=None)]
+
+    def append(self, node_tree, node=None) -> None:
+        super().append(types.SimpleNamespace(node_tree=node_tree, node=node))
+
+
+ROOT, GROUP, INNER = "Root", "Group", "Inner"
+GROUP_NODE = types.SimpleNamespace(node_tree=GROUP, id_data=ROOT)
+INNER_NODE = types.SimpleNamespace(node_tree=INNER, id_data=GROUP)
+
+
+def enter(current: list[str], path: tuple) -> list[str]:
+    space = types.SimpleNamespace(path=Path())
+    for node_tree in current:
+        space.path.append(node_tree)
+    search.enter_node_group_path(space, path)
+    return [x.node_tree for x in space.path]
+
+
+def test_enter_nested_group():
+    assert enter([ROOT], (GROUP_NODE, INNER_NODE)) == [ROOT, GROUP, INNER]
+
+
+def test_leave_to_shared_parent():
+    assert enter([ROOT, GROUP, INNER], (GROUP_NODE,)) == [ROOT, GROUP]
+    assert enter([ROOT, GROUP, INNER], ()) == [ROOT]
+
+
+def test_no_common_prefix_starts_again():
+    assert enter([], (GROUP_NODE, INNER_NODE)) == [ROOT, GROUP, INNER]
@@ -0,0 +1,71 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import time
+
+import pytest
+
+from improved_node_search import query
+
+
+@pytest.fixture(autouse=True)
+def clean_stats(monkeypatch):
+    monkeypatch.setattr(query, "PREDICATE_STATS", {})
+    monkeypatch.setattr(query, "CALIBRATION_SAMPLES", 4)
+
+
+def names(plan: query.QueryPlan) -> list[str]:
+    return [x.name for x in plan.predicates]
+
+
+def test_predicates_are_ordered_by_cost_per_hit():
+    plan = query.QueryPlan(
+        [
+            query.Predicate("expensive", lambda x: False, cost=1e-3),
+            query.Predicate("cheap", lambda x: False, cost=1e-7),
+            query.Predicate("medium", lambda x: False, cost=1e-5),
+        ]
+    )
+    assert names(plan) == ["cheap", "medium", "expensive"]
+
+
+def test_calibration_reorders_by_measured_hit_rate():
+    def slow_miss(value: int) -> bool:
+        time.sleep(1e-3)
+        return False
+
+    # The estimates are wrong, the slow predicate never matches
+    plan = query.QueryPlan(
+        [
+            query.Predicate("slow_miss", slow_miss, cost=1e-7),
+            query.Predicate("even", lambda x: x % 2 == 0, cost=1e-3),
+        ]
+    )
+    assert names(plan) == ["slow_miss", "even"]
+
+    assert [plan.matches(x) for x in range(8)] == [x % 2 == 0 for x in range(8)]
+    assert names(plan) == ["even", "slow_miss"]
+    assert query.PREDICATE_STATS["slow_miss"].hit_rate < query.PREDICATE_STATS["even"].hit_rate
+
+    # Statistics are shared by the following plans
+    plan = query.QueryPlan(
+        [query.Predicate("slow_miss", slow_miss), query.Predicate("even", lambda x: x % 2 == 0)]
+    )
+    assert names(plan) == ["even", "slow_miss"]
+
+
+def test_fused_predicates_match_any():
+    calls = []
+
+    def second(value: int) -> bool:
+        calls.append(value)
+        return value == 2
+
+    plan = query.QueryPlan(
+        [query.Predicate("first", lambda x: x == 1, cost=1e-7), query.Predicate("second", second)]
+    )
+    plan.finish_calibration()
+    assert [plan.matches(x) for x in range(4)] == [False, True, True, False]
+    # The second predicate isn't evaluated when the first one matches
+    assert calls == [0, 2, 3]
+    assert len(query.QueryPlan([])) == 0
+    assert not query.QueryPlan([]).matches(1)
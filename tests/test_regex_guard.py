@@ -0,0 +1,53 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import re
+
+import pytest
+
+from improved_node_search import index
+from improved_node_search import search
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"(a+)+$",
+        r"(a|.)+$",
+        # sre factors out the common prefix, (a(?:|a))+
+        r"(a|aa)+$",
+        r"(a|ab)+",
+        r"(?=(a+)+$)",
+        r"(?!(x+x+)+y)",
+        r"(?<=x)((a+)+)",
+        r"(?>(a+)+)",
+        r".*.*.*.*.*.*x",
+        r"(\w+\s?)+$",
+    ],
+)
+def test_slow_patterns_are_rejected(pattern):
+    assert index.catastrophic_backtracking_reason(re.compile(pattern)) is not None
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"^Math",
+        r"Mix.*Shader",
+        r"[A-Z]\w+",
+        r"(Math|Mix)\.\d+",
+        r".*a.*b.*c",
+        r"(ab|cd)+",
+        r"\d{3}$",
+    ],
+)
+def test_common_patterns_are_accepted(pattern):
+    assert index.catastrophic_backtracking_reason(re.compile(pattern)) is None
+
+
+def test_exact_match_anchors_whole_pattern():
+    pattern, error = search.compile_search_pattern("Math|Mix", exact_match=True)
+    assert error is None
+    assert pattern.match("Mix") is not None
+    assert pattern.match("Mix.001") is None
+    assert pattern.match("Math.001") is None
+    assert search.compile_search_pattern("(a+)+", exact_match=True)[0] is None
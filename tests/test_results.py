@@ -0,0 +1,136 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import re
+import time
+
+import bpy
+import fake_bpy
+
+from improved_node_search import index
+from improved_node_search import search
+from improved_node_search import snapshot
+
+
+class Options:
+    use_regex = False
+    match_case = False
+    exact_match = False
+    search_in_name = True
+    search_in_label = False
+    search_in_blidname = False
+    search_in_node_groups = True
+    search_unconnected = False
+    search_missing_images = False
+    search_missing_node_groups = False
+    search_duplicate_node_groups = False
+    search_duplicate_subgraphs = False
+    search_not_contributing = False
+    search_selection_relation = 'NONE'
+    selection_hops = 1
+    search_in_attribute = False
+    attribute_search = ""
+    search_scope = 'TREE'
+
+
+def update(node_tree: fake_bpy.NodeTree) -> None:
+    depsgraph = fake_bpy.Depsgraph([node_tree])
+    index._depsgraph_update_post(None, depsgraph)
+    search._depsgraph_update_post(None, depsgraph)
+
+
+def test_replaced_found_nodes_are_removed_and_recounted():
+    group = fake_bpy.NodeTree("Group", [fake_bpy.Node("Math"), fake_bpy.Node("Math.001")])
+    root = fake_bpy.NodeTree("Root", [fake_bpy.GroupNode("Group", group), fake_bpy.Node("Mix")])
+    node_search = search.create_node_search(root, "math", Options())
+    node_search.search()
+    search.set_search_results(node_search)
+    assert search.NODE_TREE_OCCURRENCES[root] == 2
+
+    # Same number of nodes, the removal isn't visible in the node count
+    removed = group.nodes.pop(0)
+    group.nodes.append(fake_bpy.Node("Value"))
+    update(group)
+
+    assert removed not in search.NODE_TREE_NODES[group]
+    assert search.NODE_TREE_OCCURRENCES[group] == 1
+    assert search.NODE_TREE_OCCURRENCES[root] == 1
+    search.clear_search_results()
+
+
+class RegexOptions(Options):
+    use_regex = True
+
+
+def test_aborted_regex_search_is_not_cached(monkeypatch):
+    index.RESULT_CACHE.clear()
+    root = fake_bpy.NodeTree("Regex", [fake_bpy.Node("Math"), fake_bpy.Node("Mix")])
+    monkeypatch.setattr(index, "REGEX_BUDGET", -1.0)
+    aborted = search.create_node_search(root, "Ma.*", RegexOptions())
+    assert aborted.search() == set()
+    assert aborted.aborted
+
+    monkeypatch.setattr(index, "REGEX_BUDGET", 10.0)
+    node_search = search.create_node_search(root, "Ma.*", RegexOptions())
+    assert {x.name for x in node_search.search()} == {"Math"}
+    assert not node_search.aborted
+
+
+def test_regex_budget_counts_only_lookups(monkeypatch):
+    monkeypatch.setattr(index, "REGEX_BUDGET", 0.05)
+    query = index.IndexQuery("", (index.FIELD_NAME,), pattern=re.compile("Ma"))
+    first = index.get_index(fake_bpy.NodeTree("First", [fake_bpy.Node("Math")]))
+    second = index.get_index(fake_bpy.NodeTree("Second", [fake_bpy.Node("Map Range")]))
+    assert len(query.find(first)) == 1
+    # Time between the lookups, e.g. building of other indices or the steps of the search
+    time.sleep(0.1)
+    assert len(query.find(second)) == 1
+    assert not query.aborted
+
+
+def test_edits_missed_by_depsgraph_are_found_by_next_search():
+    unused = fake_bpy.NodeTree("Unused", [fake_bpy.Node("Math"), fake_bpy.Node("Mix")])
+    assert {x.name for x in search.create_node_search(unused, "math", Options()).search()} == {
+        "Math"
+    }
+    version = index.get_tree_version(unused)
+
+    # Renamed without a depsgraph update, drawing doesn't pay for the validation
+    unused.nodes[1].name = "Math.001"
+    assert index.get_tree_version(unused) == version
+
+    node_search = search.create_node_search(unused, "math", Options())
+    assert {x.name for x in node_search.search()} == {"Math", "Math.001"}
+    assert index.get_tree_version(unused) != version
+
+
+class Material(fake_bpy.ID, bpy.types.Material):
+    def __init__(self, name: str, node_tree: fake_bpy.NodeTree):
+        super().__init__(name)
+        self.node_tree = node_tree
+
+
+class Scene(fake_bpy.ID):
+    def __init__(self, name: str, node_tree: fake_bpy.NodeTree):
+        super().__init__(name)
+        self.node_tree = node_tree
+
+
+def test_only_node_trees_and_their_owners_report_updates():
+    shading = fake_bpy.NodeTree("Shading", [fake_bpy.Node("Math")])
+    compositor = fake_bpy.NodeTree("Compositing", [fake_bpy.Node("Mix")])
+    depsgraph = fake_bpy.Depsgraph([Material("Material", shading), Scene("Scene", compositor)])
+
+    assert list(index.updated_node_trees(depsgraph)) == [shading]
+
+
+def test_cold_search_yields_before_whole_tree_is_read(monkeypatch):
+    monkeypatch.setattr(snapshot, "BUILD_CHUNK_SIZE", 2)
+    root = fake_bpy.NodeTree("Cold", [fake_bpy.Node(f"Math.{i:03}") for i in range(6)])
+    node_search = search.create_node_search(root, "math", Options())
+    steps = node_search.iter_search()
+    next(steps)
+    assert root.as_pointer() not in index.INDICES
+
+    for _ in steps:
+        pass
+    assert len(node_search.all_found_nodes) == 6
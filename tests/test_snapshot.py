@@ -0,0 +1,70 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import types
+
+import fake_bpy
+
+from improved_node_search import snapshot
+
+
+def make_tree() -> snapshot.TreeSnapshot:
+    """Two branches joined before the output, an isolated node and a node linked only by a muted
+    link:
+
+        A -> B -> D -> Output
+        A -> C -> D
+        E -> C
+        F,  G -(muted)-> Output
+    """
+    names = ("A", "B", "C", "D", "E", "F", "G")
+    nodes = {x: fake_bpy.Node(x) for x in names}
+    nodes["Output"] = fake_bpy.Node("Output", bl_idname="ShaderNodeOutputMaterial", outputs=0)
+    node_tree = fake_bpy.NodeTree("Branched", list(nodes.values()))
+    for a, b, muted in (
+        ("A", "B", False),
+        ("B", "D", False),
+        ("A", "C", False),
+        ("C", "D", False),
+        ("E", "C", False),
+        ("D", "Output", False),
+        ("G", "Output", True),
+    ):
+        node_tree.links.append(
+            types.SimpleNamespace(from_node=nodes[a], to_node=nodes[b], is_muted=muted)
+        )
+
+    return snapshot.TreeSnapshot(node_tree)
+
+
+def reach(tree: snapshot.TreeSnapshot, starts: tuple[str, ...], *args) -> set[str]:
+    indices = [record.index for record in tree.records if record.name in starts]
+    return {tree.records[i].name for i in tree.graph.reach(indices, *args)}
+
+
+def filter_names(tree: snapshot.TreeSnapshot, filter_: snapshot.ReachabilityFilter) -> set[str]:
+    return {record.name for record in tree.records if filter_(record)}
+
+
+def test_reach_follows_all_branches():
+    tree = make_tree()
+    assert reach(tree, ("D",), 'UPSTREAM') == {"A", "B", "C", "D", "E"}
+    assert reach(tree, ("A",), 'DOWNSTREAM') == {"A", "B", "C", "D", "Output"}
+    assert reach(tree, ("C",), 'BOTH', 1) == {"A", "C", "D", "E"}
+    assert reach(tree, ("E",), 'DOWNSTREAM', 2) == {"E", "C", "D"}
+    # Muted links don't connect the nodes
+    assert reach(tree, ("G",), 'DOWNSTREAM') == {"G"}
+
+
+def test_not_contributing_nodes_are_found():
+    tree = make_tree()
+    assert filter_names(tree, snapshot.not_contributing_filter()) == {"F", "G"}
+
+
+def test_reachability_filter_excludes_starts_unless_asked():
+    tree = make_tree()
+    starts = lambda tree: [record.index for record in tree.records if record.name == "C"]
+
+    downstream = snapshot.ReachabilityFilter(starts, 'DOWNSTREAM')
+    assert filter_names(tree, downstream) == {"D", "Output"}
+    upstream = snapshot.ReachabilityFilter(starts, 'UPSTREAM', max_hops=1, include_starts=True)
+    assert filter_names(tree, upstream) == {"A", "C", "E"}
@@ -0,0 +1,158 @@
+# copyright (c) Zdenek Dolezal 2024-*
+
+import types
+
+from improved_node_search import structure
+
+
+class Property:
+    def __init__(self, identifier: str):
+        self.identifier = identifier
+
+
+class Struct:
+    def __init__(self, identifiers: tuple[str, ...], base: "Struct | None" = None):
+        # Inherited properties are listed too, like in RNA
+        self.properties = (base.properties if base else []) + [Property(x) for x in identifiers]
+        self.base = base
+
+
+NODE_RNA = Struct(("rna_type", "name", "label", "location", "select", "mute"))
+
+
+class Socket:
+    def __init__(self, identifier: str, default_value=0.0):
+        self.identifier = identifier
+        self.default_value = default_value
+        self.is_linked = False
+
+
+class Node:
+    def __init__(self, name: str, bl_idname: str, inputs=("A",), outputs=("Out",), **properties):
+        self.name = name
+        self.label = ""
+        self.location = (0.0, 0.0)
+        self.select = False
+        self.mute = False
+        self.bl_idname = bl_idname
+        self.bl_rna = Struct(tuple(properties), NODE_RNA)
+        self.__dict__.update(properties)
+        self.inputs = [Socket(x) for x in inputs]
+        self.outputs = [Socket(x) for x in outputs]
+
+
+class Link:
+    def __init__(self, from_node: Node, to_node: Node):
+        self.from_node = from_node
+        self.from_socket = from_node.outputs[0]
+        self.to_node = to_node
+        self.to_socket = to_node.inputs[0]
+        self.is_muted = False
+        self.from_socket.is_linked = True
+        self.to_socket.is_linked = True
+
+
+def tree_hash(nodes: dict[str, Node], links: list[tuple[str, str]]) -> bytes:
+    node_tree = types.SimpleNamespace(
+        bl_idname="GeometryNodeTree", links=[Link(nodes[a], nodes[b]) for a, b in links]
+    )
+    tree = types.SimpleNamespace(node_tree=node_tree, nodes=list(nodes.values()), group_records=[])
+    return structure.TreeHashes(tree, structure.TreeStructure(tree), ()).hash
+
+
+def chain_nodes(*names: str) -> dict[str, Node]:
+    nodes = {}
+    for name in names:
+        if name.startswith("S"):
+            nodes[name] = Node(name, "Source", inputs=())
+        elif name.startswith("U"):
+            nodes[name] = Node(name, "Unary")
+        else:
+            nodes[name] = Node(name, "Sink", outputs=())
+    return nodes
+
+
+def test_branching_differs_from_chain():
+    names = ("S", "U1", "U2", "U3", "K1", "K2")
+    branching = tree_hash(
+        chain_nodes(*names),
+        [("S", "U1"), ("U1", "U2"), ("U1", "U3"), ("U2", "K1"), ("U3", "K2")],
+    )
+    chain = tree_hash(
+        chain_nodes(*names),
+        [("S", "U1"), ("U1", "U2"), ("U2", "U3"), ("U3", "K1"), ("U2", "K2")],
+    )
+    assert branching != chain
+
+
+def test_shared_node_differs_from_unused_copy():
+    names = ("S1", "S2", "U1", "U2", "K1", "K2")
+    shared = tree_hash(
+        chain_nodes(*names), [("S1", "U1"), ("S2", "U2"), ("U1", "K1"), ("U1", "K2")]
+    )
+    separate = tree_hash(
+        chain_nodes(*names), [("S1", "U1"), ("S2", "U2"), ("U1", "K1"), ("U2", "K2")]
+    )
+    assert shared != separate
+
+
+def test_names_locations_and_order_are_ignored():
+    names = ("S", "U1", "U2", "K1")
+    links = [("S", "U1"), ("U1", "U2"), ("U2", "K1")]
+    nodes = chain_nodes(*names)
+    renamed = {}
+    for name, node in reversed(nodes.items()):
+        node = Node(
+            name,
+            node.bl_idname,
+            [x.identifier for x in node.inputs],
+            [x.identifier for x in node.outputs],
+        )
+        node.name = node.label = f"Other {name}"
+        node.location = (100.0, 200.0)
+        renamed[name] = node
+
+    assert tree_hash(nodes, links) == tree_hash(renamed, links)
+
+
+def test_linked_values_of_input_nodes_are_hashed():
+    def value_tree(value: float) -> bytes:
+        nodes = {"Value": Node("Value", "ShaderNodeValue", inputs=()), "K": Node("K", "Sink")}
+        nodes["Value"].outputs[0].default_value = value
+        return tree_hash(nodes, [("Value", "K")])
+
+    assert value_tree(0.5) != value_tree(2.0)
+
+
+def test_node_type_properties_are_hashed():
+    def signature(interpolation: str, mute: bool = False) -> bytes:
+        node = Node("Image", "ShaderNodeTexImage", interpolation=interpolation)
+        node.mute = mute
+        return structure.node_signature(node)
+
+    assert signature('Linear') != signature('Closest')
+    assert signature('Linear') != signature('Linear', mute=True)
+
+
+def test_nested_structs_are_hashed():
+    class Element:
+        bl_rna = Struct(("position", "color"))
+
+        def __init__(self, position: float):
+            self.position = position
+            self.color = (1.0, 1.0, 1.0, 1.0)
+
+    class ColorRamp:
+        bl_rna = Struct(("interpolation", "elements"))
+
+        def __init__(self, *positions: float):
+            self.interpolation = 'LINEAR'
+            self.elements = [Element(x) for x in positions]
+
+    def signature(*positions: float) -> bytes:
+        return structure.node_signature(
+            Node("Ramp", "ShaderNodeValToRGB", color_ramp=ColorRamp(*positions))
+        )
+
+    assert signature(0.0, 1.0) == signature(0.0, 1.0)
+    assert signature(0.0, 1.0) != signature(0.0, 0.5)